@@ -1,3 +1,4 @@
+import asyncio
 import datetime
 import logging
 import webbrowser
@@ -15,13 +16,24 @@ class App:
     def __init__(
         self,
         commute_coordinates: list[tuple[float, float]],
-        cache: Optional[property_cache.PropertyCache],
+        cache: Optional[property_cache.AnyPropertyCache],
         tfl_app_key: str,
+        rightmove_api: Optional[api.AsyncRightmove] = None,
     ) -> None:
-        self._api = api.Rightmove()
+        self._api = rightmove_api or api.AsyncRightmove()
         self._cache = cache
         self._commute_coordinates = commute_coordinates
-        self._tfl_app_key = tfl_app_key
+        self._tfl = tfl.api.Tfl(app_key=tfl_app_key)
+
+    async def aclose(self) -> None:
+        await self._api.aclose()
+        await self._tfl.aclose()
+
+    async def __aenter__(self) -> "App":
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        await self.aclose()
 
     async def search(
         self,
@@ -33,13 +45,6 @@ class App:
         journey_coordinates: dict[str, tuple[float, float]],
         max_journey_timedelta: datetime.timedelta,
     ) -> None:
-        if location_id.startswith("STATION^") and not await self._check_journey(
-            location=location_name,
-            journey_coordinates=journey_coordinates,
-            max_journey_timedelta=max_journey_timedelta,
-        ):
-            return
-
         query = api.SearchQuery(
             location_identifier=location_id,
             min_bedrooms=1,
@@ -52,13 +57,30 @@ class App:
             is_fetching=True,
             max_days_since_added=max_days_since_added,
         )
-        properties = self._api.search(query)
+        # Fetch from Rightmove while the station's journeys are checked.
+        search = asyncio.create_task(self._api.search(query))
+        try:
+            if location_id.startswith("STATION^") and not await self._check_journey(
+                location=location_name,
+                journey_coordinates=journey_coordinates,
+                max_journey_timedelta=max_journey_timedelta,
+            ):
+                return
+            properties = await search
+        finally:
+            if not search.done():
+                search.cancel()
+                await asyncio.wait([search])
         logger.info("Search returned %d properties", len(properties))
-        new_properties = [
-            property
-            for property in properties
-            if not self._cache or not self._cache.contains_property_id(property.id)
-        ]
+        if self._cache is not None:
+            unseen_ids = set(
+                self._cache.filter_unseen(property.id for property in properties)
+            )
+            new_properties = [
+                property for property in properties if property.id in unseen_ids
+            ]
+        else:
+            new_properties = properties
         logger.info(
             "After filtering cached properties, returned %d properties",
             len(new_properties),
@@ -69,12 +91,12 @@ class App:
                 continue
 
             logger.info('Checking journey from "%s"', property.display_address)
-            if not self._check_journey(
+            if not await self._check_journey(
                 location=(property.location.latitude, property.location.longitude),
                 journey_coordinates=journey_coordinates,
                 max_journey_timedelta=max_journey_timedelta,
             ):
-                if self._cache:
+                if self._cache is not None:
                     self._cache.add(property.model_dump(mode="json"))
                 logger.info(
                     'Skipping "%s" (%s %s)',
@@ -93,7 +115,7 @@ class App:
             if index != len(new_properties) - 1:
                 self._wait("Press enter for next property...")
 
-            if self._cache:
+            if self._cache is not None:
                 self._cache.add(property.model_dump(mode="json"))
 
     async def _check_journey(
@@ -106,11 +128,8 @@ class App:
         arrival_datetime = tfl.api.get_next_datetime(
             datetime.time(9, 0, 0, 0, tzinfo=tzinfo)
         )
-        tfl_api = tfl.api.Tfl(
-            app_key=self._tfl_app_key,
-        )
         for location_name, journey_coordinate in journey_coordinates.items():
-            journey_results = await tfl_api.get_journey_results(
+            journey_results = await self._tfl.get_journey_results(
                 from_location=location,
                 to_location=journey_coordinate,
                 arrival_datetime=arrival_datetime,
@@ -2,7 +2,7 @@ import asyncio
 import datetime
 import logging
 import zoneinfo
-from collections.abc import AsyncIterator, Awaitable, Iterable
+from collections.abc import AsyncIterable, AsyncIterator, Collection, Iterable
 from typing import Optional, Protocol, Union
 
 import tqdm
@@ -21,16 +21,36 @@ class SupportsStr(Protocol):
     def __str__(self) -> str: ...
 
 
-async def _identify[T](index: int, awaitable: Awaitable[T]) -> tuple[int, T]:
-    result = await awaitable
-    return index, result
+_Listing = Union[rightmove.models.Property, rightmove.models.PropertySummary]
+
+
+_EXHAUSTED = object()
+
+
+async def _aiter[T](iterable: Union[Iterable[T], AsyncIterable[T]]) -> AsyncIterator[T]:
+    if isinstance(iterable, AsyncIterable):
+        async for item in iterable:
+            yield item
+    elif isinstance(iterable, Collection):
+        # Already in memory, so iterating can't block the event loop.
+        for item in iterable:
+            yield item
+    else:
+        # Could be blocking on I/O, like `rightmove.api.Rightmove.iter_search`.
+        iterator = iter(iterable)
+        while True:
+            item = await asyncio.to_thread(next, iterator, _EXHAUSTED)
+            if item is _EXHAUSTED:
+                return
+            # else...
+            yield item
 
 
 class App:
     def __init__(
         self,
         commute_coordinates: list[tuple[float, float]],
-        property_cache: Optional[property_cache.PropertyCache],
+        property_cache: Optional[property_cache.AnyPropertyCache],
         journey_cache: Optional[tfl.cache.Cache],
         tfl_api: tfl.api.Tfl,
         progress_bar: bool,
@@ -44,59 +64,109 @@ class App:
 
     async def search(
         self,
-        properties: list[rightmove.models.Property],
+        properties: Union[
+            Iterable[_Listing],
+            AsyncIterable[_Listing],
+        ],
         max_price: int,
         max_days_since_added: Optional[int],
         journey_coordinates: dict[str, tuple[float, float]],
         max_journey_timedelta: datetime.timedelta,
         min_square_meters: int = 0,
+        remember: bool = False,
     ) -> AsyncIterator[rightmove.models.Property]:
-        logger.info("Search returned %d properties", len(properties))
-        new_properties = [
-            property
-            for property in properties
-            if not self._property_cache
-            or not self._property_cache.contains_property_id(property.id)
-        ]
-        logger.info(
-            "After filtering cached properties, returned %d properties",
-            len(new_properties),
-        )
+        """Yield the suitable properties as soon as each has been checked.
 
-        futures = [
-            _identify(
-                index,
-                self._suitable_property(
-                    property=property,
-                    max_price=max_price,
-                    max_days_since_added=max_days_since_added,
-                    journey_coordinates=journey_coordinates,
-                    max_journey_timedelta=max_journey_timedelta,
-                    min_square_meters=min_square_meters,
-                ),
+        `properties` may be an async iterable such as
+        `rightmove.api.AsyncRightmove.iter_search`, in which case filtering
+        starts while later pages are still downloading. They may also be
+        summaries, in which case only the suitable ones are fully validated.
+
+        With `remember`, each property is added to the property cache once it
+        has been checked, suitable or not, so later searches skip it.
+        """
+        results: asyncio.Queue[
+            Optional[tuple[_Listing, Optional[Iterable[SupportsStr]]]]
+        ] = asyncio.Queue()
+
+        async def check(property: _Listing) -> None:
+            skip_reason = await self._suitable_property(
+                property=property,
+                max_price=max_price,
+                max_days_since_added=max_days_since_added,
+                journey_coordinates=journey_coordinates,
+                max_journey_timedelta=max_journey_timedelta,
+                min_square_meters=min_square_meters,
             )
-            for index, property in enumerate(new_properties)
-        ]
+            await results.put((property, skip_reason))
+
+        async def produce() -> None:
+            count = 0
+            new_count = 0
+            tasks: set[asyncio.Task[None]] = set()
+            try:
+                async for property in _aiter(properties):
+                    count += 1
+                    if (
+                        self._property_cache is not None
+                        and self._property_cache.contains_property_id(property.id)
+                    ):
+                        continue
+                    new_count += 1
+                    progress_bar.total = new_count
+                    progress_bar.refresh()
+                    task = asyncio.create_task(check(property))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                await asyncio.gather(*tasks)
+                logger.info("Search returned %d properties", count)
+                logger.info(
+                    "After filtering cached properties, returned %d properties",
+                    new_count,
+                )
+            finally:
+                if tasks:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.wait(tasks)
+                await results.put(None)
+
         with tqdm.tqdm(
-            total=len(new_properties),
+            total=0,
             desc="Filtering properties",
             unit="properties",
             disable=not self._progress_bar,
             position=0,
         ) as progress_bar:
-            async for index, skip_reason in asyncio.as_completed(futures):
-                progress_bar.update(1)
-                if skip_reason:
-                    skip_format, *skip_args = skip_reason
-                    progress_bar.set_description_str(str(skip_format) % (*skip_args,))
-                    if not self._progress_bar:
-                        logger.info(*skip_reason)
-                else:
-                    yield new_properties[index]
+            producer = asyncio.create_task(produce())
+            try:
+                while (result := await results.get()) is not None:
+                    property, skip_reason = result
+                    progress_bar.update(1)
+                    if remember and self._property_cache is not None:
+                        # A summary dumps the listing's other fields too.
+                        self._property_cache.add(property.model_dump(mode="json"))
+                    if skip_reason:
+                        skip_format, *skip_args = skip_reason
+                        progress_bar.set_description_str(
+                            str(skip_format) % (*skip_args,)
+                        )
+                        if not self._progress_bar:
+                            logger.info(*skip_reason)
+                    elif isinstance(property, rightmove.models.PropertySummary):
+                        yield property.to_property()
+                    else:
+                        yield property
+                # Re-raise anything that went wrong while producing.
+                await producer
+            finally:
+                if not producer.done():
+                    producer.cancel()
+                    await asyncio.wait([producer])
 
     async def _suitable_property(
         self,
-        property: rightmove.models.Property,
+        property: _Listing,
         max_price: int,
         max_days_since_added: Optional[int],
         journey_coordinates: dict[str, tuple[float, float]],
@@ -0,0 +1,447 @@
+import math
+from collections.abc import Iterable, Sequence
+
+from rightmove import geometry
+
+__all__ = [
+    "BoundingBox",
+    "SearchArea",
+    "clip",
+    "plan_tiles",
+    "simplify",
+    "split",
+]
+
+
+BoundingBox = tuple[tuple[float, float], tuple[float, float]]
+"South west and north east corners, as (latitude, longitude)."
+
+Polygon = list[tuple[float, float]]
+"Vertices as (latitude, longitude), without repeating the first at the end."
+
+
+class SearchArea:
+    """The union of some polygons, outlined within any bounding box."""
+
+    def __init__(self, polygons: Iterable[Sequence[tuple[float, float]]]) -> None:
+        self._polygons = [list(polygon) for polygon in polygons]
+        self._bounding_boxes = [_bounds(polygon) for polygon in self._polygons]
+
+    def touches(self, bounding_box: BoundingBox) -> bool:
+        "Whether any of the area is in a bounding box, not just on its edge."
+        return bool(self.outline(bounding_box))
+
+    def outline(self, bounding_box: BoundingBox) -> Polygon:
+        """One polygon around all of the area in a bounding box.
+
+        This is the area exactly where only one polygon crosses the box. Where
+        more do, it is the convex hull of their parts in it instead, as their
+        union may not be one polygon. It is empty if none of the area is in
+        the box.
+        """
+        parts = [
+            part
+            for polygon, polygon_bounding_box in zip(
+                self._polygons, self._bounding_boxes
+            )
+            if _overlaps(polygon_bounding_box, bounding_box)
+            and _area(part := clip(polygon, bounding_box)) > 0
+        ]
+        if not parts:
+            return []
+        if len(parts) == 1:
+            return parts[0]
+        # else...
+        return _convex_hull([vertex for part in parts for vertex in part])
+
+
+def plan_tiles(
+    polygons: Iterable[Sequence[tuple[float, float]]],
+    tile_degrees: float,
+) -> list[BoundingBox]:
+    """Tile the union of some polygons once, with non-overlapping cells.
+
+    Every cell comes from one grid aligned to multiples of `tile_degrees`, so
+    ground shared by overlapping polygons is only covered once, and the number
+    of cells scales with the area covered rather than the number of polygons.
+
+    Args:
+        polygons: Vertices of each polygon, as (latitude, longitude).
+        tile_degrees: Width and height of each cell.
+
+    Returns:
+        Every cell that touches a polygon, from south west to north east.
+    """
+    cells: set[tuple[int, int]] = set()
+    for polygon in polygons:
+        min_row = math.floor(min(latitude for latitude, _ in polygon) / tile_degrees)
+        max_row = math.floor(max(latitude for latitude, _ in polygon) / tile_degrees)
+        min_column = math.floor(
+            min(longitude for _, longitude in polygon) / tile_degrees
+        )
+        max_column = math.floor(
+            max(longitude for _, longitude in polygon) / tile_degrees
+        )
+        for row in range(min_row, max_row + 1):
+            for column in range(min_column, max_column + 1):
+                if (row, column) not in cells and _touches(
+                    _cell(row, column, tile_degrees), polygon
+                ):
+                    cells.add((row, column))
+    return [_cell(row, column, tile_degrees) for row, column in sorted(cells)]
+
+
+def split(
+    bounding_box: BoundingBox,
+    points: Iterable[tuple[float, float]],
+    parts: int,
+) -> list[BoundingBox]:
+    """Split a bounding box into parts holding about as many points each.
+
+    Like building a k-d tree, each cut is across the longer side of a box, at
+    the quantile of the points in it that leaves the parts on either side
+    with their share of the points. A box without enough points to place a
+    cut is cut down the middle instead. The parts only share edges.
+
+    Args:
+        bounding_box: Box to split.
+        points: Sample of where things are in the box, as (latitude,
+            longitude). Those outside it are ignored.
+        parts: Number of boxes to split it into.
+
+    Returns:
+        Boxes covering the bounding box exactly.
+    """
+    (min_y, min_x), (max_y, max_x) = bounding_box
+    return _split(
+        bounding_box,
+        [
+            point
+            for point in points
+            if min_y <= point[0] <= max_y and min_x <= point[1] <= max_x
+        ],
+        parts,
+    )
+
+
+def _split(
+    bounding_box: BoundingBox, points: list[tuple[float, float]], parts: int
+) -> list[BoundingBox]:
+    if parts <= 1:
+        return [bounding_box]
+    # else...
+    (min_y, min_x), (max_y, max_x) = bounding_box
+    # Cut across latitude (axis 0) if the box is taller than it is wide.
+    axis = 0 if max_y - min_y >= max_x - min_x else 1
+    low, high = bounding_box[0][axis], bounding_box[1][axis]
+    low_parts = parts // 2
+    values = sorted(point[axis] for point in points)
+    index = round(len(values) * low_parts / parts)
+    # Cut between two points, so neither lies on the shared edge.
+    cut = (
+        (values[index - 1] + values[index]) / 2
+        if 0 < index < len(values)
+        else (low + high) / 2
+    )
+    if not low < cut < high:
+        cut = (low + high) / 2
+    if axis == 0:
+        low_box = ((min_y, min_x), (cut, max_x))
+        high_box = ((cut, min_x), (max_y, max_x))
+    else:
+        low_box = ((min_y, min_x), (max_y, cut))
+        high_box = ((min_y, cut), (max_y, max_x))
+    return [
+        *_split(low_box, [point for point in points if point[axis] < cut], low_parts),
+        *_split(
+            high_box,
+            [point for point in points if point[axis] >= cut],
+            parts - low_parts,
+        ),
+    ]
+
+
+def simplify(polygon: Sequence[tuple[float, float]], tolerance: float) -> Polygon:
+    """Drop the vertices of a polygon that barely change its shape.
+
+    Each side is simplified by the Douglas-Peucker algorithm, and the
+    tolerance halved until the result doesn't cross itself.
+
+    Args:
+        polygon: Vertices as (latitude, longitude), the first of which may be
+            repeated at the end.
+        tolerance: Furthest in degrees the outline may move.
+    """
+    vertices = list(polygon)
+    if len(vertices) > 1 and vertices[0] == vertices[-1]:
+        vertices.pop()
+    if len(vertices) < 3:
+        return vertices
+    # else...
+    (min_y, min_x), (max_y, max_x) = _bounds(vertices)
+    # Any more than its span drops the same vertices, and halving an infinite
+    #  tolerance would never end.
+    tolerance = min(tolerance, max(max_y - min_y, max_x - min_x))
+    while tolerance > _MIN_TOLERANCE:
+        simplified = _simplify_ring(vertices, tolerance)
+        if len(simplified) >= 3 and not _crosses_itself(simplified):
+            return simplified
+        # else...
+        tolerance /= 2
+    return vertices
+
+
+def clip(polygon: Sequence[tuple[float, float]], bounding_box: BoundingBox) -> Polygon:
+    """The part of a polygon in a bounding box, by Sutherland-Hodgman clipping.
+
+    A concave polygon that leaves and reenters the box is joined up along its
+    edge, enclosing no more of it.
+    """
+    (min_y, min_x), (max_y, max_x) = bounding_box
+    vertices = list(polygon)
+    for axis, limit, keep_above in (
+        (0, min_y, True),
+        (0, max_y, False),
+        (1, min_x, True),
+        (1, max_x, False),
+    ):
+        vertices = _clip_edge(vertices, axis, limit, keep_above)
+    # A vertex on the box's edge is also where the polygon crosses it.
+    return [
+        vertex
+        for index, vertex in enumerate(vertices)
+        if vertex != vertices[index - 1] or len(vertices) == 1
+    ]
+
+
+def _cell(row: int, column: int, tile_degrees: float) -> BoundingBox:
+    return (
+        (row * tile_degrees, column * tile_degrees),
+        ((row + 1) * tile_degrees, (column + 1) * tile_degrees),
+    )
+
+
+def _touches(cell: BoundingBox, polygon: Sequence[tuple[float, float]]) -> bool:
+    "Whether a cell and a polygon overlap at all."
+    (min_y, min_x), (max_y, max_x) = cell
+    # The polygon is inside the cell, or the cell is inside the polygon.
+    if min_y <= polygon[0][0] <= max_y and min_x <= polygon[0][1] <= max_x:
+        return True
+    if geometry.contains(polygon, (min_y, min_x)):
+        return True
+    # else...
+    # Otherwise an edge of the polygon must cross the cell.
+    return any(
+        _crosses(start, end, cell)
+        for start, end in zip(polygon, [*polygon[1:], polygon[0]])
+    )
+
+
+def _crosses(
+    start: tuple[float, float], end: tuple[float, float], cell: BoundingBox
+) -> bool:
+    "Whether a line segment passes through a cell, by Liang-Barsky clipping."
+    (min_y, min_x), (max_y, max_x) = cell
+    (y1, x1), (y2, x2) = start, end
+    dy, dx = y2 - y1, x2 - x1
+    entering, leaving = 0.0, 1.0
+    for step, distance in (
+        (-dx, x1 - min_x),
+        (dx, max_x - x1),
+        (-dy, y1 - min_y),
+        (dy, max_y - y1),
+    ):
+        if step == 0:
+            if distance < 0:
+                return False
+            # else...
+            continue
+        # else...
+        fraction = distance / step
+        if step < 0:
+            entering = max(entering, fraction)
+        else:
+            leaving = min(leaving, fraction)
+        if entering > leaving:
+            return False
+    return True
+
+
+def _clip_edge(vertices: Polygon, axis: int, limit: float, keep_above: bool) -> Polygon:
+    "Clip a polygon to one side of a line of latitude (axis 0) or longitude."
+
+    def inside(vertex: tuple[float, float]) -> bool:
+        return vertex[axis] >= limit if keep_above else vertex[axis] <= limit
+
+    def crossing(
+        start: tuple[float, float], end: tuple[float, float]
+    ) -> tuple[float, float]:
+        fraction = (limit - start[axis]) / (end[axis] - start[axis])
+        # Exactly on the line, whatever the rounding.
+        if axis == 0:
+            return (limit, start[1] + fraction * (end[1] - start[1]))
+        # else...
+        return (start[0] + fraction * (end[0] - start[0]), limit)
+
+    clipped = []
+    for start, end in zip([*vertices[-1:], *vertices[:-1]], vertices):
+        if inside(end):
+            if not inside(start):
+                clipped.append(crossing(start, end))
+            clipped.append(end)
+        elif inside(start):
+            clipped.append(crossing(start, end))
+    return clipped
+
+
+_MIN_TOLERANCE = 1e-9
+"Polygons are left as they are rather than simplified any less than this."
+
+
+def _simplify_ring(vertices: Polygon, tolerance: float) -> Polygon:
+    if len(vertices) <= 3:
+        return vertices
+    # else...
+    # Split it into two sides at the vertex furthest from the first.
+    furthest = max(
+        range(len(vertices)), key=lambda index: math.dist(vertices[0], vertices[index])
+    )
+    return [
+        *_douglas_peucker(vertices[: furthest + 1], tolerance)[:-1],
+        *_douglas_peucker([*vertices[furthest:], vertices[0]], tolerance)[:-1],
+    ]
+
+
+def _douglas_peucker(line: Polygon, tolerance: float) -> Polygon:
+    "Simplify a line, keeping its ends."
+    keep = [False] * len(line)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(line) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        # else...
+        index, distance = max(
+            (
+                (index, _distance_to_segment(line[index], line[start], line[end]))
+                for index in range(start + 1, end)
+            ),
+            key=lambda item: item[1],
+        )
+        if distance > tolerance:
+            keep[index] = True
+            stack.extend(((start, index), (index, end)))
+    return [vertex for vertex, kept in zip(line, keep) if kept]
+
+
+def _distance_to_segment(
+    point: tuple[float, float], start: tuple[float, float], end: tuple[float, float]
+) -> float:
+    (y, x), (y1, x1), (y2, x2) = point, start, end
+    dy, dx = y2 - y1, x2 - x1
+    length_squared = dy * dy + dx * dx
+    if length_squared == 0:
+        return math.dist(point, start)
+    # else...
+    fraction = max(0.0, min(1.0, ((y - y1) * dy + (x - x1) * dx) / length_squared))
+    return math.dist(point, (y1 + fraction * dy, x1 + fraction * dx))
+
+
+def _crosses_itself(vertices: Polygon) -> bool:
+    edges = list(zip(vertices, [*vertices[1:], vertices[0]]))
+    return any(
+        _segments_intersect(*edges[i], *edges[j])
+        for i in range(len(edges))
+        for j in range(i + 2, len(edges))
+        # The first and last edges share a vertex.
+        if not (i == 0 and j == len(edges) - 1)
+    )
+
+
+def _segments_intersect(
+    a: tuple[float, float],
+    b: tuple[float, float],
+    c: tuple[float, float],
+    d: tuple[float, float],
+) -> bool:
+    def orientation(
+        p: tuple[float, float], q: tuple[float, float], r: tuple[float, float]
+    ) -> float:
+        return (q[1] - p[1]) * (r[0] - p[0]) - (q[0] - p[0]) * (r[1] - p[1])
+
+    def on_segment(
+        p: tuple[float, float], q: tuple[float, float], r: tuple[float, float]
+    ) -> bool:
+        return min(p[0], q[0]) <= r[0] <= max(p[0], q[0]) and min(p[1], q[1]) <= r[
+            1
+        ] <= max(p[1], q[1])
+
+    o1, o2 = orientation(a, b, c), orientation(a, b, d)
+    o3, o4 = orientation(c, d, a), orientation(c, d, b)
+    if ((o1 > 0 and o2 < 0) or (o1 < 0 and o2 > 0)) and (
+        (o3 > 0 and o4 < 0) or (o3 < 0 and o4 > 0)
+    ):
+        return True
+    # else...
+    # Touching counts too, as a vertex on another edge pinches the polygon.
+    return (
+        (o1 == 0 and on_segment(a, b, c))
+        or (o2 == 0 and on_segment(a, b, d))
+        or (o3 == 0 and on_segment(c, d, a))
+        or (o4 == 0 and on_segment(c, d, b))
+    )
+
+
+def _convex_hull(points: Iterable[tuple[float, float]]) -> Polygon:
+    "By Andrew's monotone chain algorithm."
+    sorted_points = sorted(set(points))
+    if len(sorted_points) <= 2:
+        return sorted_points
+    # else...
+
+    def half(points: Iterable[tuple[float, float]]) -> Polygon:
+        hull: Polygon = []
+        for point in points:
+            while (
+                len(hull) >= 2
+                and (hull[-1][0] - hull[-2][0]) * (point[1] - hull[-2][1])
+                - (hull[-1][1] - hull[-2][1]) * (point[0] - hull[-2][0])
+                >= 0
+            ):
+                hull.pop()
+            hull.append(point)
+        return hull
+
+    lower = half(sorted_points)
+    upper = half(reversed(sorted_points))
+    return [*lower[:-1], *upper[:-1]]
+
+
+def _area(polygon: Polygon) -> float:
+    "By the shoelace formula."
+    return (
+        abs(
+            sum(
+                y1 * x2 - y2 * x1
+                for (y1, x1), (y2, x2) in zip(polygon, [*polygon[1:], *polygon[:1]])
+            )
+        )
+        / 2
+    )
+
+
+def _bounds(polygon: Polygon) -> BoundingBox:
+    return (
+        (min(y for y, _ in polygon), min(x for _, x in polygon)),
+        (max(y for y, _ in polygon), max(x for _, x in polygon)),
+    )
+
+
+def _overlaps(a: BoundingBox, b: BoundingBox) -> bool:
+    return (
+        a[0][0] <= b[1][0]
+        and b[0][0] <= a[1][0]
+        and a[0][1] <= b[1][1]
+        and b[0][1] <= a[1][1]
+    )
@@ -0,0 +1,132 @@
+import json
+import os
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from flathunt import coverage
+from rightmove import journal, models
+
+__all__ = [
+    "CrawlJournal",
+]
+
+
+class CrawlJournal:
+    """Progress of a boundary crawl, written to disk as it goes.
+
+    Each tile searched and each property downloaded is appended to a file of
+    JSON lines as soon as it is done, so a crawl that fails or is interrupted
+    can be resumed without searching or downloading any of them again.
+    """
+
+    def __init__(
+        self, filepath: str, resume: bool = False, overwrite: bool = False
+    ) -> None:
+        """
+        Args:
+            filepath: JSON lines file, started afresh unless resuming.
+            resume: Load the progress of the crawl that last used this file.
+            overwrite: Start afresh even if the file records an unfinished
+                crawl, discarding its progress.
+
+        Raises:
+            FileExistsError: If not resuming or overwriting, and the file
+                records an unfinished crawl.
+            ValueError: If resuming, and any complete line is corrupt, as that
+                isn't from a write being cut short and the lines after it may
+                still be needed.
+        """
+        self._filepath = filepath
+        self.tiles: dict[coverage.BoundingBox, list[coverage.BoundingBox]] = {}
+        "Tiles searched, and the tiles each was split into."
+        self.property_locations: dict[int, models.Location] = {}
+        "Properties found in tiles that weren't split."
+        self.properties: dict[int, models.Property] = {}
+        "Properties downloaded."
+        if resume:
+            self._resume()
+        elif (
+            not overwrite and os.path.exists(filepath) and os.path.getsize(filepath) > 0
+        ):
+            raise FileExistsError(f"{filepath} records an unfinished crawl")
+        self._file = open(filepath, "a" if resume else "w")
+
+    def __enter__(self) -> "CrawlJournal":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def pending(self, tile: coverage.BoundingBox) -> list[coverage.BoundingBox]:
+        "The parts of a tile still to be searched."
+        children = self.tiles.get(tile)
+        if children is None:
+            return [tile]
+        # else...
+        return [pending for child in children for pending in self.pending(child)]
+
+    def record_tile(
+        self,
+        tile: coverage.BoundingBox,
+        children: Sequence[coverage.BoundingBox],
+        property_locations: Iterable[models.PropertyLocation],
+    ) -> None:
+        property_locations = list(property_locations)
+        self.tiles[tile] = list(children)
+        self.property_locations.update(
+            (property_location.id, property_location.location)
+            for property_location in property_locations
+        )
+        self._write(
+            {
+                "tile": tile,
+                "children": children,
+                "found": [
+                    [
+                        property_location.id,
+                        property_location.location.latitude,
+                        property_location.location.longitude,
+                    ]
+                    for property_location in property_locations
+                ],
+            }
+        )
+
+    def record_property(self, property: models.Property) -> None:
+        self.properties[property.id] = property
+        self._write({"property": property.model_dump(mode="json")})
+
+    def close(self) -> None:
+        self._file.close()
+
+    def remove(self) -> None:
+        "Close and delete the journal, once the crawl it records is finished."
+        self.close()
+        os.remove(self._filepath)
+
+    def _resume(self) -> None:
+        for _, entry in journal.iter_entries(self._filepath):
+            self._load(entry)
+
+    def _load(self, entry: dict[str, Any]) -> None:
+        if "tile" in entry:
+            self.tiles[_tile(entry["tile"])] = [
+                _tile(child) for child in entry["children"]
+            ]
+            self.property_locations.update(
+                (id, models.Location(latitude=latitude, longitude=longitude))
+                for id, latitude, longitude in entry["found"]
+            )
+        else:
+            property = models.Property.model_validate(entry["property"])
+            self.properties[property.id] = property
+
+    def _write(self, entry: dict[str, Any]) -> None:
+        self._file.write(json.dumps(entry) + "\n")
+        # Flushed every entry, so nothing recorded is lost if the crawl dies.
+        self._file.flush()
+
+
+def _tile(value: list[list[float]]) -> coverage.BoundingBox:
+    (min_y, min_x), (max_y, max_x) = value
+    return (min_y, min_x), (max_y, max_x)
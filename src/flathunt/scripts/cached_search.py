@@ -5,20 +5,52 @@ import datetime
 import json
 import logging
 import os
+from collections.abc import AsyncIterator
+from typing import Union
 
 import flathunt.cached_app
 import flathunt.io
+import rightmove.api
 import rightmove.models
 import rightmove.property_cache
 import tfl.api
+import tfl.cache
 
 _LOGGER = logging.getLogger(__name__)
 
+_JOURNEY_FLUSH_INTERVAL = 10.0
+"Seconds a new journey may wait to be saved with others."
+
 
 async def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--reset", action="store_true", default=False)
-    parser.add_argument("--properties", type=str)
+    parser.add_argument(
+        "--journey-cache",
+        type=str,
+        default=None,
+        help="Cache TfL journeys in this JSON file",
+    )
+    parser.add_argument(
+        "--history",
+        type=str,
+        default="history.json",
+        help="Properties seen before, kept in SQLite if it ends in .sqlite or .db",
+    )
+    parser.add_argument(
+        "--compact-history",
+        action="store_true",
+        default=False,
+        help="Keep only the IDs of properties seen before in memory",
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--properties", type=str, help="Properties JSON file")
+    source.add_argument(
+        "--location-id",
+        type=str,
+        help="Search Rightmove live around this location ID instead",
+    )
+    parser.add_argument("--max-miles-radius", type=float, default=0.5)
     parser.add_argument("--default-max-price", type=int, default=2200)
     parser.add_argument("--max-journey-minutes", type=int, default=45)
     parser.add_argument("--max-days-since-added", type=int, default=7)
@@ -32,18 +64,26 @@ async def main() -> None:
         logger.setLevel(logging.INFO)
         logger.addHandler(logging.StreamHandler())
 
-    properties = flathunt.io.load_json(list[rightmove.models.Property], args.properties)
-
     with open("locations.json", "r") as file:
         locations = {key: tuple(value) for key, value in json.load(file).items()}
 
-    property_cache = rightmove.property_cache.PropertyCache("history.json", args.reset)
+    property_cache = rightmove.property_cache.open_property_cache(
+        args.history,
+        args.reset,
+        compact=args.compact_history,
+    )
 
+    # Journeys found close together are saved together, and the rest on closing.
+    journey_cache = (
+        tfl.cache.Cache(args.journey_cache, flush_interval=_JOURNEY_FLUSH_INTERVAL)
+        if args.journey_cache
+        else None
+    )
     tfl_api = tfl.api.Tfl(app_key=os.environ["FLATHUNT__TFL_API_KEY"])
     app = flathunt.cached_app.App(
         list(locations.values()),
         property_cache,
-        journey_cache=None,
+        journey_cache=journey_cache,
         tfl_api=tfl_api,
         progress_bar=True,
     )
@@ -53,26 +93,47 @@ async def main() -> None:
             raise ValueError("sort_center must be a tuple of (longitude, latitude)")
     else:
         sort_center = None
-    properties.sort(
-        key=lambda property: (
-            (
+
+    rightmove_api = rightmove.api.AsyncRightmove()
+    properties: Union[
+        list[rightmove.models.PropertySummary],
+        AsyncIterator[rightmove.models.PropertySummary],
+    ]
+    if args.location_id:
+        # Filter each page while later pages are still downloading.
+        properties = rightmove_api.iter_search_summaries(
+            rightmove.api.SearchQuery(
+                location_identifier=args.location_id,
+                max_price=args.default_max_price,
+                radius=args.max_miles_radius,
+                sort_type=rightmove.api.SortType.MOST_RECENT,
+                is_fetching=True,
+                max_days_since_added=args.max_days_since_added,
+            )
+        )
+    else:
+        with open(args.properties, "rb") as file:
+            properties = rightmove.models.validate_property_summaries_json(file.read())
+        properties.sort(
+            key=lambda property: (
                 (
                     (
-                        (property.location.latitude - sort_center[0]) ** 2
-                        + (property.location.longitude - sort_center[1]) ** 2
+                        (
+                            (property.location.latitude - sort_center[0]) ** 2
+                            + (property.location.longitude - sort_center[1]) ** 2
+                        )
+                        ** 0.5
                     )
-                    ** 0.5
-                )
-                if sort_center
-                else 0
-            ),
-            (
-                -property.first_visible_date.timestamp()
-                if property.first_visible_date
-                else 0
+                    if sort_center
+                    else 0
+                ),
+                (
+                    -property.first_visible_date.timestamp()
+                    if property.first_visible_date
+                    else 0
+                ),
             ),
-        ),
-    )
+        )
     appropiate_properties = []
     try:
         async for property in app.search(
@@ -87,6 +148,10 @@ async def main() -> None:
     except KeyboardInterrupt:
         pass
     finally:
+        await rightmove_api.aclose()
+        property_cache.close()
+        if journey_cache is not None:
+            journey_cache.close()
         if appropiate_properties:
             flathunt.io.save_json(
                 list[rightmove.models.Property], appropiate_properties, args.output
@@ -6,16 +6,54 @@ import logging
 import os
 
 import flathunt.app
+import rightmove.api
+import rightmove.metrics
 import rightmove.property_cache
+import rightmove.response_cache
+
+_HISTORY_FLUSH_INTERVAL = 10.0
+"Seconds a seen listing may wait to be saved with others."
 
 
 async def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--reset", action="store_true", default=False)
+    parser.add_argument(
+        "--history",
+        type=str,
+        default="history.json",
+        help="Properties seen before, kept in SQLite if it ends in .sqlite or .db",
+    )
+    parser.add_argument(
+        "--compact-history",
+        action="store_true",
+        default=False,
+        help="Keep only the IDs of properties seen before in memory",
+    )
     parser.add_argument("--search-locations", type=str, default="search_locations.json")
     parser.add_argument("--default-max-price", type=int, default=2200)
     parser.add_argument("--max-journey-minutes", type=int, default=45)
+    parser.add_argument(
+        "--response-cache",
+        type=str,
+        default=None,
+        help="Cache Rightmove responses in this SQLite file, such as responses.sqlite",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        default=False,
+        help="Only use cached Rightmove responses, from --response-cache",
+    )
+    parser.add_argument(
+        "--metrics",
+        type=str,
+        default="",
+        help="Write per-endpoint Rightmove request metrics to this JSON file",
+    )
     args = parser.parse_args()
+    if args.offline and not args.response_cache:
+        parser.error("--offline needs a --response-cache")
 
     logging.basicConfig(level=logging.INFO, encoding="utf-8")
     flathunt.app.logger.setLevel(logging.INFO)
@@ -27,31 +65,56 @@ async def main() -> None:
     with open("search_location_prices.json", "r") as file:
         search_location_prices = json.load(file)
 
-    cache = rightmove.property_cache.PropertyCache("history.json", args.reset)
-    rightmove_app = flathunt.app.App(
-        list(locations.values()), cache, tfl_app_key=os.environ["FLATHUNT__TFL_API_KEY"]
+    # Listings seen close together are saved together, and the rest on closing.
+    cache = rightmove.property_cache.open_property_cache(
+        args.history,
+        args.reset,
+        compact=args.compact_history,
+        flush_interval=_HISTORY_FLUSH_INTERVAL,
     )
     # These location IDs can be found by inspecting the URL
     # of a search result on rightmove.
     with open(args.search_locations, "r") as file:
         search_locations = json.load(file)
 
-    try:
-        for location, location_id in search_locations.items():
-            print(f"Searching for properties near {location}...", flush=True)
-            await rightmove_app.search(
-                location,
-                location_id,
-                search_location_prices.get(location, args.default_max_price),
-                0.5,
-                7,
-                journey_coordinates=locations,
-                max_journey_timedelta=datetime.timedelta(
-                    minutes=args.max_journey_minutes
-                ),
-            )
-    except KeyboardInterrupt:
-        pass
+    response_cache = (
+        rightmove.response_cache.ResponseCache(
+            args.response_cache, offline=args.offline
+        )
+        if args.response_cache
+        else None
+    )
+    metrics = rightmove.metrics.RequestMetrics()
+    async with flathunt.app.App(
+        list(locations.values()),
+        cache,
+        tfl_app_key=os.environ["FLATHUNT__TFL_API_KEY"],
+        rightmove_api=rightmove.api.AsyncRightmove(
+            response_cache=response_cache, metrics=metrics
+        ),
+    ) as rightmove_app:
+        try:
+            for location, location_id in search_locations.items():
+                print(f"Searching for properties near {location}...", flush=True)
+                await rightmove_app.search(
+                    location,
+                    location_id,
+                    search_location_prices.get(location, args.default_max_price),
+                    0.5,
+                    7,
+                    journey_coordinates=locations,
+                    max_journey_timedelta=datetime.timedelta(
+                        minutes=args.max_journey_minutes
+                    ),
+                )
+        except KeyboardInterrupt:
+            pass
+        finally:
+            cache.close()
+            if response_cache:
+                response_cache.close()
+            if args.metrics:
+                metrics.dump(args.metrics)
 
 
 if __name__ == "__main__":
@@ -1,136 +1,354 @@
 import argparse
+import concurrent.futures
 import datetime
-import itertools
+import functools
 import json
+import math
 import operator
 import os
-import random
-import time
+import urllib.parse
 from collections.abc import Collection, Iterable
+from typing import Optional
 
 import tenacity
 import tqdm
 
+import flathunt.coverage
+import flathunt.crawl_journal
 import flathunt.io
+import flathunt.tile_cache
 import rightmove.api
+import rightmove.governor
+import rightmove.metrics
 import rightmove.models
+import rightmove.response_cache
+
+
+_MIN_TILE_DEGREES = 1e-5
+"Tiles smaller than about a metre across are not split any further."
+
+_SPLIT_FILL = 0.75
+"""Fraction of a map search each part of a split tile is sized to fill.
+
+The locations an overflowing search returns are only a sample of where its
+results are, so parts are left some headroom.
+"""
+
+_MAX_IDENTIFIER_LENGTH = 2000
+"Longest URL encoded location identifier to search a tile with."
+
+_SIMPLIFY_TOLERANCE = 1e-5
+"Degrees boundaries may be moved by to shorten their location identifiers."
+
+_DEFAULT_REFRESH_AGE = datetime.timedelta(days=7)
+"Download the details of properties again after this long, even if unchanged."
+
+_MOVED_DEGREES = 1e-6
+"A property whose map location is further from its details has changed."
 
 
 def _map_search(
     api: rightmove.api.Rightmove,
     code_boundaries: Collection[tuple[str, list[tuple[float, float]]]],
     historical_properties: Iterable[rightmove.models.Property],
+    max_workers: int,
+    tile_degrees: float,
+    tile_cache: Optional[flathunt.tile_cache.TileDensityCache],
+    fetch_times: Optional[dict[int, datetime.datetime]] = None,
+    refresh_age: datetime.timedelta = _DEFAULT_REFRESH_AGE,
+    journal: Optional[flathunt.crawl_journal.CrawlJournal] = None,
 ) -> list[rightmove.models.Property]:
-    property_ids: set[int] = set()
-    with tqdm.tqdm(
-        total=len(code_boundaries), desc="Searching for IDs"
-    ) as progress_bar:
-        for code, polyline in sorted(code_boundaries):
-            progress_bar.set_description(f'Searching for IDs in "{code}"')
-
-            min_long = min(vertex[0] for vertex in polyline)
-            min_lat = min(vertex[1] for vertex in polyline)
-            max_long = max(vertex[0] for vertex in polyline)
-            max_lat = max(vertex[1] for vertex in polyline)
+    """Find every property in some boundaries, and download their details.
 
-            # Call our recursive search function with the initial bounding box
-            more_property_locations = _search_area_recursive(
-                api, ((min_lat, min_long), (max_lat, max_long))
-            )
-            property_ids.update(more_property_locations)
-            progress_bar.update(1)
+    Args:
+        fetch_times: When the details of each property were last downloaded,
+            updated with those downloaded now. If given, only the properties
+            that are new, have moved, or were downloaded over `refresh_age` ago
+            are downloaded, and the rest carried forward from
+            `historical_properties`.
+        refresh_age: Age of details to download again regardless.
+        journal: Where to record each tile searched and property downloaded,
+            skipping those it already records.
+    """
+    # Boundary vertices are (longitude, latitude).
+    polygons = [
+        _simplify_for_url([(latitude, longitude) for longitude, latitude in polyline])
+        for _, polyline in code_boundaries
+    ]
+    tiles = flathunt.coverage.plan_tiles(polygons, tile_degrees)
+    property_locations = _crawl(
+        api,
+        tiles,
+        max_workers,
+        tile_cache,
+        journal,
+        flathunt.coverage.SearchArea(polygons),
+    )
 
-    for property in historical_properties:
+    historical_properties_by_id = {
+        property.id: property for property in historical_properties
+    }
+    for property in historical_properties_by_id.values():
         if (
-            property.id in property_ids
+            property.id in property_locations
             and property.lozenge_model
             and any(
                 lozenge.type == "LET_AGREED"
                 for lozenge in property.lozenge_model.matching_lozenges
             )
         ):
-            property_ids.remove(property.id)
+            del property_locations[property.id]
 
-    property_ids_list = list(property_ids)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    # Those downloaded before the crawl was interrupted, if it was.
+    downloaded = journal.properties if journal is not None else {}
+    properties = [
+        downloaded[property_id]
+        for property_id in property_locations
+        if property_id in downloaded
+    ]
+    if fetch_times is not None:
+        fetch_times.update((property.id, now) for property in properties)
+        carried_properties = [
+            historical_properties_by_id[property_id]
+            for property_id, location in property_locations.items()
+            if property_id not in downloaded
+            and property_id in historical_properties_by_id
+            and not _is_stale(
+                historical_properties_by_id[property_id],
+                location,
+                fetch_times.get(property_id),
+                now - refresh_age,
+            )
+        ]
+        tqdm.tqdm.write(
+            f"Carrying forward {len(carried_properties)} unchanged properties."
+        )
+        properties.extend(carried_properties)
+    done_ids = {property.id for property in properties}
+    property_ids_list = [
+        property_id for property_id in property_locations if property_id not in done_ids
+    ]
     property_ids_list.sort()
 
-    properties = []
     with tqdm.tqdm(
         total=len(property_ids_list), desc="Downloading Results"
     ) as progress_bar:
-        for batched_location_ids in itertools.batched(
-            property_ids_list, rightmove.api.SEARCH_BY_IDS_MAX_RESULTS
-        ):
-            more_properties = api.search_by_ids(
-                batched_location_ids,
-                "RENT",
-            )
-            properties.extend(more_properties)
-            progress_bar.update(len(more_properties))
-            _fast_sleep()
+        for property in api.search_by_ids_many(property_ids_list, "RENT"):
+            properties.append(property)
+            if fetch_times is not None:
+                fetch_times[property.id] = now
+            if journal is not None:
+                journal.record_property(property)
+            progress_bar.update(1)
+    properties.sort(key=operator.attrgetter("id"))
     return properties
 
 
-def _search_area_recursive(
+def _is_stale(
+    historical_property: rightmove.models.Property,
+    location: rightmove.models.Location,
+    fetched_at: Optional[datetime.datetime],
+    stale_before: datetime.datetime,
+) -> bool:
+    "Whether a property's details may have changed since they were downloaded."
+    return (
+        fetched_at is None
+        or fetched_at < stale_before
+        or abs(historical_property.location.latitude - location.latitude)
+        > _MOVED_DEGREES
+        or abs(historical_property.location.longitude - location.longitude)
+        > _MOVED_DEGREES
+    )
+
+
+def _crawl(
     api: rightmove.api.Rightmove,
-    bounding_box: tuple[tuple[float, float], tuple[float, float]],
-) -> set[int]:
-    min_point, max_point = bounding_box
+    bounding_boxes: Iterable[flathunt.coverage.BoundingBox],
+    max_workers: int,
+    tile_cache: Optional[flathunt.tile_cache.TileDensityCache] = None,
+    journal: Optional[flathunt.crawl_journal.CrawlJournal] = None,
+    area: Optional[flathunt.coverage.SearchArea] = None,
+) -> dict[int, rightmove.models.Location]:
+    """Find the IDs and locations of every property in some bounding boxes.
+
+    Each tile is map searched, and one with more results than a map search
+    returns is split to search in turn, into enough parts for each to likely
+    fit in one search, cut where the locations it did return are dense. Tiles
+    waiting to be searched form a frontier that up to `max_workers` threads
+    drain at once, all paced by the API's shared rate limit. With a
+    `tile_cache`, a box starts from the leaf tiles it was split into last
+    time, and each tile searched is recorded in it. With a `journal`, tiles it
+    records as searched are skipped, and their properties found from it. With
+    an `area`, each tile is searched with the outline of the area in it rather
+    than its bounding box, and tiles outside it are dropped.
+    """
+    frontier = [
+        leaf
+        for bounding_box in bounding_boxes
+        for leaf in (tile_cache.leaves(bounding_box) if tile_cache else [bounding_box])
+    ]
+    if journal is not None:
+        frontier = [tile for leaf in frontier for tile in journal.pending(leaf)]
+    if area is not None:
+        frontier = [tile for tile in frontier if area.touches(tile)]
+    # Last in, first out, so the frontier stays small.
+    frontier.reverse()
+    found: dict[int, rightmove.models.Location] = (
+        dict(journal.property_locations) if journal is not None else {}
+    )
+    running: dict[
+        concurrent.futures.Future[tuple[list[rightmove.models.PropertyLocation], int]],
+        flathunt.coverage.BoundingBox,
+    ] = {}
+    with (
+        tqdm.tqdm(
+            total=len(frontier), desc="Searching tiles", unit="tiles"
+        ) as progress_bar,
+        concurrent.futures.ThreadPoolExecutor(max_workers) as executor,
+    ):
+        try:
+            while frontier or running:
+                while frontier and len(running) < max_workers:
+                    bounding_box = frontier.pop()
+                    running[executor.submit(_search_tile, api, bounding_box, area)] = (
+                        bounding_box
+                    )
+                done, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    bounding_box = running.pop(future)
+                    property_locations, result_count = future.result()
+                    overflowing = result_count > rightmove.api.SEARCH_MAP_MAX_RESULTS
+                    children = (
+                        _split_tile(bounding_box, property_locations, result_count)
+                        if overflowing and _tile_size(bounding_box) > _MIN_TILE_DEGREES
+                        else []
+                    )
+                    if area is not None:
+                        children = [child for child in children if area.touches(child)]
+                    if tile_cache is not None:
+                        tile_cache.record(bounding_box, result_count, children)
+                    if journal is not None:
+                        journal.record_tile(
+                            bounding_box,
+                            children,
+                            [] if children else property_locations,
+                        )
+                    if children:
+                        frontier.extend(children)
+                        progress_bar.total += len(children)
+                    else:
+                        if overflowing:
+                            tqdm.tqdm.write(
+                                f"Only found {len(property_locations)} of "
+                                f"{result_count} properties at {bounding_box}"
+                            )
+                        found.update(
+                            (property_location.id, property_location.location)
+                            for property_location in property_locations
+                        )
+                        progress_bar.set_postfix(found=len(found))
+                    progress_bar.update(1)
+        finally:
+            for future in running:
+                future.cancel()
+    return found
 
-    # Create polyline for this bounding box
-    polyline = _create_bounding_box_polyline(min_point, max_point)
-    location_identifier = rightmove.api.polyline_identifier(polyline)
 
-    # Configure the search query
+def _search_tile(
+    api: rightmove.api.Rightmove,
+    bounding_box: flathunt.coverage.BoundingBox,
+    area: Optional[flathunt.coverage.SearchArea] = None,
+) -> tuple[list[rightmove.models.PropertyLocation], int]:
     query = rightmove.api.SearchQuery(
-        location_identifier=location_identifier,
+        location_identifier=_location_identifier(bounding_box, area),
         is_fetching=True,
         include_let_agreed=True,
         view_type="MAP",  # Ensure we're using MAP view for accurate counting
     )
+    return api.map_search(query)
 
-    # Check if we'd get too many results
-    property_locations, result_count = api.map_search(query)
-    _fast_sleep()
-    if result_count > rightmove.api.SEARCH_MAP_MAX_RESULTS:
-        # Subdivide this area into 4 quadrants
-        min_x, min_y = min_point
-        max_x, max_y = max_point
-        quadrants = _subdivide_bounding_box(min_x, min_y, max_x, max_y)
 
-        # Recursively search each quadrant
-        results = set()
-        for i, quadrant in enumerate(quadrants):
-            quadrant_results = _search_area_recursive(
-                api,
-                quadrant,
+@functools.lru_cache(maxsize=65536)
+def _location_identifier(
+    bounding_box: flathunt.coverage.BoundingBox,
+    area: Optional[flathunt.coverage.SearchArea],
+) -> str:
+    "The outline of the area in a tile, or the tile if that's too long for a URL."
+    min_point, max_point = bounding_box
+    rectangle = rightmove.api.polyline_identifier(
+        _create_bounding_box_polyline(min_point, max_point)
+    )
+    if area is None:
+        return rectangle
+    # else...
+    outline = area.outline(bounding_box)
+    if len(outline) < 3:
+        return rectangle
+    # else...
+    identifier = rightmove.api.polyline_identifier([*outline, outline[0]])
+    return (
+        identifier if _url_length(identifier) <= _MAX_IDENTIFIER_LENGTH else rectangle
+    )
+
+
+def _simplify_for_url(polygon: list[tuple[float, float]]) -> list[tuple[float, float]]:
+    """Simplify a boundary just enough for its location identifier to fit in a URL.
+
+    If it can't be simplified that much without crossing itself, its bounding
+    rectangle is searched instead.
+    """
+    min_y = min(y for y, _ in polygon)
+    min_x = min(x for _, x in polygon)
+    max_y = max(y for y, _ in polygon)
+    max_x = max(x for _, x in polygon)
+    # Simplifying by more than the boundary's span drops no more vertices.
+    span = max(max_y - min_y, max_x - min_x)
+    tolerance = _SIMPLIFY_TOLERANCE
+    while True:
+        simplified = flathunt.coverage.simplify(polygon, tolerance)
+        if (
+            len(simplified) <= 3
+            or _url_length(
+                rightmove.api.polyline_identifier([*simplified, simplified[0]])
             )
-            results.update(quadrant_results)
-            _fast_sleep()
+            <= _MAX_IDENTIFIER_LENGTH
+        ):
+            return simplified
+        # else...
+        if tolerance >= span:
+            return [(min_y, min_x), (min_y, max_x), (max_y, max_x), (max_y, min_x)]
+        # else...
+        tolerance *= 2
 
-        return results
 
-    return set(map(operator.attrgetter("id"), property_locations))
+def _url_length(location_identifier: str) -> int:
+    return len(urllib.parse.quote(location_identifier))
 
 
-def _subdivide_bounding_box(
-    min_x: float, min_y: float, max_x: float, max_y: float
-) -> list[tuple[tuple[float, float], tuple[float, float]]]:
-    mid_x = (min_x + max_x) / 2
-    mid_y = (min_y + max_y) / 2
+def _split_tile(
+    bounding_box: flathunt.coverage.BoundingBox,
+    property_locations: Iterable[rightmove.models.PropertyLocation],
+    result_count: int,
+) -> list[flathunt.coverage.BoundingBox]:
+    parts = math.ceil(
+        result_count / (rightmove.api.SEARCH_MAP_MAX_RESULTS * _SPLIT_FILL)
+    )
+    return flathunt.coverage.split(
+        bounding_box,
+        (
+            (property_location.location.latitude, property_location.location.longitude)
+            for property_location in property_locations
+        ),
+        max(parts, 2),
+    )
 
-    # Create 4 quadrants
-    # Format: ((min_long, min_lat), (max_long, max_lat))
-    return [
-        # Southwest quadrant
-        ((min_x, min_y), (mid_x, mid_y)),
-        # Southeast quadrant
-        ((mid_x, min_y), (max_x, mid_y)),
-        # Northwest quadrant
-        ((min_x, mid_y), (max_x, max_y)),
-        # Northeast quadrant
-        ((mid_x, mid_y), (max_x, max_y)),
-    ]
+
+def _tile_size(bounding_box: flathunt.coverage.BoundingBox) -> float:
+    (min_x, min_y), (max_x, max_y) = bounding_box
+    return max(max_x - min_x, max_y - min_y)
 
 
 def _create_bounding_box_polyline(
@@ -157,12 +375,6 @@ def _create_bounding_box_polyline(
     ]
 
 
-def _fast_sleep():
-    """Random sleep to avoid hitting the API too fast."""
-    if sleep := random.random():
-        time.sleep(sleep)
-
-
 if __name__ == "__main__":
     argument_parser = argparse.ArgumentParser("Fetch Rightmove Properties")
     argument_parser.add_argument(
@@ -174,7 +386,101 @@ if __name__ == "__main__":
     argument_parser.add_argument(
         "--properties", type=str, default="", help="Properties JSON file"
     )
+    argument_parser.add_argument(
+        "--max-requests-per-second",
+        type=float,
+        default=20.0,
+        help="Most Rightmove requests per second to adapt up to",
+    )
+    argument_parser.add_argument(
+        "--tile-degrees",
+        type=float,
+        default=0.02,
+        help="Size of the grid cells covering every boundary, split if too busy",
+    )
+    argument_parser.add_argument(
+        "--tile-cache",
+        type=str,
+        default=None,
+        help="Remember how busy each tile was in this JSON file, such as tiles.json",
+    )
+    argument_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        default=False,
+        help="Only download details of properties not in --properties, or that "
+        "have moved or are due a refresh",
+    )
+    argument_parser.add_argument(
+        "--refresh-days",
+        type=float,
+        default=_DEFAULT_REFRESH_AGE.days,
+        help="Days after which --incremental downloads details again",
+    )
+    argument_parser.add_argument(
+        "--fetch-times",
+        type=str,
+        default=None,
+        help="Remember when each property was downloaded in this JSON file, such "
+        "as fetch_times.json, for --incremental",
+    )
+    argument_parser.add_argument(
+        "--journal",
+        type=str,
+        default=None,
+        help="Record the progress of the crawl in this JSON lines file, such as "
+        "crawl_journal.jsonl",
+    )
+    resume = argument_parser.add_mutually_exclusive_group()
+    resume.add_argument(
+        "--resume",
+        action="store_true",
+        default=False,
+        help="Continue the crawl recorded in --journal, run with the same arguments",
+    )
+    resume.add_argument(
+        "--restart",
+        action="store_true",
+        default=False,
+        help="Start again, discarding an unfinished crawl recorded in --journal",
+    )
+    argument_parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=8,
+        help="Map searches to have in flight at once",
+    )
+    argument_parser.add_argument(
+        "--response-cache",
+        type=str,
+        default=None,
+        help="Cache Rightmove responses in this SQLite file, such as responses.sqlite",
+    )
+    argument_parser.add_argument(
+        "--offline",
+        action="store_true",
+        default=False,
+        help="Only use cached Rightmove responses, from --response-cache",
+    )
+    argument_parser.add_argument(
+        "--base-url",
+        type=str,
+        default=None,
+        help="Search this server instead, such as a fake-rightmove-server",
+    )
+    argument_parser.add_argument(
+        "--metrics",
+        type=str,
+        default="",
+        help="Write per-endpoint Rightmove request metrics to this JSON file",
+    )
     arguments = argument_parser.parse_args()
+    if arguments.offline and not arguments.response_cache:
+        argument_parser.error("--offline needs a --response-cache")
+    if arguments.incremental and not arguments.fetch_times:
+        argument_parser.error("--incremental needs --fetch-times")
+    if (arguments.resume or arguments.restart) and not arguments.journal:
+        argument_parser.error("--resume and --restart need a --journal")
     filepath = arguments.boundaries
     output = arguments.output
     if (extension := os.path.splitext(output)[1]) != ".json":
@@ -191,14 +497,88 @@ if __name__ == "__main__":
     else:
         historical_properties = []
 
-    api = rightmove.api.Rightmove(
-        retrying=tenacity.Retrying(
-            retry=tenacity.retry_if_exception_type(rightmove.api.HTTPError)
+    response_cache = (
+        rightmove.response_cache.ResponseCache(
+            arguments.response_cache, offline=arguments.offline
         )
+        if arguments.response_cache
+        else None
     )
-    properties = _map_search(
-        api,
-        list(post_code_boundaries.items()),
-        historical_properties,
+    tile_cache = (
+        flathunt.tile_cache.TileDensityCache(arguments.tile_cache)
+        if arguments.tile_cache
+        else None
+    )
+    fetch_times: Optional[dict[int, datetime.datetime]] = None
+    if arguments.incremental:
+        fetch_times = (
+            flathunt.io.load_json(dict[int, datetime.datetime], arguments.fetch_times)
+            if os.path.exists(arguments.fetch_times)
+            else {}
+        )
+    journal: Optional[flathunt.crawl_journal.CrawlJournal] = None
+    if arguments.journal:
+        try:
+            journal = flathunt.crawl_journal.CrawlJournal(
+                arguments.journal, arguments.resume, arguments.restart
+            )
+        except FileExistsError as error:
+            argument_parser.error(f"{error}, so pass --resume or --restart")
+    metrics = rightmove.metrics.RequestMetrics()
+    governor = rightmove.governor.RequestGovernor(
+        max_rate=arguments.max_requests_per_second
     )
+    # The governor paces retries, backing off after each error.
+    with rightmove.api.Rightmove(
+        retrying=tenacity.Retrying(
+            retry=tenacity.retry_if_exception_type(rightmove.api.HTTPError),
+            stop=tenacity.stop_after_attempt(8),
+            reraise=True,
+        ),
+        response_cache=response_cache,
+        metrics=metrics,
+        governor=governor,
+        base_url=arguments.base_url,
+    ) as api:
+        try:
+            properties = _map_search(
+                api,
+                list(post_code_boundaries.items()),
+                historical_properties,
+                arguments.max_workers,
+                arguments.tile_degrees,
+                tile_cache,
+                fetch_times,
+                datetime.timedelta(days=arguments.refresh_days),
+                journal,
+            )
+        finally:
+            # Even a partial crawl saves the next one some overflowing searches.
+            if tile_cache is not None:
+                tile_cache.save()
+            if journal is not None:
+                journal.close()
+            if response_cache is not None:
+                response_cache.close()
     flathunt.io.save_json(list[rightmove.models.Property], properties, output)
+    if fetch_times is not None:
+        flathunt.io.save_json(
+            dict[int, datetime.datetime], fetch_times, arguments.fetch_times
+        )
+    # The crawl is finished, so there is nothing left to resume.
+    if journal is not None:
+        journal.remove()
+    statistics = api.connection_pool.statistics
+    print(
+        f"Sent {statistics.requests} requests over "
+        f"{statistics.connections_opened} connections "
+        f"({statistics.reuse_ratio:.1%} reused)."
+    )
+    print(
+        f"Backed off {governor.statistics.backoffs} times, "
+        f"finishing at {governor.rate:.1f} requests per second."
+    )
+    if response_cache is not None:
+        print(f"Served {response_cache.statistics.hits} responses from the cache.")
+    if arguments.metrics:
+        metrics.dump(arguments.metrics)
@@ -0,0 +1,145 @@
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+
+import flathunt.cached_app
+import flathunt.io
+import flathunt.watch
+import rightmove.api
+import rightmove.models
+import rightmove.property_cache
+import tfl.api
+import tfl.cache
+
+_LOGGER = logging.getLogger(__name__)
+
+_HISTORY_FLUSH_INTERVAL = 10.0
+"Seconds a seen listing may wait to be saved with others."
+
+_JOURNEY_FLUSH_INTERVAL = 10.0
+"Seconds a new journey may wait to be saved with others."
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Watch Rightmove for new listings, checking each as it appears"
+    )
+    parser.add_argument("--reset", action="store_true", default=False)
+    parser.add_argument(
+        "--journey-cache",
+        type=str,
+        default=None,
+        help="Cache TfL journeys in this JSON file",
+    )
+    parser.add_argument(
+        "--history",
+        type=str,
+        default="history.json",
+        help="Properties seen before, kept in SQLite if it ends in .sqlite or .db",
+    )
+    parser.add_argument(
+        "--compact-history",
+        action="store_true",
+        default=False,
+        help="Keep only the IDs of properties seen before in memory",
+    )
+    parser.add_argument(
+        "--location-id",
+        type=str,
+        nargs="+",
+        required=True,
+        help="Rightmove location IDs to watch",
+    )
+    parser.add_argument(
+        "--interval-minutes",
+        type=float,
+        default=5.0,
+        help="Minutes between polls of each location",
+    )
+    parser.add_argument("--max-miles-radius", type=float, default=0.5)
+    parser.add_argument("--default-max-price", type=int, default=2200)
+    parser.add_argument("--max-journey-minutes", type=int, default=45)
+    parser.add_argument("--max-days-since-added", type=int, default=1)
+    parser.add_argument("--min-square-meters", type=int, default=0)
+    parser.add_argument("--output", type=str, default="watched.json")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, encoding="utf-8")
+    for logger in (_LOGGER, flathunt.cached_app.logger):
+        logger.setLevel(logging.INFO)
+        logger.addHandler(logging.StreamHandler())
+
+    with open("locations.json", "r") as file:
+        locations = {key: tuple(value) for key, value in json.load(file).items()}
+
+    property_cache = rightmove.property_cache.open_property_cache(
+        args.history,
+        args.reset,
+        compact=args.compact_history,
+        flush_interval=_HISTORY_FLUSH_INTERVAL,
+    )
+
+    # Journeys found close together are saved together, and the rest on closing.
+    journey_cache = (
+        tfl.cache.Cache(args.journey_cache, flush_interval=_JOURNEY_FLUSH_INTERVAL)
+        if args.journey_cache
+        else None
+    )
+    tfl_api = tfl.api.Tfl(app_key=os.environ["FLATHUNT__TFL_API_KEY"])
+    app = flathunt.cached_app.App(
+        list(locations.values()),
+        property_cache,
+        journey_cache=journey_cache,
+        tfl_api=tfl_api,
+        progress_bar=False,
+    )
+    # One page at a time, so a poll stops as soon as it is caught up.
+    rightmove_api = rightmove.api.AsyncRightmove(max_concurrent_pages=1)
+    watcher = flathunt.watch.ListingWatcher(
+        rightmove_api,
+        {
+            location_id: rightmove.api.SearchQuery(
+                location_identifier=location_id,
+                max_price=args.default_max_price,
+                radius=args.max_miles_radius,
+                is_fetching=True,
+                max_days_since_added=args.max_days_since_added,
+            )
+            for location_id in args.location_id
+        },
+        interval=args.interval_minutes * 60,
+    )
+    appropiate_properties = []
+    try:
+        async for property in app.search(
+            watcher.watch(),
+            args.default_max_price,
+            args.max_days_since_added,
+            journey_coordinates=locations,
+            max_journey_timedelta=datetime.timedelta(minutes=args.max_journey_minutes),
+            min_square_meters=args.min_square_meters,
+            # So a restarted watch doesn't report the same listings again.
+            remember=True,
+        ):
+            _LOGGER.info(
+                "Found %s", rightmove.api.property_url(property.property_url or "")
+            )
+            appropiate_properties.append(property)
+            # Saved as each is found, as watching only stops when interrupted.
+            flathunt.io.save_json(
+                list[rightmove.models.Property], appropiate_properties, args.output
+            )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        await rightmove_api.aclose()
+        property_cache.close()
+        if journey_cache is not None:
+            journey_cache.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+import json
+import os
+from collections.abc import Sequence
+from typing import TypedDict
+
+from flathunt import coverage
+
+__all__ = [
+    "TileDensityCache",
+]
+
+
+class _Tile(TypedDict):
+    result_count: int
+    children: list[list[list[float]]]
+    "Tiles it was split into, as JSON arrays."
+
+
+class TileDensityCache:
+    """Result counts of crawled tiles saved between runs, and how each was split.
+
+    A crawl can start straight from the leaf tiles a tile was last split into,
+    instead of rediscovering each level of subdivision by overflowing the map
+    search results. Only a leaf that now overflows needs splitting again.
+    """
+
+    def __init__(self, filepath: str, reset: bool = False) -> None:
+        """
+        Args:
+            filepath: JSON file, created on saving if it doesn't exist.
+            reset: Ignore any tiles saved by earlier runs.
+        """
+        self._filepath = filepath
+        self._tiles: dict[str, _Tile] = {}
+        if not reset and os.path.exists(filepath):
+            with open(filepath, "r") as file:
+                self._tiles = json.load(file)
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+    def leaves(self, tile: coverage.BoundingBox) -> list[coverage.BoundingBox]:
+        "The tiles a tile was last split into, or the tile if it wasn't split."
+        entry = self._tiles.get(_key(tile))
+        if entry is None or not entry.get("children"):
+            return [tile]
+        # else...
+        return [
+            leaf
+            for (min_y, min_x), (max_y, max_x) in entry["children"]
+            for leaf in self.leaves(((min_y, min_x), (max_y, max_x)))
+        ]
+
+    def record(
+        self,
+        tile: coverage.BoundingBox,
+        result_count: int,
+        children: Sequence[coverage.BoundingBox] = (),
+    ) -> None:
+        self._tiles[_key(tile)] = {
+            "result_count": result_count,
+            "children": [
+                [list(min_point), list(max_point)] for min_point, max_point in children
+            ],
+        }
+
+    def save(self) -> None:
+        # Write a whole new file, so an interrupted save can't corrupt the last.
+        temporary_filepath = f"{self._filepath}.tmp"
+        with open(temporary_filepath, "w") as file:
+            json.dump(self._tiles, file)
+        os.replace(temporary_filepath, self._filepath)
+
+
+def _key(tile: coverage.BoundingBox) -> str:
+    (min_y, min_x), (max_y, max_x) = tile
+    # Rounded, as the same tile may be computed with different float error.
+    return f"{min_y:.9f},{min_x:.9f},{max_y:.9f},{max_x:.9f}"
@@ -0,0 +1,111 @@
+import asyncio
+import contextlib
+import dataclasses
+import datetime
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping
+
+import rightmove.api
+import rightmove.models
+
+__all__ = [
+    "ListingWatcher",
+]
+
+
+@dataclasses.dataclass
+class _Watermark:
+    added: datetime.datetime
+    "When the newest listing found so far was added."
+    ids: set[int]
+    "The listings found that were added then."
+
+
+class ListingWatcher:
+    """Polls searches for the listings added since they were last polled.
+
+    Each search is sorted by most recent, and paging stops at the first listing
+    added before the newest one found by the last poll, so once caught up each
+    poll only costs a page of results. The first poll of a search finds every
+    listing in it, up to the newest 1000, so give each a `max_days_since_added`.
+    """
+
+    def __init__(
+        self,
+        api: rightmove.api.AsyncRightmove,
+        queries: Mapping[str, rightmove.api.SearchQuery],
+        interval: float = 300.0,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            api: Client to search with, best with `max_concurrent_pages=1` so
+                that pages after the last one needed aren't requested.
+            queries: Searches to poll by name, sorted by most recent whatever
+                their `sort_type`.
+            interval: Seconds from the start of one round of polls to the next.
+            sleep: Waits some seconds, for testing.
+            clock: Monotonic time in seconds, for testing.
+        """
+        self._api = api
+        self._queries = {
+            name: query.model_copy(
+                update={"sort_type": rightmove.api.SortType.MOST_RECENT}
+            )
+            for name, query in queries.items()
+        }
+        self._interval = interval
+        self._sleep = sleep
+        self._clock = clock
+        self._watermarks: dict[str, _Watermark] = {}
+
+    async def poll(self, name: str) -> list[rightmove.models.PropertySummary]:
+        "The listings added to a search since it was last polled, newest first."
+        watermark = newest = self._watermarks.get(name)
+        new_summaries = []
+        async with contextlib.aclosing(
+            # Unsplit, so the results stay newest first however many there are.
+            self._api.iter_search_summaries(self._queries[name], split=False)
+        ) as summaries:
+            async for summary in summaries:
+                added = summary.first_visible_date
+                if added is None:
+                    continue
+                # else...
+                if watermark is not None and added < watermark.added:
+                    # Featured listings come first, however old they are.
+                    if summary.featured_property:
+                        continue
+                    # else...
+                    break
+                if (
+                    watermark is not None
+                    and added == watermark.added
+                    and summary.id in watermark.ids
+                ):
+                    continue
+                # else...
+                new_summaries.append(summary)
+                if newest is None or added > newest.added:
+                    newest = _Watermark(added, {summary.id})
+                elif added == newest.added:
+                    newest.ids.add(summary.id)
+        if newest is not None:
+            self._watermarks[name] = newest
+        return new_summaries
+
+    async def watch(self) -> AsyncIterator[rightmove.models.PropertySummary]:
+        """Poll every search each `interval`, yielding new listings forever.
+
+        A listing found by more than one search is only yielded the first time.
+        """
+        yielded_ids: set[int] = set()
+        while True:
+            started = self._clock()
+            for name in self._queries:
+                for summary in await self.poll(name):
+                    if summary.id not in yielded_ids:
+                        yielded_ids.add(summary.id)
+                        yield summary
+            await self._sleep(max(0.0, self._interval - (self._clock() - started)))
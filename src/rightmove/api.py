@@ -1,18 +1,29 @@
-import copy
+import asyncio
+import collections
+import concurrent.futures
+import dataclasses
+import email.utils
 import enum
 import gzip
 import http
-import http.client
+import itertools
 import json
+import logging
+import time
 import urllib.parse
-from collections.abc import Iterable, Sequence
-from typing import Any, Literal, Optional
+from collections.abc import AsyncIterator, Iterable, Iterator, Sequence
+from typing import Any, Generic, Literal, Optional, TypeVar, Union
 
+import httpx
 import polyline as _polyline
 import pydantic
-from tenacity import Retrying
+from tenacity import AsyncRetrying, Retrying
 
+from rightmove import connection_pool as _connection_pool
+from rightmove import governor as _governor
+from rightmove import metrics as _metrics
 from rightmove import models
+from rightmove import response_cache as _response_cache
 
 __all__ = [
     "SEARCH_LIST_MAX_RESULTS",
@@ -26,6 +37,8 @@ __all__ = [
     "PropertyType",
     "SearchQuery",
     "Rightmove",
+    "AsyncRightmove",
+    "get_pooled_client",
     "polyline_identifier",
     "property_url",
 ]
@@ -40,8 +53,38 @@ SEARCH_MAP_MAX_RESULTS = 499
 SEARCH_BY_IDS_MAX_RESULTS = 25
 "The maximum number of results the by IDs API will return up to."
 
+_OPEN_PRICE_PIVOT = 4000
+"Where to first split a search with no max price that has too many results."
 
-class HTTPError(Exception): ...
+logger = logging.getLogger(__name__)
+
+_SearchResults = TypeVar(
+    "_SearchResults",
+    models.PropertySearchResults,
+    models.PropertySummarySearchResults,
+    models.PropertyLocationSearchResults,
+)
+_SearchPage = Union[
+    models.PropertySearchResults,
+    models.PropertySummarySearchResults,
+    models.PropertyLocationSearchResults,
+]
+_Listing = TypeVar(
+    "_Listing", models.Property, models.PropertySummary, models.PropertyLocation
+)
+
+
+class HTTPError(Exception):
+    def __init__(
+        self,
+        message: str,
+        status: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        "Seconds the server asked to wait before retrying, if it said."
 
 
 class SortType(enum.IntEnum):
@@ -140,12 +183,66 @@ def polyline_identifier(polyline: list[tuple[float, float]]) -> str:
 
 
 class Rightmove:
-    def __init__(self, retrying: Optional[Retrying] = None) -> None:
-        self._raw_api = _RawRightmove()
+    def __init__(
+        self,
+        retrying: Optional[Retrying] = None,
+        connection_pool: Optional[_connection_pool.ConnectionPool] = None,
+        max_concurrent_pages: int = 4,
+        response_cache: Optional[_response_cache.ResponseCache] = None,
+        metrics: Optional[_metrics.RequestMetrics] = None,
+        governor: Optional[_governor.RequestGovernor] = None,
+        base_url: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            retrying (Retrying): Optional retry policy wrapped around each request.
+            connection_pool (ConnectionPool): Keep-alive connections to share,
+                defaulting to a new pool owned by this client.
+            max_concurrent_pages (int): Maximum LIST pages or by IDs batches
+                fetched at once.
+            response_cache (ResponseCache): Optional cache to serve repeated
+                requests from.
+            metrics (RequestMetrics): Optional per-endpoint statistics to
+                record each request and retry in.
+            governor (RequestGovernor): Optional adaptive rate limit to pace
+                each request sent to the server, after the cache, by.
+            base_url (str): Send every request to this server instead, such as
+                "http://127.0.0.1:8080" for a
+                `rightmove.fake_server.FakeRightmoveServer`.
+        """
+        self._raw_api = _RawRightmove(
+            connection_pool,
+            max_concurrent_pages,
+            response_cache,
+            metrics,
+            governor,
+            base_url,
+        )
+        self._owns_connection_pool = connection_pool is None
         if retrying is not None:
-            self._raw_api.lookup = retrying.wraps(self._raw_api.lookup)
-            self._raw_api.search = retrying.wraps(self._raw_api.search)
-            self._raw_api.by_ids = retrying.wraps(self._raw_api.by_ids)
+            if metrics is not None:
+                retrying = metrics.count_retries(retrying)
+            self._raw_api._request = retrying.wraps(self._raw_api._request)
+
+    @property
+    def metrics(self) -> Optional[_metrics.RequestMetrics]:
+        return self._raw_api.metrics
+
+    @property
+    def connection_pool(self) -> _connection_pool.ConnectionPool:
+        return self._raw_api.connection_pool
+
+    def close(self) -> None:
+        """Close the idle keep-alive connections in the connection pool, if this
+        client created it, as one passed in may still be shared."""
+        if self._owns_connection_pool:
+            self._raw_api.connection_pool.close()
+
+    def __enter__(self) -> "Rightmove":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
 
     def lookup(
         self,
@@ -161,8 +258,7 @@ class Rightmove:
         Returns:
             models.LookupMatches: Matches
         """
-        lookup_results = self._raw_api.lookup(query=query, limit=limit)
-        return models.LookupMatches.model_validate(lookup_results)
+        return self._raw_api.lookup(query=query, limit=limit)
 
     def search(
         self,
@@ -170,19 +266,66 @@ class Rightmove:
     ) -> list[models.Property]:
         """Search for properties using the provided configuration.
 
+        A LIST search can only page through its first 1000 results, so a search
+        with more is split by price and then bedrooms into disjoint searches that
+        each fit, which run concurrently. Their results are then merged and
+        deduplicated by property ID, so they are no longer in `sort_type` order.
+
         Args:
             query (SearchQuery): Search configuration parameters
 
         Returns:
-            list[models.Property]: List of properties matching the search criteria
-                of up to a max length of 1000.
+            list[models.Property]: List of properties matching the search criteria.
+        """
+        query = query.model_copy(update={"view_type": "LIST"})
+        return self._raw_api.search(query, models.PropertySearchResults).properties
+
+    def iter_search(
+        self,
+        query: SearchQuery,
+    ) -> Iterator[models.Property]:
+        """Like `search`, but yields properties as each page arrives.
+
+        Later pages keep downloading in the background while the caller
+        consumes earlier ones, and no page is kept once it has been yielded.
+
+        Args:
+            query (SearchQuery): Search configuration parameters
+
+        Yields:
+            models.Property: Properties matching the search criteria in page
+                order.
+        """
+        query = query.model_copy(update={"view_type": "LIST"})
+        for page in self._raw_api.iter_search(query, models.PropertySearchResults):
+            yield from page.properties
+
+    def iter_search_summaries(
+        self,
+        query: SearchQuery,
+        split: bool = True,
+    ) -> Iterator[models.PropertySummary]:
+        """Like `iter_search`, but yields cheaper summaries to filter.
+
+        Call `models.PropertySummary.to_property` for the full property of any
+        summary that is kept.
+
+        Args:
+            query (SearchQuery): Search configuration parameters
+            split (bool): Split a search with more results than can be paged
+                into parts, which are yielded one after another. Turn it off to
+                keep the results in the query's sort order, though only the
+                first 1000 can then be returned.
+
+        Yields:
+            models.PropertySummary: Summaries of the properties matching the
+                search criteria in page order.
         """
         query = query.model_copy(update={"view_type": "LIST"})
-        search_results = self._raw_api.search(query=query)
-        return [
-            models.Property.model_validate(property)
-            for property in search_results["properties"]
-        ]
+        for page in self._raw_api.iter_search(
+            query, models.PropertySummarySearchResults, split
+        ):
+            yield from page.properties
 
     def map_search(
         self,
@@ -199,11 +342,10 @@ class Rightmove:
             int: Number of properties matching the search criteria.
         """
         query = query.model_copy(update={"view_type": "MAP"})
-        location_results = self._raw_api.search(query=query)
-        return [
-            models.PropertyLocation.model_validate(property)
-            for property in location_results["properties"]
-        ], int(location_results["resultCount"].replace(",", ""))
+        location_results = self._raw_api.search(
+            query, models.PropertyLocationSearchResults
+        )
+        return location_results.properties, _result_count(location_results)
 
     def search_by_ids(
         self,
@@ -211,78 +353,415 @@ class Rightmove:
         channel: Literal["RENT", "BUY"],
     ) -> list[models.Property]:
         "Note that only 25 ids can be passed at a time."
-        search_results = self._raw_api.by_ids(ids=ids, channel=channel)
-        return [
-            models.Property.model_validate(property)
-            for property in search_results["properties"]
-        ]
+        return self._raw_api.by_ids(ids=ids, channel=channel).properties
+
+    def search_by_ids_many(
+        self,
+        ids: Iterable[int],
+        channel: Literal["RENT", "BUY"],
+    ) -> Iterator[models.Property]:
+        """Like `search_by_ids`, but for any number of IDs.
+
+        The IDs are split into batches of `SEARCH_BY_IDS_MAX_RESULTS`, and up to
+        `max_concurrent_pages` batches are fetched at once. Each batch is its own
+        request, so it is retried on its own by any `retrying` policy.
+
+        Args:
+            ids (Iterable[int]): Property IDs, which may be a lazy iterable.
+            channel (Literal["RENT", "BUY"]): Channel to search in.
+
+        Yields:
+            models.Property: Properties as each batch arrives, so not in the
+                order of `ids`.
+        """
+        for search_results in self._raw_api.iter_by_ids(ids=ids, channel=channel):
+            yield from search_results.properties
+
+
+class AsyncRightmove:
+    """Non-blocking counterpart of `Rightmove` for use inside an event loop."""
+
+    def __init__(
+        self,
+        retrying: Optional[AsyncRetrying] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        max_concurrent_pages: int = 4,
+        response_cache: Optional[_response_cache.ResponseCache] = None,
+        metrics: Optional[_metrics.RequestMetrics] = None,
+        governor: Optional[_governor.RequestGovernor] = None,
+        base_url: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            retrying (AsyncRetrying): Optional retry policy wrapped around each
+                request.
+            client (httpx.AsyncClient): Pooled client to share, defaulting to
+                `get_pooled_client()`.
+            max_concurrent_pages (int): Maximum LIST pages or by IDs batches
+                fetched at once.
+            response_cache (ResponseCache): Optional cache to serve repeated
+                requests from.
+            metrics (RequestMetrics): Optional per-endpoint statistics to
+                record each request and retry in.
+            governor (RequestGovernor): Optional adaptive rate limit to pace
+                each request sent to the server, after the cache, by.
+            base_url (str): See `Rightmove`.
+        """
+        self._raw_api = _AsyncRawRightmove(
+            client, max_concurrent_pages, response_cache, metrics, governor, base_url
+        )
+        self._owns_client = client is None
+        if retrying is not None:
+            if metrics is not None:
+                retrying = metrics.count_retries(retrying)
+            self._raw_api._request = retrying.wraps(self._raw_api._request)
+
+    @property
+    def metrics(self) -> Optional[_metrics.RequestMetrics]:
+        return self._raw_api.metrics
+
+    async def lookup(
+        self,
+        query: str,
+        limit: Optional[int] = None,
+    ) -> models.LookupMatches:
+        "See `Rightmove.lookup`."
+        return await self._raw_api.lookup(query=query, limit=limit)
+
+    async def search(
+        self,
+        query: SearchQuery,
+    ) -> list[models.Property]:
+        "See `Rightmove.search`."
+        query = query.model_copy(update={"view_type": "LIST"})
+        search_results = await self._raw_api.search(query, models.PropertySearchResults)
+        return search_results.properties
+
+    async def iter_search(
+        self,
+        query: SearchQuery,
+    ) -> AsyncIterator[models.Property]:
+        "See `Rightmove.iter_search`."
+        query = query.model_copy(update={"view_type": "LIST"})
+        async for page in self._raw_api.iter_search(
+            query, models.PropertySearchResults
+        ):
+            for property in page.properties:
+                yield property
+
+    async def iter_search_summaries(
+        self,
+        query: SearchQuery,
+        split: bool = True,
+    ) -> AsyncIterator[models.PropertySummary]:
+        "See `Rightmove.iter_search_summaries`."
+        query = query.model_copy(update={"view_type": "LIST"})
+        async for page in self._raw_api.iter_search(
+            query, models.PropertySummarySearchResults, split
+        ):
+            for summary in page.properties:
+                yield summary
+
+    async def map_search(
+        self,
+        query: SearchQuery,
+    ) -> tuple[list[models.PropertyLocation], int]:
+        "See `Rightmove.map_search`."
+        query = query.model_copy(update={"view_type": "MAP"})
+        location_results = await self._raw_api.search(
+            query, models.PropertyLocationSearchResults
+        )
+        return location_results.properties, _result_count(location_results)
+
+    async def search_by_ids(
+        self,
+        ids: Iterable[int],
+        channel: Literal["RENT", "BUY"],
+    ) -> list[models.Property]:
+        "Note that only 25 ids can be passed at a time."
+        search_results = await self._raw_api.by_ids(ids=ids, channel=channel)
+        return search_results.properties
+
+    async def search_by_ids_many(
+        self,
+        ids: Iterable[int],
+        channel: Literal["RENT", "BUY"],
+    ) -> AsyncIterator[models.Property]:
+        "See `Rightmove.search_by_ids_many`."
+        async for search_results in self._raw_api.iter_by_ids(ids=ids, channel=channel):
+            for property in search_results.properties:
+                yield property
+
+    async def aclose(self) -> None:
+        """Close the pooled client, if this client created it, as one passed in
+        may still be shared."""
+        if self._owns_client:
+            await self._raw_api.client.aclose()
+
+    async def __aenter__(self) -> "AsyncRightmove":
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        await self.aclose()
 
 
 def property_url(property_url: str) -> str:
     return f"https://{_RawRightmove.BASE_HOST}{property_url}"
 
 
-class _RawRightmove:
+def _result_count(response: _SearchPage) -> int:
+    return int((response.result_count or "0").replace(",", ""))
+
+
+def _get_page_indexes(
+    first_page: _SearchPage,
+    params: dict[str, Any],
+) -> range:
+    """The LIST page indexes still to fetch after the first page.
+
+    Pages start every `numberOfPropertiesPerPage` results, and no page starting
+    at or beyond `SEARCH_LIST_MAX_RESULTS` is served.
+    """
+    page_size = params["numberOfPropertiesPerPage"]
+    return range(
+        page_size,
+        min(_result_count(first_page), SEARCH_LIST_MAX_RESULTS),
+        page_size,
+    )
+
+
+def _split_search_query(
+    query: SearchQuery,
+) -> Optional[tuple[SearchQuery, SearchQuery]]:
+    """Split a query into two disjoint halves, by price and then by bedrooms.
+
+    Returns:
+        Optional[tuple[SearchQuery, SearchQuery]]: The lower and upper halves,
+            or None when neither range can be split further.
+    """
+    # A max price of 0 is not sent to the API, so it means "no max" and the
+    #  lower half's max price must be at least 1.
+    if not query.max_price:
+        pivot = max(2 * query.min_price, _OPEN_PRICE_PIVOT)
+    else:
+        pivot = (query.min_price + query.max_price) // 2
+    if pivot >= 1 and (not query.max_price or pivot < query.max_price):
+        return (
+            query.model_copy(update={"max_price": pivot}),
+            query.model_copy(update={"min_price": pivot + 1}),
+        )
+    # else...
+    if query.min_bedrooms < query.max_bedrooms:
+        pivot = (query.min_bedrooms + query.max_bedrooms) // 2
+        return (
+            query.model_copy(update={"max_bedrooms": pivot}),
+            query.model_copy(update={"min_bedrooms": pivot + 1}),
+        )
+    # else...
+    return None
+
+
+def _split_overflowing_query(
+    query: SearchQuery,
+    first_page: _SearchPage,
+) -> Optional[tuple[SearchQuery, SearchQuery]]:
+    "Split a LIST query whose first page reports more results than can be paged."
+    if query.view_type != "LIST":
+        return None
+    # else...
+    result_count = _result_count(first_page)
+    if result_count <= SEARCH_LIST_MAX_RESULTS:
+        return None
+    # else...
+    halves = _split_search_query(query)
+    if halves is None:
+        logger.warning(
+            "Search for %s has %d results but cannot be split further, "
+            "so only the first %d will be returned",
+            query.location_identifier,
+            result_count,
+            SEARCH_LIST_MAX_RESULTS,
+        )
+    return halves
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    "Seconds to wait from a Retry-After header of either seconds or a date."
+    if value is None:
+        return None
+    # else...
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def _drop_seen(properties: list[_Listing], seen_ids: set[int]) -> list[_Listing]:
+    "Drop properties already returned by another part of a split search."
+    new_properties = []
+    for property in properties:
+        if property.id not in seen_ids:
+            seen_ids.add(property.id)
+            new_properties.append(property)
+    return new_properties
+
+
+@dataclasses.dataclass(eq=False)
+class _SearchPart(Generic[_SearchResults]):
+    "One query of a split search that fits under the LIST results cap."
+
+    params: dict[str, Any]
+    indexes: collections.deque[int]
+    "Indexes of the pages not yet released, in order."
+    pages: dict[int, _SearchResults] = dataclasses.field(default_factory=dict)
+    "Pages that arrived before an earlier page of this part."
+
+
+@dataclasses.dataclass(frozen=True, eq=False)
+class _SearchRequest(Generic[_SearchResults]):
+    params: dict[str, Any]
+    query: Optional[SearchQuery] = None
+    "Set when this is the first page of a query that may still need splitting."
+    part: Optional[_SearchPart[_SearchResults]] = None
+    index: int = 0
+
+
+class _SearchScheduler(Generic[_SearchResults]):
+    """Decides which search pages to request next, without doing any I/O.
+
+    The first page of each query is requested before any further pages, so
+    every part of a split search starts as early as possible. A part's pages
+    are released in index order, interleaved with other parts' pages, and at
+    most `max_outstanding` pages are requested but not yet released at once.
+    """
+
+    def __init__(
+        self,
+        raw_api: "_BaseRawRightmove",
+        query: SearchQuery,
+        max_outstanding: int,
+        split: bool = True,
+    ) -> None:
+        self._raw_api = raw_api
+        self._max_outstanding = max_outstanding
+        self._split = split
+        self._queries = collections.deque([query])
+        self._pages: collections.deque[tuple[_SearchPart[_SearchResults], int]] = (
+            collections.deque()
+        )
+        self._outstanding = 0
+        self._seen_ids: Optional[set[int]] = None
+
+    def next_request(self) -> Optional[_SearchRequest[_SearchResults]]:
+        if self._outstanding >= self._max_outstanding:
+            return None
+        # else...
+        if self._queries:
+            query = self._queries.popleft()
+            request = _SearchRequest(
+                self._raw_api._get_search_params(query), query=query
+            )
+        elif self._pages:
+            part, index = self._pages.popleft()
+            request = _SearchRequest(
+                {**part.params, "index": index}, part=part, index=index
+            )
+        else:
+            return None
+        self._outstanding += 1
+        return request
+
+    def complete(
+        self, request: _SearchRequest[_SearchResults], response: _SearchResults
+    ) -> list[_SearchResults]:
+        "Record a response and return any pages now ready, in order."
+        if request.query is not None:
+            halves = (
+                _split_overflowing_query(request.query, response)
+                if self._split
+                else None
+            )
+            if halves is not None:
+                # Parts of a split search can overlap, so drop repeats.
+                self._seen_ids = self._seen_ids or set()
+                # Split depth first, so the first part streams after as few
+                #  probes as possible.
+                self._queries.extendleft(reversed(halves))
+                self._outstanding -= 1
+                return []
+            # else...
+            if request.params["viewType"] == "MAP":
+                # MAP doesn't support pagination, so you'll
+                #  only get the first page of results.
+                indexes = collections.deque()
+            else:
+                indexes = collections.deque(_get_page_indexes(response, request.params))
+            part = _SearchPart[_SearchResults](request.params, indexes)
+            self._pages.extend((part, index) for index in indexes)
+            return [self._release(response)]
+        # else...
+        part = request.part
+        assert part is not None
+        part.pages[request.index] = response
+        ready = []
+        while part.indexes and part.indexes[0] in part.pages:
+            ready.append(self._release(part.pages.pop(part.indexes.popleft())))
+        return ready
+
+    def _release(self, page: _SearchResults) -> _SearchResults:
+        self._outstanding -= 1
+        if self._seen_ids is not None:
+            page.properties = _drop_seen(page.properties, self._seen_ids)
+        return page
+
+
+class _BaseRawRightmove:
     BASE_HOST = "www.rightmove.co.uk"
     LOS_HOST = "los.rightmove.co.uk"
     LOS_LIMIT = 20
     "The maximum search results the lookup service will return."
+    HEADERS = {
+        "User-Agent": "IAmLookingToRent/0.0.0",
+        "Accept-Encoding": "gzip",
+        "Accept": "*/*",
+        "Connection": "keep-alive",
+    }
 
-    def lookup(self, query: str, limit: Optional[int] = None) -> dict[str, Any]:
-        """Get the location IDs related to a search query.
+    def __init__(self, base_url: Optional[str] = None) -> None:
+        self.scheme = "https"
+        self.base_host = self.BASE_HOST
+        self.lookup_host = self.LOS_HOST
+        if base_url is not None:
+            # One server stands in for every Rightmove host.
+            url = urllib.parse.urlsplit(base_url)
+            self.scheme = url.scheme
+            self.base_host = self.lookup_host = url.netloc
 
-        Args:
-            query (str): Search location query.
-            limit (int): Limit, defaulting to the API max limit.
-
-        Returns:
-            dict[str, Any]: Matches
-        """
-        connection = http.client.HTTPSConnection(self.LOS_HOST, port=443)
-        try:
-            return self._request(
-                connection,
-                "GET",
-                "/typeahead",
-                {
-                    "query": query,
-                    "limit": limit or self.LOS_LIMIT,
-                    "exclude": "",
-                },
-            )
-        finally:
-            connection.close()
+    def property_url(self, property_url: str) -> str:
+        return f"https://{self.BASE_HOST}{property_url}"
 
-    def search(
-        self,
-        query: SearchQuery,
-    ) -> dict[str, Any]:
-        params = self._get_search_params(query)
-        return self._search(params)
+    def _get_lookup_params(self, query: str, limit: Optional[int]) -> dict[str, Any]:
+        return {
+            "query": query,
+            "limit": limit or self.LOS_LIMIT,
+            "exclude": "",
+        }
 
-    def by_ids(
+    def _get_by_ids_params(
         self,
         ids: Iterable[int],
         channel: Literal["RENT", "BUY"],
     ) -> dict[str, Any]:
-        params = {
+        return {
             "channel": channel,
             "propertyIds": ",".join(map(str, ids)),
             "viewType": "MAP",
         }
-        connection = http.client.HTTPSConnection(self.BASE_HOST, port=443)
-        try:
-            return self._request(
-                connection,
-                "GET",
-                "/api/_searchByIds",
-                params,
-            )
-        finally:
-            connection.close()
-
-    def property_url(self, property_url: str) -> str:
-        return f"https://{self.BASE_HOST}{property_url}"
 
     def _get_search_params(self, query: SearchQuery) -> dict[str, Any]:
         params = {
@@ -323,76 +802,445 @@ class _RawRightmove:
             params["maxDaysSinceAdded"] = query.max_days_since_added
         if query.min_bedrooms:
             params["minBedrooms"] = query.min_bedrooms
-        if query.max_bedrooms:
-            params["maxBedrooms"] = query.max_bedrooms
+        params["maxBedrooms"] = query.max_bedrooms
         if query.min_bathrooms:
             params["minBathrooms"] = query.min_bathrooms
         if query.max_bathrooms:
             params["maxBathrooms"] = query.max_bathrooms
         return params
 
-    def _search(self, params: dict[str, Any]) -> dict[str, Any]:
-        connection = http.client.HTTPSConnection(self.BASE_HOST, port=443)
+    def _get_search_endpoint(self, params: dict[str, Any]) -> str:
+        return {
+            "LIST": "/api/_search",
+            "MAP": "/api/_mapSearch",
+        }[params["viewType"]]
+
+    def _get_url(self, url: str, parameters: dict[str, Any]) -> str:
+        query_string = urllib.parse.urlencode(parameters, doseq=True)
+        urlparse = urllib.parse.urlparse(url)
+        urlparse = urlparse._replace(query=query_string)
+        return urllib.parse.urlunparse(urlparse)
+
+
+class _RawRightmove(_BaseRawRightmove):
+    def __init__(
+        self,
+        connection_pool: Optional[_connection_pool.ConnectionPool] = None,
+        max_concurrent_pages: int = 4,
+        response_cache: Optional[_response_cache.ResponseCache] = None,
+        metrics: Optional[_metrics.RequestMetrics] = None,
+        governor: Optional[_governor.RequestGovernor] = None,
+        base_url: Optional[str] = None,
+    ) -> None:
+        super().__init__(base_url)
+        if connection_pool is None:
+            connection_pool = (
+                _connection_pool.ConnectionPool(
+                    connection_factory=_connection_pool.http_connection
+                )
+                if self.scheme == "http"
+                else _connection_pool.ConnectionPool()
+            )
+        self.connection_pool = connection_pool
+        self.response_cache = response_cache
+        self.metrics = metrics
+        self.governor = governor
+        self._max_concurrent_pages = max_concurrent_pages
+
+    def lookup(self, query: str, limit: Optional[int] = None) -> models.LookupMatches:
+        """Get the location IDs related to a search query.
+
+        Args:
+            query (str): Search location query.
+            limit (int): Limit, defaulting to the API max limit.
+
+        Returns:
+            models.LookupMatches: Matches
+        """
+        return models.LookupMatches.model_validate_json(
+            self._request(
+                self.lookup_host,
+                "GET",
+                "/typeahead",
+                self._get_lookup_params(query, limit),
+            )
+        )
+
+    def search(
+        self,
+        query: SearchQuery,
+        response_type: type[_SearchResults],
+    ) -> _SearchResults:
+        "Every page of results merged into the first page's response."
+        pages = self.iter_search(query, response_type)
+        response = next(pages)
+        for page in pages:
+            response.properties.extend(page.properties)
+        return response
+
+    def iter_search(
+        self,
+        query: SearchQuery,
+        response_type: type[_SearchResults],
+        split: bool = True,
+    ) -> Iterator[_SearchResults]:
+        """Yield pages of results as they arrive.
+
+        At most `max_concurrent_pages` requests run at once, and at most that
+        many pages are fetched ahead of the caller. Unless `split` is False, a
+        LIST query with more results than can be paged is split into parts,
+        which are yielded one after the other rather than in the query's order.
+        """
+        scheduler = _SearchScheduler[_SearchResults](
+            self, query, self._max_concurrent_pages, split
+        )
+        running: dict[
+            concurrent.futures.Future[_SearchResults], _SearchRequest[_SearchResults]
+        ] = {}
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self._max_concurrent_pages
+        ) as executor:
+
+            def submit() -> None:
+                while (request := scheduler.next_request()) is not None:
+                    future = executor.submit(
+                        self._search_page, request.params, response_type
+                    )
+                    running[future] = request
+
+            try:
+                submit()
+                while running:
+                    done, _ = concurrent.futures.wait(
+                        running, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    pages = []
+                    for future in done:
+                        pages.extend(
+                            scheduler.complete(running.pop(future), future.result())
+                        )
+                    # Start the next requests before handing pages back.
+                    submit()
+                    yield from pages
+            finally:
+                # The caller may stop early, so drop pages not yet started.
+                for future in running:
+                    future.cancel()
+
+    def by_ids(
+        self,
+        ids: Iterable[int],
+        channel: Literal["RENT", "BUY"],
+    ) -> models.PropertySearchResults:
+        return models.PropertySearchResults.model_validate_json(
+            self._request(
+                self.base_host,
+                "GET",
+                "/api/_searchByIds",
+                self._get_by_ids_params(ids, channel),
+            )
+        )
+
+    def iter_by_ids(
+        self,
+        ids: Iterable[int],
+        channel: Literal["RENT", "BUY"],
+    ) -> Iterator[models.PropertySearchResults]:
+        """Yield the results of each batch of IDs as it arrives.
+
+        At most `max_concurrent_pages` batches are requested but not yet yielded
+        at once, so `ids` is only consumed as fast as the caller keeps up.
+        """
+        batches = itertools.batched(ids, SEARCH_BY_IDS_MAX_RESULTS)
+        running: set[concurrent.futures.Future[models.PropertySearchResults]] = set()
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self._max_concurrent_pages
+        ) as executor:
+
+            def submit() -> None:
+                while len(running) < self._max_concurrent_pages and (
+                    batch := next(batches, None)
+                ):
+                    running.add(executor.submit(self.by_ids, batch, channel))
+
+            try:
+                submit()
+                while running:
+                    done, _ = concurrent.futures.wait(
+                        running, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    running.difference_update(done)
+                    submit()
+                    for future in done:
+                        yield future.result()
+            finally:
+                for future in running:
+                    future.cancel()
+
+    def _search_page(
+        self, params: dict[str, Any], response_type: type[_SearchResults]
+    ) -> _SearchResults:
+        return response_type.model_validate_json(
+            self._request(
+                self.base_host, "GET", self._get_search_endpoint(params), params
+            )
+        )
+
+    def _request(
+        self,
+        host: str,
+        method: Literal["GET"],
+        url: str,
+        parameters: dict[str, Any],
+    ) -> bytes:
+        "Get the decompressed JSON response body, for validating straight into models."
+        if self.response_cache is not None:
+            cached = self.response_cache.get(host, url, parameters)
+            if cached is not None:
+                if self.metrics is not None:
+                    self.metrics.record_cache_hit(url)
+                return cached
+        # else...
+        if self.governor is not None:
+            sent_at = self.governor.acquire()
+        start = time.perf_counter()
+        try:
+            http_response = self.connection_pool.request(
+                host,
+                method,
+                self._get_url(url, parameters),
+                headers=self.HEADERS,
+            )
+        except Exception:
+            if self.metrics is not None:
+                self.metrics.record_error(url)
+            if self.governor is not None:
+                self.governor.complete(sent_at, None)
+            raise
+        seconds = time.perf_counter() - start
+        raw_response = http_response.body
+        if (
+            http_response.status == http.HTTPStatus.OK
+            and http_response.headers.get("content-encoding") == "gzip"
+        ):
+            raw_response = gzip.decompress(raw_response)
+        if self.metrics is not None:
+            self.metrics.record_response(
+                url,
+                http_response.status,
+                seconds,
+                len(http_response.body),
+                len(raw_response),
+                http_response.reused,
+            )
+        retry_after = _parse_retry_after(http_response.headers.get("retry-after"))
+        if self.governor is not None:
+            self.governor.complete(sent_at, http_response.status, retry_after)
+        if http_response.status != http.HTTPStatus.OK:
+            raise HTTPError(
+                f"HTTP error {http_response.status}: {http_response.reason}",
+                http_response.status,
+                retry_after,
+            )
+        if self.response_cache is not None:
+            self.response_cache.put(host, url, parameters, raw_response)
+        return raw_response
+
+
+class _AsyncRawRightmove(_BaseRawRightmove):
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        max_concurrent_pages: int = 4,
+        response_cache: Optional[_response_cache.ResponseCache] = None,
+        metrics: Optional[_metrics.RequestMetrics] = None,
+        governor: Optional[_governor.RequestGovernor] = None,
+        base_url: Optional[str] = None,
+    ) -> None:
+        super().__init__(base_url)
+        self.client = client or get_pooled_client()
+        self.response_cache = response_cache
+        self.metrics = metrics
+        self.governor = governor
+        self._max_concurrent_pages = max_concurrent_pages
+
+    async def lookup(
+        self, query: str, limit: Optional[int] = None
+    ) -> models.LookupMatches:
+        return models.LookupMatches.model_validate_json(
+            await self._request(
+                self.lookup_host,
+                "GET",
+                "/typeahead",
+                self._get_lookup_params(query, limit),
+            )
+        )
+
+    async def search(
+        self,
+        query: SearchQuery,
+        response_type: type[_SearchResults],
+    ) -> _SearchResults:
+        "Every page of results merged into the first page's response."
+        pages = self.iter_search(query, response_type)
+        response = await anext(pages)
+        async for page in pages:
+            response.properties.extend(page.properties)
+        return response
+
+    async def iter_search(
+        self,
+        query: SearchQuery,
+        response_type: type[_SearchResults],
+        split: bool = True,
+    ) -> AsyncIterator[_SearchResults]:
+        "See `_RawRightmove.iter_search`."
+        scheduler = _SearchScheduler[_SearchResults](
+            self, query, self._max_concurrent_pages, split
+        )
+        running: dict[asyncio.Task[_SearchResults], _SearchRequest[_SearchResults]] = {}
+
+        def submit() -> None:
+            while (request := scheduler.next_request()) is not None:
+                task = asyncio.create_task(
+                    self._search_page(request.params, response_type)
+                )
+                running[task] = request
+
         try:
-            endpoint_url = {
-                "LIST": "/api/_search",
-                "MAP": "/api/_mapSearch",
-            }[params["viewType"]]
-            response = self._request(
-                connection,
+            submit()
+            while running:
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                pages = []
+                for task in done:
+                    pages.extend(scheduler.complete(running.pop(task), task.result()))
+                submit()
+                for page in pages:
+                    yield page
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def by_ids(
+        self,
+        ids: Iterable[int],
+        channel: Literal["RENT", "BUY"],
+    ) -> models.PropertySearchResults:
+        return models.PropertySearchResults.model_validate_json(
+            await self._request(
+                self.base_host,
                 "GET",
-                endpoint_url,
-                params,
+                "/api/_searchByIds",
+                self._get_by_ids_params(ids, channel),
             )
-            # MAP doesn't support pagination, so you'll
-            #  only get the first page of results.
-            if params["viewType"] == "MAP":
-                return response
-            full_response = copy.deepcopy(response)
-            while len(full_response["properties"]) < min(
-                int(response["resultCount"].replace(",", "")), SEARCH_LIST_MAX_RESULTS
+        )
+
+    async def iter_by_ids(
+        self,
+        ids: Iterable[int],
+        channel: Literal["RENT", "BUY"],
+    ) -> AsyncIterator[models.PropertySearchResults]:
+        "See `_RawRightmove.iter_by_ids`."
+        batches = itertools.batched(ids, SEARCH_BY_IDS_MAX_RESULTS)
+        running: set[asyncio.Task[models.PropertySearchResults]] = set()
+
+        def submit() -> None:
+            while len(running) < self._max_concurrent_pages and (
+                batch := next(batches, None)
             ):
-                params = copy.deepcopy(params)
-                params["index"] = int(response["pagination"]["next"])
-                response = self._request(
-                    connection,
-                    "GET",
-                    endpoint_url,
-                    params,
+                running.add(asyncio.create_task(self.by_ids(batch, channel)))
+
+        try:
+            submit()
+            while running:
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
                 )
-                full_response["properties"].extend(response["properties"])
-            return full_response
+                running.difference_update(done)
+                submit()
+                for task in done:
+                    yield task.result()
         finally:
-            connection.close()
+            for task in running:
+                task.cancel()
 
-    def _request(
+    async def _search_page(
+        self, params: dict[str, Any], response_type: type[_SearchResults]
+    ) -> _SearchResults:
+        return response_type.model_validate_json(
+            await self._request(
+                self.base_host, "GET", self._get_search_endpoint(params), params
+            )
+        )
+
+    async def _request(
         self,
-        connection: http.client.HTTPSConnection,
+        host: str,
         method: Literal["GET"],
         url: str,
         parameters: dict[str, Any],
-    ) -> Any:
-        query_string = urllib.parse.urlencode(parameters, doseq=True)
-        urlparse = urllib.parse.urlparse(url)
-        urlparse = urlparse._replace(query=query_string)
-        url = urllib.parse.urlunparse(urlparse)
-        connection.request(
-            method,
-            url,
-            headers={
-                "User-Agent": "IAmLookingToRent/0.0.0",
-                "Accept-Encoding": "gzip",
-                "Accept": "*/*",
-                "Connection": "keep-alive",
-            },
-        )
-        http_response = connection.getresponse()
-        if http_response.status != http.HTTPStatus.OK:
+    ) -> bytes:
+        "See `_RawRightmove._request`."
+        if self.response_cache is not None:
+            # SQLite blocks, so keep it off the event loop.
+            cached = await asyncio.to_thread(
+                self.response_cache.get, host, url, parameters
+            )
+            if cached is not None:
+                if self.metrics is not None:
+                    self.metrics.record_cache_hit(url)
+                return cached
+        # else...
+        if self.governor is not None:
+            sent_at = await self.governor.acquire_async()
+        start = time.perf_counter()
+        try:
+            # The query string is built here rather than by httpx so that both
+            #  clients encode parameters (e.g. booleans) identically.
+            http_response = await self.client.request(
+                method,
+                f"{self.scheme}://{host}{self._get_url(url, parameters)}",
+                headers=self.HEADERS,
+            )
+        except Exception:
+            if self.metrics is not None:
+                self.metrics.record_error(url)
+            if self.governor is not None:
+                self.governor.complete(sent_at, None)
+            raise
+        if self.metrics is not None:
+            # httpx doesn't expose whether the connection was reused.
+            self.metrics.record_response(
+                url,
+                http_response.status_code,
+                time.perf_counter() - start,
+                http_response.num_bytes_downloaded,
+                len(http_response.content),
+                None,
+            )
+        retry_after = _parse_retry_after(http_response.headers.get("retry-after"))
+        if self.governor is not None:
+            self.governor.complete(sent_at, http_response.status_code, retry_after)
+        if http_response.status_code != http.HTTPStatus.OK:
             raise HTTPError(
-                f"HTTP error {http_response.status}: {http_response.reason}"
+                f"HTTP error {http_response.status_code}: {http_response.reason_phrase}",
+                http_response.status_code,
+                retry_after,
             )
-        raw_response = http_response.read()
-        if http_response.getheader("Content-Encoding") == "gzip":
-            raw_response = gzip.decompress(raw_response)
-        response = json.loads(raw_response)
-        return response
+        # httpx has already decompressed the body.
+        if self.response_cache is not None:
+            await asyncio.to_thread(
+                self.response_cache.put, host, url, parameters, http_response.content
+            )
+        return http_response.content
+
+
+def get_pooled_client(max_connections: int = 10) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        ),
+    )
@@ -9,9 +9,10 @@ class App:
     def __init__(
         self,
         commute_coordinates: list[tuple[float, float]],
-        cache: Optional[property_cache.PropertyCache],
+        cache: Optional[property_cache.AnyPropertyCache],
+        rightmove_api: Optional[api.Rightmove] = None,
     ) -> None:
-        self._api = api.Rightmove()
+        self._api = rightmove_api or api.Rightmove()
         self._cache = cache
         self._commute_coordinates = commute_coordinates
 
@@ -20,17 +21,21 @@ class App:
         query: api.SearchQuery,
     ) -> None:
         properties = self._api.search(query)
-        new_properties = [
-            property
-            for property in properties
-            if not self._cache or not self._cache.contains_property_id(property.id)
-        ]
+        if self._cache is not None:
+            unseen_ids = set(
+                self._cache.filter_unseen(property.id for property in properties)
+            )
+            new_properties = [
+                property for property in properties if property.id in unseen_ids
+            ]
+        else:
+            new_properties = properties
         for index, property in enumerate(new_properties):
             self._show(property)
             if index != len(new_properties) - 1:
                 self._wait("Press enter for next property...")
 
-            if self._cache:
+            if self._cache is not None:
                 self._cache.add(property.model_dump(mode="json"))
 
     def _show(self, property: models.Property) -> None:
@@ -0,0 +1,193 @@
+import dataclasses
+import http.client
+import threading
+from collections.abc import Callable, Mapping
+from typing import Optional
+
+__all__ = [
+    "Response",
+    "ConnectionPoolStatistics",
+    "ConnectionPool",
+    "http_connection",
+]
+
+
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    ConnectionResetError,
+    ConnectionAbortedError,
+    BrokenPipeError,
+)
+"Errors raised when the server has silently closed an idle keep-alive connection."
+
+
+@dataclasses.dataclass(frozen=True)
+class Response:
+    status: int
+    reason: str
+    headers: dict[str, str]
+    "Response headers with lower-cased names."
+    body: bytes
+    "The raw (possibly still compressed) response body."
+    reused: bool
+    "Whether the request was sent over a previously used connection."
+
+
+@dataclasses.dataclass
+class ConnectionPoolStatistics:
+    requests: int = 0
+    connections_opened: int = 0
+    connections_reused: int = 0
+    reconnects: int = 0
+    "Number of reused connections found closed by the server and replaced."
+
+    @property
+    def reuse_ratio(self) -> float:
+        if not self.requests:
+            return 0.0
+        # else...
+        return self.connections_reused / self.requests
+
+
+def _https_connection(
+    host: str, timeout: Optional[float]
+) -> http.client.HTTPConnection:
+    return http.client.HTTPSConnection(host, port=443, timeout=timeout)
+
+
+def http_connection(host: str, timeout: Optional[float]) -> http.client.HTTPConnection:
+    "A plain HTTP connection factory, for a local server given as host:port."
+    return http.client.HTTPConnection(host, timeout=timeout)
+
+
+class ConnectionPool:
+    """Thread-safe pool of keep-alive connections, keyed by host.
+
+    A connection is checked out for the duration of one request and returned
+    afterwards, so it is only ever used by one thread at a time.
+    """
+
+    def __init__(
+        self,
+        connection_factory: Callable[
+            [str, Optional[float]], http.client.HTTPConnection
+        ] = _https_connection,
+        max_idle_per_host: int = 8,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """
+        Args:
+            connection_factory: Creates a connection from a host and timeout.
+            max_idle_per_host: Idle connections kept open per host; any more are
+                closed when they are released.
+            timeout: Socket timeout in seconds for new connections.
+        """
+        self._connection_factory = connection_factory
+        self._max_idle_per_host = max_idle_per_host
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._idle: dict[str, list[http.client.HTTPConnection]] = {}
+        self._statistics = ConnectionPoolStatistics()
+
+    @property
+    def statistics(self) -> ConnectionPoolStatistics:
+        with self._lock:
+            return dataclasses.replace(self._statistics)
+
+    def request(
+        self,
+        host: str,
+        method: str,
+        url: str,
+        headers: Mapping[str, str],
+    ) -> Response:
+        connection, reused = self._acquire(host)
+        try:
+            try:
+                response, will_close = self._send(
+                    connection, method, url, headers, reused
+                )
+                if reused:
+                    # Only counted once it has worked, as it may have been stale.
+                    with self._lock:
+                        self._statistics.connections_reused += 1
+            except _STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                # else...
+                # The server dropped the idle connection, so retry once on a
+                #  fresh one. A GET is safe to send again.
+                connection.close()
+                connection = self._connect(host, reconnect=True)
+                response, will_close = self._send(
+                    connection, method, url, headers, False
+                )
+        except BaseException:
+            connection.close()
+            raise
+        if will_close:
+            connection.close()
+        else:
+            self._release(host, connection)
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+    def __enter__(self) -> "ConnectionPool":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def _acquire(self, host: str) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            self._statistics.requests += 1
+            connections = self._idle.get(host)
+            if connections:
+                return connections.pop(), True
+        # else...
+        return self._connect(host), False
+
+    def _connect(
+        self, host: str, reconnect: bool = False
+    ) -> http.client.HTTPConnection:
+        with self._lock:
+            self._statistics.connections_opened += 1
+            if reconnect:
+                self._statistics.reconnects += 1
+        return self._connection_factory(host, self._timeout)
+
+    def _release(self, host: str, connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            connections = self._idle.setdefault(host, [])
+            if len(connections) < self._max_idle_per_host:
+                connections.append(connection)
+                return
+        # else...
+        connection.close()
+
+    def _send(
+        self,
+        connection: http.client.HTTPConnection,
+        method: str,
+        url: str,
+        headers: Mapping[str, str],
+        reused: bool,
+    ) -> tuple[Response, bool]:
+        connection.request(method, url, headers=dict(headers))
+        http_response = connection.getresponse()
+        # The body must be read in full before the connection can be reused.
+        body = http_response.read()
+        response = Response(
+            status=http_response.status,
+            reason=http_response.reason,
+            headers={key.lower(): value for key, value in http_response.getheaders()},
+            body=body,
+            reused=reused,
+        )
+        return response, http_response.will_close
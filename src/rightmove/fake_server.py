@@ -0,0 +1,398 @@
+import datetime
+import gzip
+import http
+import http.server
+import json
+import math
+import random
+import threading
+import time
+import urllib.parse
+from collections.abc import Callable, Mapping, Sequence
+from typing import Any, Optional
+
+import polyline as _polyline
+
+from rightmove import api, geometry
+
+__all__ = [
+    "synthetic_properties",
+    "FakeRightmoveServer",
+]
+
+
+_EARTH_RADIUS_MILES = 3958.8
+
+_LOCATION_RADIUS_MILES = 0.5
+"How far a `/typeahead` location reaches, before adding any search radius."
+
+_LONDON_BOUNDS = ((51.28, -0.51), (51.69, 0.33))
+"South west and north east corners of Greater London, as (latitude, longitude)."
+
+
+def synthetic_properties(
+    count: int,
+    bounds: tuple[tuple[float, float], tuple[float, float]] = _LONDON_BOUNDS,
+    seed: int = 0,
+) -> list[dict[str, Any]]:
+    """Generate random property JSON, as the search APIs would return it.
+
+    Args:
+        count: Number of properties, with IDs from 1.
+        bounds: South west and north east corners to scatter them in, as
+            (latitude, longitude).
+        seed: Seed for reproducible properties.
+    """
+    random_ = random.Random(seed)
+    (min_latitude, min_longitude), (max_latitude, max_longitude) = bounds
+    now = datetime.datetime.now(datetime.timezone.utc)
+    properties = []
+    for id in range(1, count + 1):
+        bedrooms = random_.choice((0, 1, 1, 2, 2, 2, 3, 3, 4, 5))
+        amount = 100 * random_.randint(8 + 4 * bedrooms, 20 + 10 * bedrooms)
+        properties.append(
+            {
+                "id": id,
+                "bedrooms": bedrooms,
+                "bathrooms": max(1, bedrooms - random_.randint(0, 2)),
+                "summary": f"A {bedrooms} bedroom property to rent.",
+                "displayAddress": f"{id} Synthetic Street, London",
+                "location": {
+                    "latitude": random_.uniform(min_latitude, max_latitude),
+                    "longitude": random_.uniform(min_longitude, max_longitude),
+                },
+                "price": {
+                    "amount": amount,
+                    "frequency": "monthly",
+                    "currencyCode": "GBP",
+                    "displayPrices": [
+                        {
+                            "displayPrice": f"£{amount:,} pcm",
+                            "displayPriceQualifier": "",
+                        }
+                    ],
+                },
+                "commercial": False,
+                "development": False,
+                "residential": True,
+                "students": False,
+                "auction": False,
+                "channel": "RENT",
+                "firstVisibleDate": (
+                    now - datetime.timedelta(minutes=random_.randint(0, 60 * 24 * 60))
+                ).isoformat(),
+                "saved": False,
+                "hidden": False,
+                "heading": "",
+                "propertyUrl": f"/properties/{id}#/?channel=RES_LET",
+            }
+        )
+    return properties
+
+
+class FakeRightmoveServer(http.server.ThreadingHTTPServer):
+    """Local stand-in for the Rightmove endpoints `rightmove.api` uses.
+
+    Serves `/typeahead`, `/api/_search`, `/api/_mapSearch` and
+    `/api/_searchByIds` over plain HTTP with keep-alive, for load testing a
+    client without sending it anything. Point a client at it with
+    `Rightmove(base_url=server.base_url)`. Searches are filtered by location,
+    price, bedrooms and days since added: a `USERDEFINEDAREA` by its polyline,
+    and a location from `/typeahead` by the search radius around it. Featured
+    listings are served first, as Rightmove does.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        properties: Sequence[Mapping[str, Any]],
+        locations: Optional[Mapping[str, tuple[float, float]]] = None,
+        address: tuple[str, int] = ("127.0.0.1", 0),
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        error_rate: float = 0.0,
+        max_requests_per_second: Optional[float] = None,
+        seed: int = 0,
+    ) -> None:
+        """
+        Args:
+            properties: Property JSON to serve, such as from
+                `synthetic_properties` or a saved search.
+            locations: Names of locations `/typeahead` can find, and their
+                (latitude, longitude).
+            address: Host and port to listen on, with 0 for any free port.
+            latency: Seconds to wait before every response.
+            latency_jitter: Most seconds to randomly add to the latency.
+            error_rate: Fraction of requests to answer with a 503.
+            max_requests_per_second: Rate above which requests are answered
+                with a 429 and a Retry-After, or None for no limit.
+            seed: Seed for reproducible latencies and errors.
+        """
+        super().__init__(address, _Handler)
+        self.properties = sorted(properties, key=lambda property: property["id"])
+        self.properties_by_id = {property["id"]: property for property in properties}
+        self.locations = locations or {}
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.max_requests_per_second = max_requests_per_second
+        self.requests = 0
+        "Requests received, including those answered with an error."
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = max_requests_per_second or 0.0
+        self._refilled_at = time.monotonic()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeRightmoveServer":
+        "Serve requests from a background thread."
+        # Poll often, so `stop` doesn't wait long for the loop to notice.
+        self._thread = threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+
+    def __enter__(self) -> "FakeRightmoveServer":
+        return self.start()
+
+    def __exit__(self, *_: object) -> None:
+        self.stop()
+
+    def admit(self) -> tuple[Optional[http.HTTPStatus], float]:
+        """Decide whether to fail a request, and how long to delay it.
+
+        Returns:
+            The error status to answer with, or None to answer normally, and
+            the seconds to delay by, or to retry after for a 429.
+        """
+        with self._lock:
+            self.requests += 1
+            if self.max_requests_per_second is not None:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.max_requests_per_second,
+                    self._tokens
+                    + (now - self._refilled_at) * self.max_requests_per_second,
+                )
+                self._refilled_at = now
+                if self._tokens < 1:
+                    return (
+                        http.HTTPStatus.TOO_MANY_REQUESTS,
+                        (1 - self._tokens) / self.max_requests_per_second,
+                    )
+                # else...
+                self._tokens -= 1
+            delay = self.latency + self._random.uniform(0, self.latency_jitter)
+            if self._random.random() < self.error_rate:
+                return http.HTTPStatus.SERVICE_UNAVAILABLE, delay
+            # else...
+            return None, delay
+
+    def lookup(self, parameters: Mapping[str, str]) -> dict[str, Any]:
+        query = parameters.get("query", "").lower()
+        limit = int(parameters.get("limit", 20))
+        matches = [
+            {
+                "id": str(index),
+                "type": "REGION",
+                "displayName": name,
+                "highlighting": name,
+                "highlights": [{"text": name, "highlighted": True}],
+            }
+            for index, name in enumerate(self.locations)
+            if query in name.lower()
+        ]
+        return {"matches": matches[:limit]}
+
+    def search(self, parameters: Mapping[str, str]) -> list[Mapping[str, Any]]:
+        "Every property matching a search, in the order it sorts them."
+        in_location = _location_filter(
+            parameters["locationIdentifier"],
+            float(parameters.get("radius", 0)),
+            self.locations,
+        )
+        min_price = int(parameters.get("minPrice", 0))
+        max_price = int(parameters.get("maxPrice", 0)) or math.inf
+        min_bedrooms = int(parameters.get("minBedrooms", 0))
+        max_bedrooms = int(parameters.get("maxBedrooms", 0)) or math.inf
+        added_after = (
+            (
+                datetime.datetime.now(datetime.timezone.utc)
+                - datetime.timedelta(days=int(parameters["maxDaysSinceAdded"]))
+            ).isoformat()
+            if "maxDaysSinceAdded" in parameters
+            else ""
+        )
+        properties = [
+            property
+            for property in self.properties
+            if min_price <= _price(property) <= max_price
+            and min_bedrooms <= property["bedrooms"] <= max_bedrooms
+            and in_location(property["location"])
+            and (property.get("firstVisibleDate") or "") >= added_after
+        ]
+        sort_type = api.SortType(
+            int(parameters.get("sortType", api.SortType.MOST_RECENT))
+        )
+        if sort_type in (api.SortType.LOWEST_PRICE, api.SortType.HIGHEST_PRICE):
+            properties.sort(key=_price, reverse=sort_type == api.SortType.HIGHEST_PRICE)
+        elif sort_type in (api.SortType.MOST_RECENT, api.SortType.OLDEST_LISTED):
+            properties.sort(
+                key=lambda property: property.get("firstVisibleDate") or "",
+                reverse=sort_type == api.SortType.MOST_RECENT,
+            )
+        # Featured listings come first, however they are sorted.
+        properties.sort(
+            key=lambda property: bool(property.get("featuredProperty")), reverse=True
+        )
+        return properties
+
+    def list_page(self, parameters: Mapping[str, str]) -> dict[str, Any]:
+        properties = self.search(parameters)
+        index = int(parameters.get("index", 0))
+        page_size = int(parameters.get("numberOfPropertiesPerPage", 24))
+        if index >= api.SEARCH_LIST_MAX_RESULTS:
+            raise ValueError(f"Index {index} is beyond the last page")
+        # else...
+        last_index = min(len(properties), api.SEARCH_LIST_MAX_RESULTS) - 1
+        last_index -= max(last_index, 0) % page_size
+        pagination: dict[str, Any] = {
+            "total": last_index // page_size + 1,
+            "page": str(index // page_size + 1),
+            "first": "0",
+            "last": str(max(last_index, 0)),
+        }
+        if index + page_size <= last_index:
+            pagination["next"] = str(index + page_size)
+        return {
+            "properties": properties[index : index + page_size],
+            "resultCount": f"{len(properties):,}",
+            "pagination": pagination,
+        }
+
+    def map_page(self, parameters: Mapping[str, str]) -> dict[str, Any]:
+        properties = self.search(parameters)
+        return {
+            "properties": [
+                {"id": property["id"], "location": property["location"]}
+                for property in properties[: api.SEARCH_MAP_MAX_RESULTS]
+            ],
+            "resultCount": f"{len(properties):,}",
+        }
+
+    def by_ids(self, parameters: Mapping[str, str]) -> dict[str, Any]:
+        ids = [int(id) for id in parameters["propertyIds"].split(",") if id]
+        if len(ids) > api.SEARCH_BY_IDS_MAX_RESULTS:
+            raise ValueError(f"Too many property IDs: {len(ids)}")
+        # else...
+        properties = [
+            self.properties_by_id[id] for id in ids if id in self.properties_by_id
+        ]
+        return {"properties": properties, "resultCount": str(len(properties))}
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    "So connections are kept alive between requests."
+    server: FakeRightmoveServer
+
+    def do_GET(self) -> None:
+        url = urllib.parse.urlsplit(self.path)
+        parameters = dict(urllib.parse.parse_qsl(url.query))
+        endpoint = {
+            "/typeahead": self.server.lookup,
+            "/api/_search": self.server.list_page,
+            "/api/_mapSearch": self.server.map_page,
+            "/api/_searchByIds": self.server.by_ids,
+        }.get(url.path)
+        if endpoint is None:
+            self._respond(http.HTTPStatus.NOT_FOUND, b"")
+            return
+        # else...
+        status, delay = self.server.admit()
+        if status == http.HTTPStatus.TOO_MANY_REQUESTS:
+            self._respond(status, b"", {"Retry-After": str(math.ceil(delay))})
+            return
+        # else...
+        time.sleep(delay)
+        if status is not None:
+            self._respond(status, b"")
+            return
+        # else...
+        try:
+            body = json.dumps(endpoint(parameters)).encode()
+        except (KeyError, IndexError, ValueError) as error:
+            self._respond(http.HTTPStatus.BAD_REQUEST, str(error).encode())
+            return
+        # else...
+        headers = {"Content-Type": "application/json"}
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=1)
+            headers["Content-Encoding"] = "gzip"
+        self._respond(http.HTTPStatus.OK, body, headers)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        "Don't log every request to stderr."
+
+    def _respond(
+        self,
+        status: http.HTTPStatus,
+        body: bytes,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _price(property: Mapping[str, Any]) -> int:
+    return (property.get("price") or {}).get("amount", 0)
+
+
+def _location_filter(
+    location_identifier: str,
+    radius: float,
+    locations: Mapping[str, tuple[float, float]],
+) -> Callable[[Mapping[str, float]], bool]:
+    "Get whether a property location is in a searched location."
+    type, _, id = location_identifier.partition("^")
+    if type == "USERDEFINEDAREA":
+        polygon = _polyline.decode(json.loads(id)["polylines"])
+        return lambda location: geometry.contains(
+            polygon, (location["latitude"], location["longitude"])
+        )
+    # else...
+    center = list(locations.values())[int(id)]
+    return lambda location: (
+        _miles_between(center, (location["latitude"], location["longitude"]))
+        <= _LOCATION_RADIUS_MILES + radius
+    )
+
+
+def _miles_between(a: tuple[float, float], b: tuple[float, float]) -> float:
+    "Great circle distance between two (latitude, longitude) points."
+    latitude_a, longitude_a, latitude_b, longitude_b = map(math.radians, (*a, *b))
+    haversine = (
+        math.sin((latitude_b - latitude_a) / 2) ** 2
+        + math.cos(latitude_a)
+        * math.cos(latitude_b)
+        * math.sin((longitude_b - longitude_a) / 2) ** 2
+    )
+    return 2 * _EARTH_RADIUS_MILES * math.asin(math.sqrt(haversine))
@@ -0,0 +1,17 @@
+from collections.abc import Sequence
+
+__all__ = [
+    "contains",
+]
+
+
+def contains(
+    polygon: Sequence[tuple[float, float]], point: tuple[float, float]
+) -> bool:
+    "Whether a point is inside a polygon, by casting a ray from it."
+    y, x = point
+    inside = False
+    for (y1, x1), (y2, x2) in zip(polygon, [*polygon[1:], polygon[0]]):
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+    return inside
@@ -0,0 +1,177 @@
+import asyncio
+import dataclasses
+import http
+import threading
+import time
+from collections.abc import Callable
+from typing import Optional
+
+__all__ = [
+    "GovernorStatistics",
+    "RequestGovernor",
+]
+
+
+_MIN_LATENCY_SAMPLES = 8
+"Responses to see before judging whether latency is rising."
+
+_FAST_LATENCY_WEIGHT = 0.3
+"Weight of each new latency in the average tracking the current latency."
+
+_SLOW_LATENCY_WEIGHT = 0.02
+"Weight of each new latency in the average tracking the usual latency."
+
+
+@dataclasses.dataclass
+class GovernorStatistics:
+    requests: int = 0
+    throttled: int = 0
+    "Requests that had to wait for their turn."
+    throttled_seconds: float = 0.0
+    backoffs: int = 0
+    "Times the rate was cut because of an error or rising latency."
+    retry_afters: int = 0
+    "Responses whose Retry-After header paused every request."
+
+
+class RequestGovernor:
+    """Thread-safe adaptive rate limit shared by every request to a server.
+
+    Requests are paced by a token bucket whose rate adapts AIMD-style like TCP
+    congestion control: every successful response adds to the rate, so it
+    climbs by `increase` requests per second each second, while a 429, a 5xx,
+    a failed request or rising latency multiplies it by `decrease`. Only
+    requests sent since the last cut can cut it again, so a burst of errors
+    from requests already in flight is one backoff. A `Retry-After` pauses
+    every request until then.
+    """
+
+    def __init__(
+        self,
+        initial_rate: float = 2.0,
+        min_rate: float = 0.2,
+        max_rate: float = 20.0,
+        burst: int = 1,
+        increase: float = 0.5,
+        decrease: float = 0.5,
+        latency_tolerance: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        Args:
+            initial_rate: Requests per second to start at.
+            min_rate: Requests per second never to back off below.
+            max_rate: Requests per second never to climb above.
+            burst: Requests that may be sent at once after being idle.
+            increase: Requests per second the rate climbs by each second of
+                successful responses.
+            decrease: Factor the rate is multiplied by on backing off.
+            latency_tolerance: How many times its usual latency the current
+                latency may reach before backing off.
+            clock: Returns the current time in seconds.
+            sleep: Blocks for some seconds, for synchronous requests.
+        """
+        self._rate = initial_rate
+        self._min_rate = min_rate
+        self._max_rate = max_rate
+        self._burst = burst
+        self._increase = increase
+        self._decrease = decrease
+        self._latency_tolerance = latency_tolerance
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._statistics = GovernorStatistics()
+        self._next_at = float("-inf")
+        "When the next request may be sent, without any burst."
+        self._backed_off_at = float("-inf")
+        self._fast_latency = 0.0
+        self._slow_latency = 0.0
+        self._latency_samples = 0
+
+    @property
+    def rate(self) -> float:
+        "Requests per second currently allowed."
+        with self._lock:
+            return self._rate
+
+    @property
+    def statistics(self) -> GovernorStatistics:
+        with self._lock:
+            return dataclasses.replace(self._statistics)
+
+    def acquire(self) -> float:
+        """Block until a request may be sent.
+
+        Returns:
+            When the request is sent, to pass to `complete`.
+        """
+        if delay := self._reserve():
+            self._sleep(delay)
+        return self._clock()
+
+    async def acquire_async(self) -> float:
+        "See `acquire`."
+        if delay := self._reserve():
+            await asyncio.sleep(delay)
+        return self._clock()
+
+    def complete(
+        self,
+        sent_at: float,
+        status: Optional[int],
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """Adapt the rate to how a request went.
+
+        Args:
+            sent_at: As returned by `acquire`.
+            status: The response status, or None if the request failed.
+            retry_after: Seconds the server asked to wait before retrying.
+        """
+        now = self._clock()
+        with self._lock:
+            if retry_after is not None:
+                self._statistics.retry_afters += 1
+                self._next_at = max(self._next_at, now + retry_after)
+            congested = (
+                status is None
+                or status == http.HTTPStatus.TOO_MANY_REQUESTS
+                or status >= http.HTTPStatus.INTERNAL_SERVER_ERROR
+                or self._latency_rising(now - sent_at)
+            )
+            if not congested:
+                self._rate = min(
+                    self._max_rate, self._rate + self._increase / self._rate
+                )
+            elif sent_at > self._backed_off_at:
+                self._statistics.backoffs += 1
+                self._rate = max(self._min_rate, self._rate * self._decrease)
+                self._backed_off_at = now
+
+    def _reserve(self) -> float:
+        "Take the next turn, and get how many seconds to wait for it."
+        now = self._clock()
+        with self._lock:
+            self._statistics.requests += 1
+            send_at = max(self._next_at, now - (self._burst - 1) / self._rate)
+            self._next_at = send_at + 1 / self._rate
+            if send_at <= now:
+                return 0.0
+            # else...
+            self._statistics.throttled += 1
+            self._statistics.throttled_seconds += send_at - now
+            return send_at - now
+
+    def _latency_rising(self, latency: float) -> bool:
+        if not self._latency_samples:
+            self._fast_latency = self._slow_latency = latency
+        else:
+            self._fast_latency += _FAST_LATENCY_WEIGHT * (latency - self._fast_latency)
+            self._slow_latency += _SLOW_LATENCY_WEIGHT * (latency - self._slow_latency)
+        self._latency_samples += 1
+        return (
+            self._latency_samples >= _MIN_LATENCY_SAMPLES
+            and self._fast_latency > self._latency_tolerance * self._slow_latency
+        )
@@ -0,0 +1,37 @@
+import json
+import os
+from collections.abc import Iterator
+from typing import Any
+
+__all__ = [
+    "iter_entries",
+]
+
+
+def iter_entries(filepath: str) -> Iterator[tuple[int, Any]]:
+    """Yield the entries in a file of JSON lines with the offsets of their lines,
+    dropping a last line cut short.
+
+    Raises:
+        ValueError: If any complete line is corrupt, as that isn't from a write
+            being cut short and the lines after it may still be needed.
+    """
+    if os.path.exists(filepath):
+        complete_size = 0
+        with open(filepath, "rb") as file:
+            for line_number, line in enumerate(file, start=1):
+                if not line.endswith(b"\n"):
+                    # Only the last line is cut short, if writing it was.
+                    break
+                # else...
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError as error:
+                    raise ValueError(
+                        f"Line {line_number} of {filepath} is corrupt"
+                    ) from error
+                yield complete_size, entry
+                complete_size += len(line)
+        if complete_size < os.path.getsize(filepath):
+            # Drop the cut short line, so it isn't joined to the next.
+            os.truncate(filepath, complete_size)
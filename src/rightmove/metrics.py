@@ -0,0 +1,217 @@
+import bisect
+import collections
+import copy
+import dataclasses
+import inspect
+import json
+import threading
+from collections.abc import Sequence
+from typing import Any, Optional, TypeVar
+
+from tenacity import AsyncRetrying, Retrying, RetryCallState
+
+__all__ = [
+    "DEFAULT_LATENCY_BOUNDS",
+    "LatencyHistogram",
+    "EndpointMetrics",
+    "RequestMetrics",
+]
+
+
+DEFAULT_LATENCY_BOUNDS: tuple[float, ...] = (
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+"Upper bounds in seconds of the latency histogram buckets, before the overflow."
+
+_AnyRetrying = TypeVar("_AnyRetrying", Retrying, AsyncRetrying)
+
+
+@dataclasses.dataclass
+class LatencyHistogram:
+    bounds: Sequence[float] = DEFAULT_LATENCY_BOUNDS
+    "Upper bounds in seconds of each bucket, in ascending order."
+    counts: list[int] = dataclasses.field(default_factory=list)
+    "Requests per bucket, with one extra overflow bucket past the last bound."
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * (len(self.bounds) + 1)
+
+    @property
+    def mean_seconds(self) -> float:
+        if not self.count:
+            return 0.0
+        # else...
+        return self.total_seconds / self.count
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_seconds": self.mean_seconds,
+            "max_seconds": self.max_seconds,
+            "buckets": {
+                **{
+                    f"le_{bound:g}": count
+                    for bound, count in zip(self.bounds, self.counts)
+                },
+                "inf": self.counts[-1],
+            },
+        }
+
+
+@dataclasses.dataclass
+class EndpointMetrics:
+    responses: int = 0
+    "Responses received from the server, whatever their status."
+    errors: int = 0
+    "Requests that failed before getting a response, such as on a timeout."
+    retries: int = 0
+    "Requests retried by the client's retry policy."
+    cache_hits: int = 0
+    "Requests served from the response cache without being sent."
+    connections_reused: int = 0
+    "Responses received over a previously used keep-alive connection."
+    compressed_bytes: int = 0
+    "Response body bytes as received over the wire."
+    decompressed_bytes: int = 0
+    "Response body bytes once decompressed."
+    status_codes: collections.Counter[int] = dataclasses.field(
+        default_factory=collections.Counter
+    )
+    latency: LatencyHistogram = dataclasses.field(default_factory=LatencyHistogram)
+    "Time from sending each request to having its whole response body."
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "responses": self.responses,
+            "errors": self.errors,
+            "retries": self.retries,
+            "cache_hits": self.cache_hits,
+            "connections_reused": self.connections_reused,
+            "compressed_bytes": self.compressed_bytes,
+            "decompressed_bytes": self.decompressed_bytes,
+            "status_codes": {
+                str(status): count
+                for status, count in sorted(self.status_codes.items())
+            },
+            "latency": self.latency.to_dict(),
+        }
+
+
+class RequestMetrics:
+    """Thread-safe per-endpoint statistics about the requests a client sends.
+
+    Endpoints are the URL paths requested, such as "/api/_search".
+    """
+
+    def __init__(
+        self, latency_bounds: Sequence[float] = DEFAULT_LATENCY_BOUNDS
+    ) -> None:
+        """
+        Args:
+            latency_bounds: Upper bounds in seconds of the latency histogram
+                buckets, in ascending order.
+        """
+        self._latency_bounds = latency_bounds
+        self._lock = threading.Lock()
+        self._endpoints: dict[str, EndpointMetrics] = {}
+
+    @property
+    def endpoints(self) -> dict[str, EndpointMetrics]:
+        with self._lock:
+            return copy.deepcopy(self._endpoints)
+
+    def record_response(
+        self,
+        endpoint: str,
+        status: int,
+        seconds: float,
+        compressed_bytes: int,
+        decompressed_bytes: int,
+        reused: Optional[bool],
+    ) -> None:
+        """
+        Args:
+            reused: Whether the connection was reused, or None if unknown.
+        """
+        with self._lock:
+            metrics = self._endpoint(endpoint)
+            metrics.responses += 1
+            metrics.status_codes[status] += 1
+            metrics.latency.observe(seconds)
+            metrics.compressed_bytes += compressed_bytes
+            metrics.decompressed_bytes += decompressed_bytes
+            if reused:
+                metrics.connections_reused += 1
+
+    def record_error(self, endpoint: str) -> None:
+        with self._lock:
+            self._endpoint(endpoint).errors += 1
+
+    def record_retry(self, endpoint: str) -> None:
+        with self._lock:
+            self._endpoint(endpoint).retries += 1
+
+    def record_cache_hit(self, endpoint: str) -> None:
+        with self._lock:
+            self._endpoint(endpoint).cache_hits += 1
+
+    def count_retries(self, retrying: _AnyRetrying) -> _AnyRetrying:
+        """Copy a retry policy wrapped around `_request` to record its retries.
+
+        Any `before_sleep` callback of the policy is still called.
+        """
+        before_sleep = retrying.before_sleep
+
+        def record(retry_state: RetryCallState) -> Any:
+            # `_request(host, method, url, parameters)`
+            self.record_retry(retry_state.args[2])
+            if before_sleep is not None:
+                return before_sleep(retry_state)
+            # else...
+            return None
+
+        async def arecord(retry_state: RetryCallState) -> None:
+            result = record(retry_state)
+            if inspect.isawaitable(result):
+                await result
+
+        if isinstance(retrying, AsyncRetrying):
+            return retrying.copy(before_sleep=arecord)
+        # else...
+        return retrying.copy(before_sleep=record)
+
+    def to_dict(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {
+                endpoint: metrics.to_dict()
+                for endpoint, metrics in sorted(self._endpoints.items())
+            }
+
+    def dump(self, filepath: str) -> None:
+        "Write the metrics of every endpoint to a JSON file."
+        with open(filepath, "w") as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    def _endpoint(self, endpoint: str) -> EndpointMetrics:
+        if endpoint not in self._endpoints:
+            self._endpoints[endpoint] = EndpointMetrics(
+                latency=LatencyHistogram(self._latency_bounds)
+            )
+        return self._endpoints[endpoint]
@@ -1,5 +1,5 @@
 import pydantic
-from typing import Any, Optional
+from typing import Any, Optional, Union
 
 import pydantic.alias_generators
 
@@ -20,7 +20,12 @@ __all__ = [
     "MatchingLozenges",
     "LozengeModel",
     "Property",
+    "PropertySummary",
+    "validate_property_summaries_json",
     "PropertyLocation",
+    "PropertySearchResults",
+    "PropertySummarySearchResults",
+    "PropertyLocationSearchResults",
 ]
 
 
@@ -199,3 +204,76 @@ class Property(CamelCaseModel):
     formatted_branch_name: Optional[str] = None
     formatted_distance: Optional[str] = None
     property_type_full_description: Optional[str] = None
+
+
+class PropertySummary(CamelCaseModel):
+    """Just the `Property` fields needed to filter listings.
+
+    The listing's other fields are kept as they were parsed, and the full
+    `Property` is only validated from them, with the models already validated
+    here, if `to_property` is called. Listings that are filtered out never pay
+    for it.
+    """
+
+    model_config = pydantic.ConfigDict(extra="allow")
+
+    id: int
+    display_address: Optional[str] = None
+    location: Location
+    price: Optional[Price] = None
+    commercial: bool
+    development: bool
+    students: bool
+    auction: bool
+    display_size: Optional[str] = None
+    first_visible_date: Optional[pydantic.AwareDatetime] = None
+    featured_property: Optional[bool] = None
+    lozenge_model: Optional[LozengeModel] = None
+    _property: Optional[Property] = pydantic.PrivateAttr(default=None)
+
+    def to_property(self) -> Property:
+        """The full property, validated the first time it is asked for.
+
+        Raises:
+            pydantic.ValidationError: If the summary lacks any of its fields.
+        """
+        if self._property is None:
+            fields: dict[str, Any] = dict(self.__pydantic_extra__ or {})
+            # Models of the same class are kept as they are, not validated again.
+            fields.update(
+                (field.alias or name, getattr(self, name))
+                for name, field in type(self).model_fields.items()
+            )
+            self._property = Property.model_validate(fields)
+        return self._property
+
+
+def validate_property_summaries_json(
+    json_data: Union[str, bytes],
+) -> list[PropertySummary]:
+    "Validate a JSON list of properties into summaries, see `PropertySummary`."
+    return _PROPERTY_SUMMARIES_ADAPTER.validate_json(json_data)
+
+
+_PROPERTY_SUMMARIES_ADAPTER = pydantic.TypeAdapter(list[PropertySummary])
+
+
+# Search Result Models
+
+
+class PropertySearchResults(CamelCaseModel):
+    properties: list[Property]
+    result_count: Optional[str] = None
+    'Formatted with thousands separators, e.g. "1,234". Not sent by the by IDs API.'
+
+
+class PropertySummarySearchResults(CamelCaseModel):
+    properties: list[PropertySummary]
+    result_count: Optional[str] = None
+    "See `PropertySearchResults.result_count`."
+
+
+class PropertyLocationSearchResults(CamelCaseModel):
+    properties: list[PropertyLocation]
+    result_count: str
+    'Formatted with thousands separators, e.g. "1,234".'
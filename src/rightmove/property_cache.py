@@ -1,47 +1,774 @@
-from typing import Any, Iterable
+from typing import Any, BinaryIO, Iterable, Iterator, Optional, Union
+import array
+import bisect
+import contextlib
+import heapq
+import itertools
 import json
 import os
+import sqlite3
+import threading
+import time
+
+from rightmove import journal as _journal
+
+_SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+
+_SQLITE_MAX_VARIABLES = 999
+"The fewest parameters a SQLite statement may have, whatever its build."
+
+_INDEX_KEY_SIZE = 3 * 8
+"Bytes of the snapshot's size, mtime and inode that a saved index starts with."
 
 
 class PropertyCache:
-    def __init__(self, filepath: str, reset: bool = False) -> None:
+    """Properties seen before, saved between runs.
+
+    The properties are saved as a JSON snapshot, plus a journal of JSON lines
+    that each new property is appended to, so saving one costs the same however
+    many are cached. Once the journal has grown as large as the snapshot, it is
+    compacted into a new snapshot in the background.
+
+    Updates within `batch` share one write, and updates outside of one can be
+    left to share writes with `flush_every` or `flush_interval`.
+
+    With `compact`, only the IDs are kept in memory, packed as 8 byte integers,
+    and the properties are read back from disk when asked for. The snapshot is
+    written one property per line, and its IDs are saved next to it with the
+    offset of each one's line, so they are loaded without reading the snapshot
+    and `get` reads only the property asked for.
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        reset: bool = False,
+        fsync_every: int = 1,
+        compact_after: int = 1000,
+        flush_every: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        compact: bool = False,
+    ) -> None:
+        """
+        Args:
+            filepath: JSON snapshot, with the journal next to it.
+            reset: Delete any properties saved by earlier runs.
+            fsync_every: Properties appended to the journal between each sync
+                to disk. The journal is flushed every update regardless, so
+                only those since the last sync can be lost, and only if the
+                machine rather than the process fails.
+            compact_after: Fewest properties in the journal to compact.
+            flush_every: Save updates once this many properties are unsaved,
+                rather than every update.
+            flush_interval: Save updates once the oldest unsaved property has
+                waited this many seconds, rather than every update. This is
+                checked on each update, and `close` saves any left.
+            compact: Keep only the IDs in memory, rather than every property.
+        """
         self._filepath = filepath
+        self._journal_filepath = f"{filepath}.journal"
+        self._compacting_filepath = f"{filepath}.journal.compacting"
+        self._index_filepath = f"{filepath}.index"
+        self._fsync_every = fsync_every
+        self._compact_after = compact_after
+        self._flush_every = flush_every
+        self._flush_interval = flush_interval
+        self._compact = compact
         if reset:
             self._reset()
+        self._property_ids: Union[set[int], _PackedIds]
+        self._snapshot_offsets: Optional[_PackedOffsets] = None
+        "The offset of each snapshot property's line, if `compact` and indexed."
+        self._journal_offsets: Optional[_PackedOffsets] = None
+        "The offset of each journal property's line, if `compact`."
+        self._unsaved: list[dict[str, Any]] = []
+        "Properties updated but not yet saved, the last of `_properties`."
         self._properties = self._load()
+        "Every property by ID, in the order they were added, unless `compact`."
+        self._journal: Optional[BinaryIO] = None
+        self._unsynced_count = 0
+        self._compaction: Optional[threading.Thread] = None
+        self._unsaved_since = 0.0
+        self._batch_depth = 0
+
+    def __enter__(self) -> "PropertyCache":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
 
     def _reset(self) -> None:
-        if os.path.exists(self._filepath):
-            os.remove(self._filepath)
+        for filepath in (
+            self._filepath,
+            self._journal_filepath,
+            self._compacting_filepath,
+            self._index_filepath,
+        ):
+            if os.path.exists(filepath):
+                os.remove(filepath)
+
+    def _load(self) -> Optional[dict[int, dict[str, Any]]]:
+        if os.path.exists(self._compacting_filepath):
+            # The last compaction was interrupted, so finish it first.
+            self._finish_compaction()
+        if self._compact:
+            self._journal_offsets = _PackedOffsets()
+            self._journal_count = 0
+            for offset, property in _journal.iter_entries(self._journal_filepath):
+                self._journal_offsets.update([(property["id"], offset)])
+                self._journal_count += 1
+            self._index_snapshot()
+            assert self._snapshot_offsets is not None
+            self._snapshot_count = len(self._snapshot_offsets)
+            return None
+        # else...
+        snapshot = list(_iter_snapshot(self._filepath))
+        journal = _read_journal(self._journal_filepath)
+        self._snapshot_count = len(snapshot)
+        self._journal_count = len(journal)
+        properties = {
+            property["id"]: property for property in _unique(snapshot + journal)
+        }
+        self._property_ids = set(properties)
+        return properties
+
+    def _index_snapshot(self) -> None:
+        "Load the snapshot's offsets, and the IDs in it, the journal and unsaved."
+        snapshot_ids, snapshot_offsets = self._load_snapshot_index()
+        self._snapshot_offsets = _PackedOffsets(snapshot_ids, snapshot_offsets)
+        self._property_ids = _PackedIds(snapshot_ids)
+        assert self._journal_offsets is not None
+        self._property_ids.update(self._journal_offsets)
+        self._property_ids.update(property["id"] for property in self._unsaved)
 
-    def _load(self) -> list[dict[str, Any]]:
-        if os.path.exists(self._filepath):
-            with open(self._filepath, "r") as file:
-                return json.load(file)
+    def _load_snapshot_index(self) -> tuple[array.array[int], array.array[int]]:
+        """The sorted IDs in the snapshot and the offsets of their lines.
+
+        If they weren't saved with this snapshot, it is read a line at a time to
+        find them, or written again one property per line if it is all on one.
+        """
+        if not os.path.exists(self._filepath):
+            return array.array("q"), array.array("q")
+        # else...
+        if os.path.exists(self._index_filepath):
+            with open(self._index_filepath, "rb") as file:
+                data = file.read()
+            # It starts with the key of the snapshot it was saved with.
+            key = array.array("Q")
+            key.frombytes(data[:_INDEX_KEY_SIZE])
+            if key == self._snapshot_key():
+                index = array.array("q")
+                index.frombytes(data[_INDEX_KEY_SIZE:])
+                count = len(index) // 2
+                return index[:count], index[count:]
+        # else...
+        if _is_line_snapshot(self._filepath):
+            ids = array.array("q")
+            offsets = array.array("q")
+            for offset, property in _iter_snapshot_offsets(self._filepath):
+                ids.append(property["id"])
+                offsets.append(offset)
+        else:
+            ids, offsets = self._write_snapshot(_iter_snapshot(self._filepath))
+        return self._save_snapshot_index(ids, offsets)
+
+    def _snapshot_key(self) -> array.array[int]:
+        "Changes whenever the snapshot does, even if its size doesn't."
+        stat = os.stat(self._filepath)
+        # Replacing it makes a new inode, even within the same mtime tick.
+        return array.array("Q", [stat.st_size, stat.st_mtime_ns, stat.st_ino])
+
+    def get(self, property_id: int) -> Optional[dict[str, Any]]:
+        "The cached property with an ID, if there is one, read from disk if `compact`."
+        if property_id not in self._property_ids:
+            return None
+        # else...
+        if self._properties is not None:
+            return self._properties[property_id]
+        # else...
+        for property in self._unsaved:
+            if property["id"] == property_id:
+                return property
+        assert self._journal_offsets is not None
+        offset = self._journal_offsets.get(property_id)
+        if offset is not None:
+            return _read_line(self._journal_filepath, offset)
         # else...
-        return []
+        if self._snapshot_offsets is None:
+            # The compacted journal's properties have moved into the snapshot.
+            self._join_compaction()
+            self._index_snapshot()
+        assert self._snapshot_offsets is not None
+        offset = self._snapshot_offsets.get(property_id)
+        return _read_line(self._filepath, offset) if offset is not None else None
+
+    def properties(self) -> Iterator[dict[str, Any]]:
+        "Yield the cached properties, read from disk if `compact`."
+        if self._properties is not None:
+            yield from list(self._properties.values())
+            return
+        # else...
+        # The snapshot and journals are being replaced until it's done.
+        self._join_compaction()
+        yield from _iter_snapshot(self._filepath)
+        yield from _iter_journal(self._journal_filepath)
+        yield from self._unsaved.copy()
 
     def contains_property_id(self, property_id: int) -> bool:
-        return any(property["id"] == property_id for property in self._properties)
+        return property_id in self._property_ids
+
+    def filter_unseen(self, property_ids: Iterable[int]) -> list[int]:
+        "The IDs that aren't cached, in order."
+        return [
+            property_id
+            for property_id in property_ids
+            if property_id not in self._property_ids
+        ]
 
     def add(self, property: dict[str, Any]) -> None:
         self.update([property])
 
     def update(self, properties: Iterable[dict[str, Any]]) -> None:
-        new_properties = [
-            property
-            for property in properties
-            if not self.contains_property_id(property["id"])
-        ]
+        new_properties = []
+        new_property_ids = set()
+        for property in properties:
+            property_id = property["id"]
+            if property_id in self._property_ids or property_id in new_property_ids:
+                continue
+            # else...
+            new_properties.append(property)
+            new_property_ids.add(property_id)
         if new_properties:
-            rollback_properties = self._properties.copy()
-            try:
-                self._properties.extend(new_properties)
-                self._save()
-            except BaseException as exception:
-                self._properties = rollback_properties
-                raise exception
-
-    def _save(self) -> None:
-        with open(self._filepath, "w") as file:
-            file.write(json.dumps(self._properties))
+            if not self._unsaved:
+                self._unsaved_since = time.monotonic()
+            if self._properties is not None:
+                self._properties.update(
+                    (property["id"], property) for property in new_properties
+                )
+            self._property_ids.update(new_property_ids)
+            self._unsaved.extend(new_properties)
+            if not self._batch_depth and self._flush_due():
+                self.flush()
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[None]:
+        """Save the properties updated within as one write, once it exits.
+
+        If it exits with an exception they are dropped instead, as they would
+        be if saving them failed.
+        """
+        unsaved_count = len(self._unsaved)
+        self._batch_depth += 1
+        try:
+            yield
+        except BaseException as exception:
+            self._drop_unsaved(unsaved_count)
+            raise exception
+        finally:
+            self._batch_depth -= 1
+        if not self._batch_depth:
+            self.flush()
+
+    def flush(self) -> None:
+        "Save any properties updated but not yet saved."
+        if not self._unsaved:
+            return
+        # else...
+        try:
+            self._save(self._unsaved)
+        except BaseException as exception:
+            self._drop_unsaved(0)
+            raise exception
+        self._unsaved = []
+        self._compact_if_due()
+
+    def close(self) -> None:
+        "Save any updates, sync the journal and wait for any compaction."
+        self.flush()
+        if self._journal is not None:
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._journal.close()
+            self._journal = None
+        self._join_compaction()
+
+    def _join_compaction(self) -> None:
+        if self._compaction is not None:
+            self._compaction.join()
+            self._compaction = None
+
+    def _flush_due(self) -> bool:
+        if self._flush_every is None and self._flush_interval is None:
+            return True
+        # else...
+        return (
+            self._flush_every is not None and len(self._unsaved) >= self._flush_every
+        ) or (
+            self._flush_interval is not None
+            and time.monotonic() - self._unsaved_since >= self._flush_interval
+        )
+
+    def _drop_unsaved(self, start: int) -> None:
+        "Forget the unsaved properties from `start` on."
+        dropped = self._unsaved[start:]
+        if dropped:
+            if self._properties is not None:
+                for property in dropped:
+                    del self._properties[property["id"]]
+            self._property_ids.difference_update(property["id"] for property in dropped)
+            del self._unsaved[start:]
+
+    def _save(self, properties: list[dict[str, Any]]) -> None:
+        if self._journal is None:
+            self._journal = open(self._journal_filepath, "ab")
+        position = self._journal.tell()
+        lines = [json.dumps(property).encode() + b"\n" for property in properties]
+        try:
+            self._journal.write(b"".join(lines))
+            self._journal.flush()
+            self._unsynced_count += len(properties)
+            if self._unsynced_count >= self._fsync_every:
+                os.fsync(self._journal.fileno())
+                self._unsynced_count = 0
+        except BaseException:
+            # Drop anything partly written, so it isn't loaded as saved.
+            self._journal.truncate(position)
+            raise
+        self._journal_count += len(properties)
+        if self._journal_offsets is not None:
+            offsets = itertools.accumulate(map(len, lines), initial=position)
+            self._journal_offsets.update(
+                zip((property["id"] for property in properties), offsets)
+            )
+
+    def _compact_if_due(self) -> None:
+        if self._journal_count < max(self._compact_after, self._snapshot_count):
+            return
+        # else...
+        if os.path.exists(self._compacting_filepath):
+            # The last compaction is still running.
+            return
+        # else...
+        if self._compaction is not None:
+            self._compaction.join()
+        assert self._journal is not None
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._journal.close()
+        self._journal = None
+        self._unsynced_count = 0
+        # New properties go to a new journal while the old one is compacted.
+        os.replace(self._journal_filepath, self._compacting_filepath)
+        self._snapshot_count = len(self._property_ids)
+        self._journal_count = 0
+        if self._properties is not None:
+            self._compaction = threading.Thread(
+                target=self._save_snapshot,
+                args=(list(self._properties.values()),),
+                name="PropertyCacheCompaction",
+            )
+        else:
+            self._journal_offsets = _PackedOffsets()
+            # Indexed again once the compaction is done, as the lines will move.
+            self._snapshot_offsets = None
+            self._compaction = threading.Thread(
+                target=self._finish_compaction, name="PropertyCacheCompaction"
+            )
+        self._compaction.start()
+
+    def _finish_compaction(self) -> None:
+        """Compact the journal moved aside into the snapshot on disk, a line at
+        a time, so only their IDs are held in memory."""
+        self._save_snapshot(
+            _unique(
+                itertools.chain(
+                    _iter_snapshot(self._filepath),
+                    _iter_journal(self._compacting_filepath),
+                )
+            )
+        )
+
+    def _save_snapshot(self, properties: Iterable[dict[str, Any]]) -> None:
+        ids, offsets = self._write_snapshot(properties)
+        if self._compact:
+            self._save_snapshot_index(ids, offsets)
+        if os.path.exists(self._compacting_filepath):
+            os.remove(self._compacting_filepath)
+
+    def _write_snapshot(
+        self, properties: Iterable[dict[str, Any]]
+    ) -> tuple[array.array[int], array.array[int]]:
+        """Write the snapshot one property per line, as each is read, returning
+        their IDs and the offsets of their lines."""
+        ids = array.array("q")
+        offsets = array.array("q")
+        # Write a whole new file, so an interrupted save can't corrupt the last.
+        temporary_filepath = f"{self._filepath}.tmp"
+        with open(temporary_filepath, "wb") as file:
+            file.write(b"[\n")
+            for property in properties:
+                if ids:
+                    file.write(b",\n")
+                ids.append(property["id"])
+                offsets.append(file.tell())
+                file.write(json.dumps(property).encode())
+            file.write(b"\n]\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_filepath, self._filepath)
+        return ids, offsets
+
+    def _save_snapshot_index(
+        self, ids: array.array[int], offsets: array.array[int]
+    ) -> tuple[array.array[int], array.array[int]]:
+        "Save the snapshot's sorted IDs and their offsets, returning them."
+        index = sorted(zip(ids, offsets))
+        ids = array.array("q", (id for id, _ in index))
+        sorted_offsets = array.array("q", (offset for _, offset in index))
+        temporary_filepath = f"{self._index_filepath}.tmp"
+        with open(temporary_filepath, "wb") as file:
+            self._snapshot_key().tofile(file)
+            ids.tofile(file)
+            sorted_offsets.tofile(file)
+        os.replace(temporary_filepath, self._index_filepath)
+        return ids, sorted_offsets
+
+
+class _PackedIds:
+    """A set of IDs packed as 8 byte integers, in a fraction of a `set`'s memory.
+
+    IDs are added to a `set` at first, and merged into the sorted array once
+    there are enough of them, so adding one costs O(1) amortized.
+    """
+
+    def __init__(self, sorted_ids: array.array[int]) -> None:
+        self._sorted_ids = sorted_ids
+        self._added_ids: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._sorted_ids) + len(self._added_ids)
+
+    def __contains__(self, id: int) -> bool:
+        if id in self._added_ids:
+            return True
+        # else...
+        index = bisect.bisect_left(self._sorted_ids, id)
+        return index < len(self._sorted_ids) and self._sorted_ids[index] == id
+
+    def update(self, ids: Iterable[int]) -> None:
+        self._added_ids.update(id for id in ids if id not in self)
+        if len(self._added_ids) > max(1024, len(self._sorted_ids) // 8):
+            self._sorted_ids = array.array(
+                "q", heapq.merge(self._sorted_ids, sorted(self._added_ids))
+            )
+            self._added_ids.clear()
+
+    def difference_update(self, ids: Iterable[int]) -> None:
+        for id in ids:
+            if id in self._added_ids:
+                self._added_ids.remove(id)
+                continue
+            # else...
+            index = bisect.bisect_left(self._sorted_ids, id)
+            if index < len(self._sorted_ids) and self._sorted_ids[index] == id:
+                del self._sorted_ids[index]
+
+
+class _PackedOffsets:
+    """Offsets by ID, packed as 8 byte integers like `_PackedIds`.
+
+    Offsets are added to a `dict` at first, and merged into the sorted arrays
+    once there are enough of them.
+    """
+
+    def __init__(
+        self,
+        sorted_ids: Optional[array.array[int]] = None,
+        offsets: Optional[array.array[int]] = None,
+    ) -> None:
+        self._sorted_ids = sorted_ids if sorted_ids is not None else array.array("q")
+        self._offsets = offsets if offsets is not None else array.array("q")
+        self._added_offsets: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._sorted_ids) + len(self._added_offsets)
+
+    def __iter__(self) -> Iterator[int]:
+        yield from self._sorted_ids
+        yield from self._added_offsets
+
+    def get(self, id: int) -> Optional[int]:
+        if id in self._added_offsets:
+            return self._added_offsets[id]
+        # else...
+        index = bisect.bisect_left(self._sorted_ids, id)
+        if index < len(self._sorted_ids) and self._sorted_ids[index] == id:
+            return self._offsets[index]
+        # else...
+        return None
+
+    def update(self, offsets: Iterable[tuple[int, int]]) -> None:
+        self._added_offsets.update(offsets)
+        if len(self._added_offsets) > max(1024, len(self._sorted_ids) // 8):
+            merged = list(
+                heapq.merge(
+                    zip(self._sorted_ids, self._offsets),
+                    sorted(self._added_offsets.items()),
+                )
+            )
+            self._sorted_ids = array.array("q", (id for id, _ in merged))
+            self._offsets = array.array("q", (offset for _, offset in merged))
+            self._added_offsets.clear()
+
+
+class SqlitePropertyCache:
+    """Properties seen before, saved in a SQLite database.
+
+    Each property is stored once with its ID as the primary key, and only IDs
+    are read to check whether one has been seen, so the cache needn't fit in
+    memory. The database is in WAL mode, so scripts reading it don't block the
+    one writing to it, and see what it has added.
+    """
+
+    def __init__(
+        self, filepath: str, reset: bool = False, timeout: float = 30.0
+    ) -> None:
+        """
+        Args:
+            filepath: SQLite database, created if it doesn't exist.
+            reset: Delete any properties saved by earlier runs.
+            timeout: Seconds to wait for another connection's write to finish.
+        """
+        self._connection = sqlite3.connect(filepath, timeout=timeout)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # Durable once checkpointed, and WAL can't be corrupted without it.
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        with self._connection:
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS properties (
+                    id INTEGER PRIMARY KEY,
+                    channel TEXT,
+                    first_visible_date TEXT,
+                    price INTEGER,
+                    property TEXT NOT NULL
+                )
+                """
+            )
+            for column in ("channel", "first_visible_date", "price"):
+                self._connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS properties_{column}"
+                    f" ON properties ({column})"
+                )
+            if reset:
+                self._connection.execute("DELETE FROM properties")
+        self._batch_depth = 0
+
+    def __enter__(self) -> "SqlitePropertyCache":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        (count,) = self._connection.execute(
+            "SELECT COUNT(*) FROM properties"
+        ).fetchone()
+        return count
+
+    def contains_property_id(self, property_id: int) -> bool:
+        return (
+            self._connection.execute(
+                "SELECT 1 FROM properties WHERE id = ?", (property_id,)
+            ).fetchone()
+            is not None
+        )
+
+    def filter_unseen(self, property_ids: Iterable[int]) -> list[int]:
+        "The IDs that aren't cached, in order."
+        property_ids = list(property_ids)
+        seen_ids = set()
+        for start in range(0, len(property_ids), _SQLITE_MAX_VARIABLES):
+            chunk = property_ids[start : start + _SQLITE_MAX_VARIABLES]
+            seen_ids.update(
+                property_id
+                for (property_id,) in self._connection.execute(
+                    "SELECT id FROM properties"
+                    f" WHERE id IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                )
+            )
+        return [
+            property_id for property_id in property_ids if property_id not in seen_ids
+        ]
+
+    def get(self, property_id: int) -> Optional[dict[str, Any]]:
+        "The cached property with an ID, if there is one."
+        row = self._connection.execute(
+            "SELECT property FROM properties WHERE id = ?", (property_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def properties(
+        self,
+        channel: Optional[str] = None,
+        added_since: Optional[str] = None,
+        max_price: Optional[int] = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield the cached properties, read as they are needed.
+
+        Args:
+            channel: Only properties on this channel, such as "RENT".
+            added_since: Only properties first visible at or after this ISO 8601
+                datetime, in UTC.
+            max_price: Only properties priced at most this.
+        """
+        conditions = []
+        parameters: list[Any] = []
+        if channel is not None:
+            conditions.append("channel = ?")
+            parameters.append(channel)
+        if added_since is not None:
+            conditions.append("first_visible_date >= ?")
+            parameters.append(added_since)
+        if max_price is not None:
+            conditions.append("price <= ?")
+            parameters.append(max_price)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        for (property,) in self._connection.execute(
+            f"SELECT property FROM properties{where} ORDER BY id", parameters
+        ):
+            yield json.loads(property)
+
+    def add(self, property: dict[str, Any]) -> None:
+        self.update([property])
+
+    def update(self, properties: Iterable[dict[str, Any]]) -> None:
+        if self._batch_depth:
+            self._insert(properties)
+            return
+        # else...
+        # One transaction, so none are saved if saving any fails.
+        with self._connection:
+            self._insert(properties)
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[None]:
+        """Save the properties updated within in one transaction.
+
+        If it exits with an exception they are rolled back instead.
+        """
+        self._connection.execute("SAVEPOINT batch")
+        self._batch_depth += 1
+        try:
+            yield
+        except BaseException as exception:
+            self._connection.execute("ROLLBACK TO batch")
+            raise exception
+        finally:
+            self._batch_depth -= 1
+            # Commits, unless it is within another batch.
+            self._connection.execute("RELEASE batch")
+
+    def _insert(self, properties: Iterable[dict[str, Any]]) -> None:
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO properties"
+            " (id, channel, first_visible_date, price, property)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (
+                (
+                    property["id"],
+                    property.get("channel"),
+                    property.get("firstVisibleDate"),
+                    (property.get("price") or {}).get("amount"),
+                    json.dumps(property),
+                )
+                for property in properties
+            ),
+        )
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+AnyPropertyCache = Union[PropertyCache, SqlitePropertyCache]
+
+
+def open_property_cache(
+    filepath: str,
+    reset: bool = False,
+    compact: bool = False,
+    flush_interval: Optional[float] = None,
+) -> AnyPropertyCache:
+    """A `SqlitePropertyCache` if the file is a SQLite database, else a `PropertyCache`.
+
+    Args:
+        compact: Keep only the IDs of a `PropertyCache` in memory. A
+            `SqlitePropertyCache` only reads IDs anyway.
+        flush_interval: See `PropertyCache`. A `SqlitePropertyCache` commits
+            each update, as appending to its WAL costs the same however large
+            it is.
+    """
+    if filepath.endswith(_SQLITE_SUFFIXES):
+        return SqlitePropertyCache(filepath, reset)
+    # else...
+    return PropertyCache(
+        filepath, reset, compact=compact, flush_interval=flush_interval
+    )
+
+
+def _is_line_snapshot(filepath: str) -> bool:
+    "Whether a snapshot was written one property per line, rather than on one."
+    with open(filepath, "rb") as file:
+        return file.readline() == b"[\n"
+
+
+def _iter_snapshot(filepath: str) -> Iterator[dict[str, Any]]:
+    "Yield the properties in a snapshot, a line at a time unless it is on one."
+    if not os.path.exists(filepath):
+        return
+    # else...
+    if not _is_line_snapshot(filepath):
+        # Saved before snapshots were written one property per line.
+        with open(filepath, "r") as file:
+            yield from json.load(file)
+        return
+    # else...
+    for _, property in _iter_snapshot_offsets(filepath):
+        yield property
+
+
+def _iter_snapshot_offsets(filepath: str) -> Iterator[tuple[int, dict[str, Any]]]:
+    "Yield the properties in a snapshot written one per line, with their offsets."
+    with open(filepath, "rb") as file:
+        offset = len(file.readline())
+        for line in file:
+            # The brackets are on their own lines, and an empty one has a blank.
+            if line not in (b"\n", b"]\n"):
+                yield offset, json.loads(line.rstrip(b",\n"))
+            offset += len(line)
+
+
+def _read_journal(filepath: str) -> list[dict[str, Any]]:
+    return list(_iter_journal(filepath))
+
+
+def _iter_journal(filepath: str) -> Iterator[dict[str, Any]]:
+    for _, property in _journal.iter_entries(filepath):
+        yield property
+
+
+def _read_line(filepath: str, offset: int) -> dict[str, Any]:
+    "The property on the line at an offset in a snapshot or journal."
+    with open(filepath, "rb") as file:
+        file.seek(offset)
+        return json.loads(file.readline().rstrip(b",\n"))
+
+
+def _unique(properties: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+    "Yield the properties without any repeated IDs, keeping the first of each."
+    property_ids = set()
+    for property in properties:
+        if property["id"] not in property_ids:
+            property_ids.add(property["id"])
+            yield property
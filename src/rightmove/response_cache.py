@@ -0,0 +1,178 @@
+import dataclasses
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+from collections.abc import Callable, Mapping
+from typing import Any, Optional
+
+__all__ = [
+    "DEFAULT_TTLS",
+    "CacheMissError",
+    "ResponseCacheStatistics",
+    "ResponseCache",
+]
+
+
+DEFAULT_TTLS: Mapping[str, float] = {
+    "/api/_search": 15 * 60,
+    "/api/_mapSearch": 15 * 60,
+    "/api/_searchByIds": 60 * 60,
+    "/typeahead": 7 * 24 * 60 * 60,
+}
+"Seconds a response stays fresh, by endpoint."
+
+_DEFAULT_TTL = 15 * 60
+"Seconds a response stays fresh for an endpoint missing from the TTLs."
+
+
+class CacheMissError(LookupError):
+    "Raised by an offline cache for a request it has no response for."
+
+
+@dataclasses.dataclass
+class ResponseCacheStatistics:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        if not self.hits + self.misses:
+            return 0.0
+        # else...
+        return self.hits / (self.hits + self.misses)
+
+
+class ResponseCache:
+    """Thread-safe SQLite cache of decoded API response bodies.
+
+    Responses are keyed on host, endpoint and the sorted query parameters, so
+    the same request made with its parameters in any order is a hit. Once the
+    cache holds more than `max_bytes`, the least recently used responses are
+    evicted.
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        ttls: Mapping[str, float] = DEFAULT_TTLS,
+        max_bytes: int = 256 * 1024 * 1024,
+        offline: bool = False,
+        reset: bool = False,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Args:
+            filepath: SQLite database file, created if it doesn't exist.
+            ttls: Seconds a response stays fresh, by endpoint.
+            max_bytes: Total size of the cached bodies to evict down to.
+            offline: Serve every request from the cache, however stale, and
+                raise `CacheMissError` for anything not cached.
+            reset: Delete any existing cache first.
+            clock: Returns the current time in seconds.
+        """
+        if reset and os.path.exists(filepath):
+            os.remove(filepath)
+        self._ttls = ttls
+        self._max_bytes = max_bytes
+        self._offline = offline
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._statistics = ResponseCacheStatistics()
+        self._connection = sqlite3.connect(filepath, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, "
+                "body BLOB NOT NULL, "
+                "stored_at REAL NOT NULL, "
+                "used_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_used_at ON responses (used_at)"
+            )
+        (self._size,) = self._connection.execute(
+            "SELECT COALESCE(SUM(LENGTH(body)), 0) FROM responses"
+        ).fetchone()
+
+    @property
+    def offline(self) -> bool:
+        return self._offline
+
+    @property
+    def statistics(self) -> ResponseCacheStatistics:
+        with self._lock:
+            return dataclasses.replace(self._statistics)
+
+    def get(self, host: str, url: str, parameters: dict[str, Any]) -> Optional[bytes]:
+        """Get a fresh cached response body.
+
+        Raises:
+            CacheMissError: If offline and the response isn't cached.
+        """
+        key = _key(host, url, parameters)
+        now = self._clock()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT body, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and (
+                self._offline or now - row[1] < self._ttls.get(url, _DEFAULT_TTL)
+            ):
+                self._statistics.hits += 1
+                with self._connection:
+                    self._connection.execute(
+                        "UPDATE responses SET used_at = ? WHERE key = ?", (now, key)
+                    )
+                return row[0]
+            # else...
+            self._statistics.misses += 1
+        if self._offline:
+            raise CacheMissError(f"Offline and no cached response for {key}")
+        # else...
+        return None
+
+    def put(self, host: str, url: str, parameters: dict[str, Any], body: bytes) -> None:
+        key = _key(host, url, parameters)
+        now = self._clock()
+        with self._lock, self._connection:
+            replaced = self._connection.execute(
+                "SELECT LENGTH(body) FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, body, now, now),
+            )
+            self._size += len(body) - (replaced[0] if replaced else 0)
+            if self._size > self._max_bytes:
+                self._evict()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> "ResponseCache":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def _evict(self) -> None:
+        "Delete the least recently used responses until under `max_bytes`."
+        evicted = []
+        for key, length in self._connection.execute(
+            "SELECT key, LENGTH(body) FROM responses ORDER BY used_at"
+        ):
+            if self._size <= self._max_bytes:
+                break
+            evicted.append((key,))
+            self._size -= length
+        self._connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        self._statistics.evictions += len(evicted)
+
+
+def _key(host: str, url: str, parameters: dict[str, Any]) -> str:
+    query_string = urllib.parse.urlencode(sorted(parameters.items()), doseq=True)
+    return f"{host}{url}?{query_string}"
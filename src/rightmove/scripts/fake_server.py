@@ -0,0 +1,76 @@
+import argparse
+import json
+
+import rightmove.fake_server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("Serve a local stand-in for Rightmove")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--properties",
+        type=str,
+        default="",
+        help="Properties JSON file to serve, instead of synthetic properties",
+    )
+    parser.add_argument(
+        "--synthetic-properties",
+        type=int,
+        default=20000,
+        help="Number of synthetic properties to serve",
+    )
+    parser.add_argument(
+        "--locations",
+        type=str,
+        default="",
+        help="JSON file of location names and coordinates for /typeahead",
+    )
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--latency-jitter", type=float, default=0.05)
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of requests to answer with a 503",
+    )
+    parser.add_argument(
+        "--max-requests-per-second",
+        type=float,
+        default=None,
+        help="Rate above which requests are answered with a 429",
+    )
+    args = parser.parse_args()
+
+    if args.properties:
+        with open(args.properties, "r") as file:
+            properties = json.load(file)
+    else:
+        properties = rightmove.fake_server.synthetic_properties(
+            args.synthetic_properties
+        )
+    if args.locations:
+        with open(args.locations, "r") as file:
+            locations = {key: tuple(value) for key, value in json.load(file).items()}
+    else:
+        locations = {}
+
+    server = rightmove.fake_server.FakeRightmoveServer(
+        properties,
+        locations,
+        address=("127.0.0.1", args.port),
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        max_requests_per_second=args.max_requests_per_second,
+    )
+    print(f"Serving {len(properties)} properties at {server.base_url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,23 +2,74 @@ import argparse
 import json
 from rightmove import api
 import rightmove.app
+import rightmove.metrics
 import rightmove.property_cache
+import rightmove.response_cache
+
+_HISTORY_FLUSH_INTERVAL = 10.0
+"Seconds a seen listing may wait to be saved with others."
 
 
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--reset", action="store_true", default=False)
+    parser.add_argument(
+        "--history",
+        type=str,
+        default="history.json",
+        help="Properties seen before, kept in SQLite if it ends in .sqlite or .db",
+    )
+    parser.add_argument(
+        "--compact-history",
+        action="store_true",
+        default=False,
+        help="Keep only the IDs of properties seen before in memory",
+    )
     parser.add_argument("--search-locations", type=str, default="search_locations.json")
+    parser.add_argument(
+        "--response-cache",
+        type=str,
+        default=None,
+        help="Cache Rightmove responses in this SQLite file, such as responses.sqlite",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        default=False,
+        help="Only use cached Rightmove responses, from --response-cache",
+    )
+    parser.add_argument(
+        "--metrics",
+        type=str,
+        default="",
+        help="Write per-endpoint Rightmove request metrics to this JSON file",
+    )
     args = parser.parse_args()
+    if args.offline and not args.response_cache:
+        parser.error("--offline needs a --response-cache")
 
     commute_coordinates = {
         "Paddington Station": (51.5167, 0.1769),
         "Big Ben": (51.5007, 0.1246),
     }
-    cache = rightmove.property_cache.PropertyCache("history.json", args.reset)
+    # Listings seen close together are saved together, and the rest on closing.
+    cache = rightmove.property_cache.open_property_cache(
+        args.history,
+        args.reset,
+        compact=args.compact_history,
+        flush_interval=_HISTORY_FLUSH_INTERVAL,
+    )
+    response_cache = (
+        rightmove.response_cache.ResponseCache(
+            args.response_cache, offline=args.offline
+        )
+        if args.response_cache
+        else None
+    )
+    metrics = rightmove.metrics.RequestMetrics()
+    rightmove_api = api.Rightmove(response_cache=response_cache, metrics=metrics)
     app = rightmove.app.App(
-        list(commute_coordinates.values()),
-        cache,
+        list(commute_coordinates.values()), cache, rightmove_api=rightmove_api
     )
     # These location IDs can be found by inspecting the URL
     # of a search result on rightmove.
@@ -46,6 +97,13 @@ def main() -> None:
             app.search(query)
     except KeyboardInterrupt:
         pass
+    finally:
+        rightmove_api.close()
+        cache.close()
+        if response_cache:
+            response_cache.close()
+        if args.metrics:
+            metrics.dump(args.metrics)
 
 
 if __name__ == "__main__":
@@ -22,6 +22,9 @@ class Tfl:
         self._app_key = app_key
         self._throttled_client = get_ratelimited_client()
 
+    async def aclose(self) -> None:
+        await self._throttled_client.aclose()
+
     async def get_stations_facilities(self) -> models.Root:
         return await get_stations_facilities()
 
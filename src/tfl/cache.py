@@ -1,17 +1,50 @@
 import ast
+import contextlib
 import json
 import os
-from typing import Iterable, Iterator
+import time
+from typing import Iterable, Iterator, Optional
 
 from tfl import models
 
 
 class Cache:
-    def __init__(self, filepath: str, reset: bool = False):
+    def __init__(
+        self,
+        filepath: str,
+        reset: bool = False,
+        flush_every: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ):
+        """
+        Args:
+            filepath: JSON file, created on saving if it doesn't exist.
+            reset: Delete any journeys saved by earlier runs.
+            flush_every: Save changes once this many are unsaved, rather than
+                every change. Changes within `batch` are saved together anyway.
+            flush_interval: Save changes once the oldest unsaved one has waited
+                this many seconds, rather than every change. This is checked
+                on each change, and `close` saves any left.
+        """
         self._filepath = filepath
+        self._flush_every = flush_every
+        self._flush_interval = flush_interval
         if reset:
             self._reset()
         self._journeys = self._load()
+        self._saved_journeys: Optional[
+            dict[tuple[tuple[float, float], tuple[float, float]], list[models.Journey]]
+        ] = None
+        "The journeys as last saved, while there are changes to save."
+        self._unsaved_count = 0
+        self._unsaved_since = 0.0
+        self._batch_depth = 0
+
+    def __enter__(self) -> "Cache":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
 
     def _reset(self) -> None:
         if os.path.exists(self._filepath):
@@ -51,13 +84,70 @@ class Cache:
             if from_to not in self._journeys or journeys != self._journeys[from_to]
         ]
         if new_journeys:
-            rollback_journeys = self._journeys.copy()
-            try:
-                self._journeys.update(new_journeys)
-                self._save()
-            except BaseException as exception:
-                self._journeys = rollback_journeys
-                raise exception
+            if self._saved_journeys is None:
+                self._saved_journeys = self._journeys.copy()
+                self._unsaved_since = time.monotonic()
+            self._journeys.update(new_journeys)
+            self._unsaved_count += len(new_journeys)
+            if not self._batch_depth and self._flush_due():
+                self.flush()
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[None]:
+        """Save the changes made within with one write, once it exits.
+
+        If it exits with an exception they are undone instead, as they would
+        be if saving them failed.
+        """
+        rollback = (
+            self._journeys.copy(),
+            self._saved_journeys,
+            self._unsaved_count,
+            self._unsaved_since,
+        )
+        self._batch_depth += 1
+        try:
+            yield
+        except BaseException as exception:
+            (
+                self._journeys,
+                self._saved_journeys,
+                self._unsaved_count,
+                self._unsaved_since,
+            ) = rollback
+            raise exception
+        finally:
+            self._batch_depth -= 1
+        if not self._batch_depth:
+            self.flush()
+
+    def flush(self) -> None:
+        "Save any unsaved changes."
+        if self._saved_journeys is None:
+            return
+        # else...
+        try:
+            self._save()
+        except BaseException as exception:
+            self._journeys = self._saved_journeys
+            raise exception
+        finally:
+            self._saved_journeys = None
+            self._unsaved_count = 0
+
+    def close(self) -> None:
+        self.flush()
+
+    def _flush_due(self) -> bool:
+        if self._flush_every is None and self._flush_interval is None:
+            return True
+        # else...
+        return (
+            self._flush_every is not None and self._unsaved_count >= self._flush_every
+        ) or (
+            self._flush_interval is not None
+            and time.monotonic() - self._unsaved_since >= self._flush_interval
+        )
 
     def _load(
         self,
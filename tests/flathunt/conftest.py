@@ -0,0 +1,22 @@
+import json
+import os
+
+import pytest
+
+from rightmove import models
+
+
+@pytest.fixture
+def properties() -> list[models.Property]:
+    example_filepath = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "rightmove",
+        "fixtures",
+        "example_search.json",
+    )
+    with open(example_filepath) as file:
+        search_response = json.load(file)
+    return [
+        models.Property.model_validate(property)
+        for property in search_response["properties"]
+    ]
@@ -0,0 +1,122 @@
+import asyncio
+import datetime
+from typing import Any
+from unittest import mock
+
+import pytest
+
+import flathunt.app
+from rightmove import models
+
+
+async def _search(app: flathunt.app.App, location_id: str) -> None:
+    await app.search(
+        "Station",
+        location_id,
+        max_price=2000,
+        max_miles_radius=0.5,
+        max_days_since_added=7,
+        journey_coordinates={"Work": (0.0, 0.0)},
+        max_journey_timedelta=datetime.timedelta(minutes=45),
+    )
+
+
+def _app(search: Any, check_journey: Any) -> flathunt.app.App:
+    app = flathunt.app.App([], None, tfl_app_key="")
+    app._api = mock.Mock(search=search)
+    app._check_journey = check_journey
+    return app
+
+
+@mock.patch("webbrowser.open_new_tab")
+@mock.patch("builtins.input")
+def test_search_checks_each_property_journey(
+    mock_input: mock.Mock,
+    mock_open_new_tab: mock.Mock,
+    properties: list[models.Property],
+) -> None:
+    # GIVEN: Only the first property's journey is acceptable.
+    check_journey = mock.AsyncMock(side_effect=[True] + [False] * (len(properties) - 1))
+    app = _app(mock.AsyncMock(return_value=properties), check_journey)
+    # WHEN: Searching near somewhere other than a station.
+    asyncio.run(_search(app, "REGION^1"))
+    # THEN: Every priced property's journey should be awaited, without
+    #  checking the location itself.
+    priced = [property for property in properties if property.price]
+    assert check_journey.await_count == len(priced)
+    assert check_journey.await_args_list[0].kwargs["location"] == (
+        priced[0].location.latitude,
+        priced[0].location.longitude,
+    )
+    # THEN: Only the first property should be shown.
+    mock_open_new_tab.assert_called_once()
+
+
+def test_search_cancels_search_when_station_is_too_far() -> None:
+    # GIVEN: A search that is still running when the station is rejected.
+    started = asyncio.Event()
+    cancelled = False
+
+    async def search(_: Any) -> list[models.Property]:
+        nonlocal cancelled
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        return []
+
+    async def check_journey(**kwargs: Any) -> bool:
+        await started.wait()
+        return False
+
+    check_journey_mock = mock.AsyncMock(side_effect=check_journey)
+    app = _app(search, check_journey_mock)
+
+    async def main() -> bool:
+        # WHEN: Searching near the station.
+        await _search(app, "STATION^1")
+        return cancelled
+
+    # THEN: The search should be cancelled and awaited before returning.
+    assert asyncio.run(main())
+    # THEN: The station itself should have been checked.
+    check_journey_mock.assert_awaited_once()
+    assert check_journey_mock.await_args.kwargs["location"] == "Station"
+
+
+def test_search_cancels_search_when_station_check_fails() -> None:
+    # GIVEN: A station journey check that raises while the search is running.
+    search_task: list[asyncio.Task[Any]] = []
+
+    async def search(_: Any) -> list[models.Property]:
+        search_task.append(asyncio.current_task())
+        await asyncio.Event().wait()
+        return []
+
+    async def check_journey(**kwargs: Any) -> bool:
+        await asyncio.sleep(0)
+        raise RuntimeError("TfL is down")
+
+    app = _app(search, check_journey)
+
+    async def main() -> None:
+        # WHEN: Searching near the station.
+        # THEN: The error should reach the caller, with the search finished.
+        with pytest.raises(RuntimeError, match="TfL is down"):
+            await _search(app, "STATION^1")
+        assert search_task[0].cancelled()
+
+    asyncio.run(main())
+
+
+def test_app_closes_clients() -> None:
+    async def main() -> flathunt.app.App:
+        async with flathunt.app.App([], None, tfl_app_key="") as app:
+            pass
+        return app
+
+    app = asyncio.run(main())
+    assert app._api._raw_api.client.is_closed
+    assert app._tfl._throttled_client.is_closed
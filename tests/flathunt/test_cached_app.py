@@ -0,0 +1,198 @@
+import asyncio
+import datetime
+import threading
+from collections.abc import AsyncIterator, Iterable, Iterator
+from typing import Any, Optional
+from unittest import mock
+
+import pydantic
+import pytest
+
+import flathunt.cached_app
+from rightmove import models
+
+
+def _app(
+    suitable_property: Any,
+    property_cache: Optional[Any] = None,
+) -> flathunt.cached_app.App:
+    app = flathunt.cached_app.App(
+        [],
+        property_cache,
+        journey_cache=None,
+        tfl_api=mock.Mock(),
+        progress_bar=False,
+    )
+    app._suitable_property = suitable_property
+    return app
+
+
+def _search(
+    app: flathunt.cached_app.App, properties: Any
+) -> AsyncIterator[models.Property]:
+    return app.search(
+        properties,
+        max_price=2000,
+        max_days_since_added=7,
+        journey_coordinates={"Work": (0.0, 0.0)},
+        max_journey_timedelta=datetime.timedelta(minutes=45),
+    )
+
+
+async def _collect(properties: AsyncIterator[models.Property]) -> list[int]:
+    return [property.id async for property in properties]
+
+
+def test_search_streams_from_async_iterable(
+    properties: list[models.Property],
+) -> None:
+    # GIVEN: A source that stalls after its first property until released.
+    release = asyncio.Event()
+
+    async def source() -> AsyncIterator[models.Property]:
+        yield properties[0]
+        await release.wait()
+        for property in properties[1:]:
+            yield property
+
+    app = _app(mock.AsyncMock(return_value=None))
+
+    async def main() -> list[int]:
+        results = _search(app, source())
+        # WHEN: Taking the first result.
+        first = await anext(results)
+        # THEN: It should arrive before the source has finished.
+        assert first.id == properties[0].id
+        assert not release.is_set()
+        release.set()
+        return [first.id] + await _collect(results)
+
+    ids = asyncio.run(main())
+    assert sorted(ids) == sorted(property.id for property in properties)
+
+
+def test_search_drives_sync_iterator_off_the_event_loop(
+    properties: list[models.Property],
+) -> None:
+    # GIVEN: A lazy sync source, like `Rightmove.iter_search`.
+    threads = []
+
+    def source() -> Iterator[models.Property]:
+        for property in properties:
+            threads.append(threading.current_thread())
+            yield property
+
+    app = _app(mock.AsyncMock(return_value=None))
+    # WHEN: Searching it.
+    ids = asyncio.run(_collect(_search(app, source())))
+    # THEN: Every property should be returned, each fetched off the loop.
+    assert sorted(ids) == sorted(property.id for property in properties)
+    assert threading.main_thread() not in threads
+
+
+def test_search_skips_cached_and_unsuitable_properties(
+    properties: list[models.Property],
+) -> None:
+    # GIVEN: The first property is cached and the second is unsuitable.
+    property_cache = mock.Mock()
+    property_cache.contains_property_id.side_effect = lambda id: id == properties[0].id
+
+    async def suitable_property(
+        property: models.Property, **kwargs: Any
+    ) -> Optional[Iterable[str]]:
+        if property.id == properties[1].id:
+            return ("Skipping %s", property.id)
+        return None
+
+    suitable_property_mock = mock.AsyncMock(side_effect=suitable_property)
+    app = _app(suitable_property_mock, property_cache)
+    # WHEN: Searching.
+    ids = asyncio.run(_collect(_search(app, properties)))
+    # THEN: The cached property shouldn't be checked, and neither it nor the
+    #  unsuitable property should be returned.
+    cached_id, unsuitable_id = properties[0].id, properties[1].id
+    assert sorted(ids) == sorted(
+        property.id
+        for property in properties
+        if property.id not in (cached_id, unsuitable_id)
+    )
+    checked_ids = [
+        call.kwargs["property"].id for call in suitable_property_mock.await_args_list
+    ]
+    assert cached_id not in checked_ids
+    assert unsuitable_id in checked_ids
+
+
+def test_search_raises_check_errors(properties: list[models.Property]) -> None:
+    # GIVEN: A property check that fails.
+    app = _app(mock.AsyncMock(side_effect=RuntimeError("TfL is down")))
+    # WHEN: Searching.
+    # THEN: The error should reach the caller.
+    with pytest.raises(RuntimeError, match="TfL is down"):
+        asyncio.run(_collect(_search(app, properties)))
+
+
+def test_search_cancels_work_when_consumer_stops(
+    properties: list[models.Property],
+) -> None:
+    # GIVEN: An endless source where every check but the first never finishes.
+    source_closed = False
+    pending_checks: list[asyncio.Task[Any]] = []
+
+    async def source() -> AsyncIterator[models.Property]:
+        nonlocal source_closed
+        try:
+            while True:
+                for property in properties:
+                    yield property
+                    await asyncio.sleep(0)
+        finally:
+            source_closed = True
+
+    async def suitable_property(
+        property: models.Property, **kwargs: Any
+    ) -> Optional[Iterable[str]]:
+        if property.id != properties[0].id:
+            pending_checks.append(asyncio.current_task())
+            await asyncio.Event().wait()
+        return None
+
+    app = _app(suitable_property)
+
+    async def main() -> None:
+        results = _search(app, source())
+        # WHEN: The consumer stops after the first result.
+        await anext(results)
+        await results.aclose()
+        # THEN: The source and any outstanding checks should be cancelled.
+        assert source_closed
+        assert pending_checks
+        assert all(task.cancelled() for task in pending_checks)
+
+    asyncio.run(main())
+
+
+def test_search_expands_suitable_summaries(
+    properties: list[models.Property],
+) -> None:
+    # GIVEN: Summaries of the properties, of which only the first is suitable.
+    summaries = models.validate_property_summaries_json(
+        pydantic.TypeAdapter(list[models.Property]).dump_json(properties)
+    )
+
+    async def suitable_property(
+        property: models.PropertySummary, **kwargs: Any
+    ) -> Optional[Iterable[str]]:
+        if property is summaries[0]:
+            return None
+        return ("Skipping %s", property.id)
+
+    app = _app(suitable_property)
+
+    async def main() -> list[models.Property]:
+        return [property async for property in _search(app, summaries)]
+
+    # WHEN: Searching them.
+    results = asyncio.run(main())
+    # THEN: Only the suitable one should be returned, as a full property.
+    assert results == [properties[0]]
@@ -0,0 +1,186 @@
+import itertools
+import math
+import random
+
+from flathunt.coverage import (
+    BoundingBox,
+    SearchArea,
+    clip,
+    plan_tiles,
+    simplify,
+    split,
+)
+
+
+def _square(
+    min_point: tuple[float, float], max_point: tuple[float, float]
+) -> list[tuple[float, float]]:
+    (min_y, min_x), (max_y, max_x) = min_point, max_point
+    return [(min_y, min_x), (min_y, max_x), (max_y, max_x), (max_y, min_x)]
+
+
+def _overlap(a: BoundingBox, b: BoundingBox) -> bool:
+    return (
+        a[0][0] < b[1][0]
+        and b[0][0] < a[1][0]
+        and a[0][1] < b[1][1]
+        and b[0][1] < a[1][1]
+    )
+
+
+def test_overlapping_polygons_are_tiled_once() -> None:
+    # GIVEN: Two heavily overlapping polygons.
+    polygons = [
+        _square((0.05, 0.05), (0.35, 0.35)),
+        _square((0.15, 0.15), (0.35, 0.35)),
+    ]
+    # WHEN: Planning tiles over them.
+    tiles = plan_tiles(polygons, 0.1)
+    # THEN: Their union should be covered by cells that don't overlap.
+    assert len(tiles) == 16
+    assert not any(_overlap(a, b) for a, b in itertools.combinations(tiles, 2))
+
+
+def test_only_cells_touching_a_polygon_are_tiled() -> None:
+    # GIVEN: An L shaped polygon, whose bounding box spans 4 cells.
+    polygons = [
+        [
+            (0.01, 0.01),
+            (0.01, 0.19),
+            (0.09, 0.19),
+            (0.09, 0.09),
+            (0.19, 0.09),
+            (0.19, 0.01),
+        ]
+    ]
+    # WHEN: Planning tiles over it.
+    tiles = plan_tiles(polygons, 0.1)
+    # THEN: The cell in the crook of the L should not be tiled.
+    assert tiles == [
+        ((0.0, 0.0), (0.1, 0.1)),
+        ((0.0, 0.1), (0.1, 0.2)),
+        ((0.1, 0.0), (0.2, 0.1)),
+    ]
+
+
+def test_cells_inside_and_around_polygons_are_tiled() -> None:
+    # GIVEN: A polygon inside one cell, and one containing a cell without any
+    #  of its vertices in it.
+    polygons = [
+        _square((1.02, 1.02), (1.08, 1.08)),
+        _square((-0.05, -0.05), (0.15, 0.15)),
+    ]
+    # WHEN: Planning tiles over them.
+    tiles = plan_tiles(polygons, 0.1)
+    # THEN: Both should be covered.
+    assert ((0.0, 0.0), (0.1, 0.1)) in tiles
+    assert ((1.0, 1.0), (1.1, 1.1)) in tiles
+    assert len(tiles) == 1 + 9
+
+
+def _area(bounding_box: BoundingBox) -> float:
+    (min_y, min_x), (max_y, max_x) = bounding_box
+    return (max_y - min_y) * (max_x - min_x)
+
+
+def test_split_cuts_at_the_density() -> None:
+    # GIVEN: Points crowded into one corner of a box.
+    bounding_box = ((0.0, 0.0), (1.0, 2.0))
+    rng = random.Random(0)
+    points = [(rng.uniform(0, 0.2), rng.uniform(0, 0.4)) for _ in range(400)]
+    # WHEN: Splitting it into 4 parts.
+    parts = split(bounding_box, points, 4)
+    # THEN: The parts should cover it without overlapping, with a quarter of
+    #  the points in each.
+    assert len(parts) == 4
+    assert not any(_overlap(a, b) for a, b in itertools.combinations(parts, 2))
+    assert abs(sum(map(_area, parts)) - _area(bounding_box)) < 1e-9
+    for (min_y, min_x), (max_y, max_x) in parts:
+        inside = sum(min_y <= y <= max_y and min_x <= x <= max_x for y, x in points)
+        assert inside == 100
+
+
+def test_split_without_points_cuts_the_middle() -> None:
+    # GIVEN: A box with no points in it.
+    bounding_box = ((0.0, 0.0), (2.0, 1.0))
+    # WHEN: Splitting it into 3 parts, ignoring points outside it.
+    parts = split(bounding_box, [(5.0, 5.0)], 3)
+    # THEN: It should be cut across its longer side, and then in half again.
+    assert parts == [
+        ((0.0, 0.0), (1.0, 1.0)),
+        ((1.0, 0.0), (1.5, 1.0)),
+        ((1.5, 0.0), (2.0, 1.0)),
+    ]
+
+
+def test_simplify_drops_vertices_within_tolerance() -> None:
+    # GIVEN: A closed square with a slight bump in one side.
+    polygon = [(0.0, 0.0), (0.0, 1.0), (0.0001, 2.0), (0.0, 3.0), (3.0, 3.0)]
+    polygon += [(3.0, 0.0), (0.0, 0.0)]
+    # WHEN: Simplifying it.
+    simplified = simplify(polygon, 0.001)
+    # THEN: Only its corners should be left, without repeating the first.
+    assert simplified == [(0.0, 0.0), (0.0, 3.0), (3.0, 3.0), (3.0, 0.0)]
+
+
+def test_simplify_by_an_infinite_tolerance() -> None:
+    # GIVEN: A square, which collapses when simplified by its whole span.
+    square = _square((0.0, 0.0), (1.0, 1.0))
+    # WHEN: Simplifying it by an infinite tolerance.
+    simplified = simplify(square, math.inf)
+    # THEN: It should be kept whole, rather than halving the tolerance forever.
+    assert simplified == square
+
+
+def test_simplify_does_not_cross_itself() -> None:
+    # GIVEN: A polygon that would cross itself if simplified as much as asked.
+    polygon = [
+        (0.03, 0.85),
+        (0.24, 0.17),
+        (0.5, 0.05),
+        (0.28, -0.01),
+        (0.72, -0.07),
+        (-0.21, -0.13),
+        (-0.55, 0.25),
+        (-0.26, 0.48),
+        (-0.01, 0.92),
+    ]
+    # WHEN: Simplifying it.
+    simplified = simplify(polygon, 0.3)
+    # THEN: The notch it would cut across should be kept.
+    assert simplified == [
+        (0.03, 0.85),
+        (0.24, 0.17),
+        (0.5, 0.05),
+        (0.28, -0.01),
+        (0.72, -0.07),
+        (-0.21, -0.13),
+        (-0.55, 0.25),
+    ]
+
+
+def test_clip_keeps_the_part_in_the_box() -> None:
+    # GIVEN: A triangle overhanging a box.
+    triangle = [(0.0, 0.0), (2.0, 0.0), (0.0, 2.0)]
+    # WHEN: Clipping it to the box.
+    clipped = clip(triangle, ((0.5, 0.5), (1.5, 1.5)))
+    # THEN: Only the corner of the box under its long side should be left.
+    assert clipped == [(0.5, 0.5), (1.5, 0.5), (0.5, 1.5)]
+    assert clip(triangle, ((5.0, 5.0), (6.0, 6.0))) == []
+
+
+def test_area_outlines_the_polygons_in_a_box() -> None:
+    # GIVEN: Two triangles, side by side.
+    area = SearchArea(
+        [
+            [(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)],
+            [(0.0, 2.0), (1.0, 2.0), (0.0, 3.0)],
+        ]
+    )
+    # WHEN: Outlining boxes around one and both of them.
+    one = area.outline(((-1.0, -1.0), (1.0, 1.0)))
+    both = area.outline(((-1.0, -1.0), (1.0, 3.0)))
+    # THEN: One should be outlined exactly, and both by their convex hull.
+    assert sorted(one) == [(0.0, 0.0), (0.0, 1.0), (1.0, 0.0)]
+    assert sorted(both) == [(0.0, 0.0), (0.0, 3.0), (1.0, 0.0), (1.0, 2.0)]
+    assert not area.touches(((0.6, 0.6), (0.9, 1.9)))
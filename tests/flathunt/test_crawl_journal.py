@@ -0,0 +1,76 @@
+import os
+import tempfile
+
+import pytest
+
+from flathunt.coverage import split
+from flathunt.crawl_journal import CrawlJournal
+from rightmove.fake_server import synthetic_properties
+from rightmove.models import Location, Property, PropertyLocation
+
+_TILE = ((0.0, 0.0), (1.0, 1.0))
+
+
+def test_resumed_journal_has_recorded_progress() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "journal.jsonl")
+        # GIVEN: A journal of a split tile, one of its parts, and a property.
+        parts = split(_TILE, [], 2)
+        location = Location(latitude=0.25, longitude=0.5)
+        property = Property.model_validate(synthetic_properties(1)[0])
+        with CrawlJournal(filepath) as journal:
+            journal.record_tile(_TILE, parts, [])
+            journal.record_tile(
+                parts[0], [], [PropertyLocation(id=1, location=location)]
+            )
+            journal.record_property(property)
+        # WHEN: Resuming it.
+        with CrawlJournal(filepath, resume=True) as resumed:
+            pass
+        with pytest.raises(FileExistsError):
+            CrawlJournal(filepath)
+        with CrawlJournal(filepath, overwrite=True) as restarted:
+            pass
+    # THEN: Only the unsearched part should be pending, with what was found.
+    # THEN: It should only be started afresh if asked to.
+    assert resumed.pending(_TILE) == [parts[1]]
+    assert resumed.property_locations == {1: location}
+    assert resumed.properties == {property.id: property}
+    assert restarted.pending(_TILE) == [_TILE]
+
+
+def test_resume_drops_a_line_cut_short() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "journal.jsonl")
+        # GIVEN: A journal whose last line was cut short.
+        parts = split(_TILE, [], 2)
+        with CrawlJournal(filepath) as journal:
+            journal.record_tile(_TILE, parts, [])
+        with open(filepath, "a") as file:
+            file.write('{"tile": [[0.0, 0.0], [0.5')
+        # WHEN: Resuming it, and recording more.
+        with CrawlJournal(filepath, resume=True) as journal:
+            journal.record_tile(parts[0], [], [])
+        with CrawlJournal(filepath, resume=True) as resumed:
+            pass
+    # THEN: Everything but the cut short line should be kept.
+    assert resumed.pending(_TILE) == [parts[1]]
+
+
+def test_resume_refuses_a_corrupt_line_within_the_journal() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "journal.jsonl")
+        # GIVEN: A journal with a corrupt line before others.
+        parts = split(_TILE, [], 2)
+        with CrawlJournal(filepath) as journal:
+            journal.record_tile(_TILE, parts, [])
+        with open(filepath, "r+") as file:
+            lines = file.readlines()
+            file.write("{not json\n")
+            file.writelines(lines)
+        size = os.path.getsize(filepath)
+        # WHEN: Resuming it.
+        # THEN: It should fail, keeping every line.
+        with pytest.raises(ValueError, match="Line 2"):
+            CrawlJournal(filepath, resume=True)
+        assert os.path.getsize(filepath) == size
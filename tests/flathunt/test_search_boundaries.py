@@ -0,0 +1,258 @@
+import datetime
+import math
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from flathunt.coverage import SearchArea, plan_tiles
+from flathunt.crawl_journal import CrawlJournal
+from flathunt.scripts import search_boundaries
+from flathunt.tile_cache import TileDensityCache
+from rightmove.api import SEARCH_MAP_MAX_RESULTS, Rightmove, SearchQuery
+from rightmove.fake_server import FakeRightmoveServer, synthetic_properties
+from rightmove.models import Location, Property, PropertyLocation
+
+_BOUNDS = ((51.0, -1.0), (52.0, 1.0))
+
+
+def test_crawl_finds_every_property() -> None:
+    # GIVEN: Far more properties than one map search returns.
+    properties = synthetic_properties(3000, bounds=_BOUNDS, seed=2)
+    with (
+        FakeRightmoveServer(properties) as server,
+        Rightmove(base_url=server.base_url) as api,
+    ):
+        # WHEN: Crawling the area they are in, split into two boxes.
+        property_ids = search_boundaries._crawl(
+            api, [((51.0, -1.0), (52.0, 0.0)), ((51.0, 0.0), (52.0, 1.0))], 4
+        )
+    # THEN: Every property with a bedroom should be found.
+    assert property_ids.keys() == {
+        property["id"] for property in properties if property["bedrooms"] >= 1
+    }
+    assert server.requests > len(properties) / SEARCH_MAP_MAX_RESULTS
+
+
+def test_crawl_searches_tiles_concurrently() -> None:
+    # GIVEN: An API whose first tile must be split into 4.
+    lock = threading.Lock()
+    calls = 0
+    active = 0
+    max_active = 0
+
+    def map_search(query: SearchQuery) -> tuple[list[PropertyLocation], int]:
+        nonlocal calls, active, max_active
+        with lock:
+            calls += 1
+            first = calls == 1
+            active += 1
+            max_active = max(max_active, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return [], SEARCH_MAP_MAX_RESULTS * 3 if first else 0
+
+    api = mock.create_autospec(Rightmove, instance=True)
+    api.map_search.side_effect = map_search
+    # WHEN: Crawling it with 3 workers.
+    search_boundaries._crawl(api, [_BOUNDS], 3)
+    # THEN: The parts should be searched 3 at a time.
+    assert api.map_search.call_count == 5
+    assert max_active == 3
+
+
+def test_crawl_starts_from_cached_leaves() -> None:
+    # GIVEN: An area crawled before with a tile cache.
+    properties = synthetic_properties(3000, bounds=_BOUNDS, seed=3)
+    with (
+        tempfile.TemporaryDirectory() as tmpdir,
+        FakeRightmoveServer(properties) as server,
+        Rightmove(base_url=server.base_url) as api,
+    ):
+        filepath = os.path.join(tmpdir, "tiles.json")
+        tile_cache = TileDensityCache(filepath)
+        first_ids = search_boundaries._crawl(api, [_BOUNDS], 4, tile_cache)
+        first_requests = server.requests
+        tile_cache.save()
+        # WHEN: Crawling it again.
+        second_ids = search_boundaries._crawl(
+            api, [_BOUNDS], 4, TileDensityCache(filepath)
+        )
+        second_requests = server.requests - first_requests
+    # THEN: Only the leaf tiles should be searched, finding the same properties.
+    assert second_requests == len(tile_cache.leaves(_BOUNDS))
+    assert second_requests < first_requests
+    assert second_ids == first_ids
+
+
+def test_crawl_splits_cached_leaves_that_overflow() -> None:
+    # GIVEN: An area crawled before with a tile cache.
+    properties = synthetic_properties(3000, bounds=_BOUNDS, seed=3)
+    with (
+        tempfile.TemporaryDirectory() as tmpdir,
+        FakeRightmoveServer(properties) as server,
+        Rightmove(base_url=server.base_url) as api,
+    ):
+        tile_cache = TileDensityCache(os.path.join(tmpdir, "tiles.json"))
+        search_boundaries._crawl(api, [_BOUNDS], 4, tile_cache)
+        leaves = tile_cache.leaves(_BOUNDS)
+        # WHEN: Crawling it again after many properties are added in one corner.
+        added = synthetic_properties(
+            SEARCH_MAP_MAX_RESULTS * 2, bounds=((51.0, -1.0), (51.1, -0.9)), seed=4
+        )
+        for index, property in enumerate(added):
+            property["id"] = 10_000_000 + index
+        server.properties.extend(added)
+        property_ids = search_boundaries._crawl(api, [_BOUNDS], 4, tile_cache)
+    # THEN: The leaves they overflow should be split, finding all of them.
+    assert len(tile_cache.leaves(_BOUNDS)) > len(leaves)
+    assert property_ids.keys() >= {
+        property["id"] for property in added if property["bedrooms"] >= 1
+    }
+
+
+def test_incremental_search_only_downloads_changed_properties() -> None:
+    # GIVEN: A snapshot of most properties, one of which has since moved, and
+    #  one of which was downloaded long ago.
+    properties = [
+        property
+        for property in synthetic_properties(300, bounds=_BOUNDS, seed=5)
+        if property["bedrooms"] >= 1
+    ]
+    historical_properties = [
+        Property.model_validate(property) for property in properties[:200]
+    ]
+    moved = historical_properties[0] = historical_properties[0].model_copy(
+        update={"location": Location(latitude=51.5, longitude=0.5)}
+    )
+    now = datetime.datetime.now(datetime.timezone.utc)
+    fetch_times = {property.id: now for property in historical_properties}
+    stale = historical_properties[1]
+    fetch_times[stale.id] = now - datetime.timedelta(days=30)
+    with (
+        FakeRightmoveServer(properties) as server,
+        Rightmove(base_url=server.base_url) as api,
+        mock.patch.object(
+            api, "search_by_ids_many", wraps=api.search_by_ids_many
+        ) as search_by_ids_many,
+    ):
+        # WHEN: Searching incrementally.
+        found = search_boundaries._map_search(
+            api,
+            [("AREA", [(-1.0, 51.0), (1.0, 51.0), (1.0, 52.0), (-1.0, 52.0)])],
+            historical_properties,
+            4,
+            1.0,
+            None,
+            fetch_times,
+            datetime.timedelta(days=7),
+        )
+    # THEN: Only new, moved and stale properties should be downloaded, and the
+    #  rest carried forward.
+    ((downloaded_ids, _), _) = search_by_ids_many.call_args
+    assert set(downloaded_ids) == {
+        moved.id,
+        stale.id,
+        *(property["id"] for property in properties[200:]),
+    }
+    assert [property.id for property in found] == sorted(
+        property["id"] for property in properties
+    )
+    assert historical_properties[2] in found
+    assert fetch_times[stale.id] >= now
+
+
+def test_interrupted_crawl_resumes_from_its_journal() -> None:
+    # GIVEN: A crawl that lost its connection after searching 6 tiles.
+    properties = synthetic_properties(3000, bounds=_BOUNDS, seed=6)
+    with (
+        tempfile.TemporaryDirectory() as tmpdir,
+        FakeRightmoveServer(properties) as server,
+        Rightmove(base_url=server.base_url) as api,
+    ):
+        search_boundaries._crawl(api, [_BOUNDS], 4)
+        uninterrupted_requests = server.requests
+        filepath = os.path.join(tmpdir, "journal.jsonl")
+        map_search = api.map_search
+
+        def failing_map_search(
+            query: SearchQuery,
+        ) -> tuple[list[PropertyLocation], int]:
+            if mock_map_search.call_count > 6:
+                raise ConnectionError()
+            # else...
+            return map_search(query)
+
+        with (
+            mock.patch.object(
+                api, "map_search", side_effect=failing_map_search
+            ) as mock_map_search,
+            CrawlJournal(filepath) as journal,
+        ):
+            try:
+                search_boundaries._crawl(api, [_BOUNDS], 1, journal=journal)
+            except ConnectionError:
+                pass
+        requests = server.requests
+        # WHEN: Resuming it.
+        with CrawlJournal(filepath, resume=True) as journal:
+            property_ids = search_boundaries._crawl(api, [_BOUNDS], 4, journal=journal)
+        resumed_requests = server.requests - requests
+    # THEN: Every property should be found, without searching those 6 again.
+    assert property_ids.keys() == {
+        property["id"] for property in properties if property["bedrooms"] >= 1
+    }
+    assert resumed_requests == uninterrupted_requests - 6
+
+
+def test_crawl_searches_the_outline_of_an_area() -> None:
+    # GIVEN: A triangle covering half of the properties' bounds.
+    properties = synthetic_properties(3000, bounds=_BOUNDS, seed=7)
+    triangle = [(51.0, -1.0), (52.0, 1.0), (51.0, 1.0)]
+    tiles = plan_tiles([triangle], 0.5)
+    with (
+        FakeRightmoveServer(properties) as server,
+        Rightmove(base_url=server.base_url) as api,
+    ):
+        # WHEN: Crawling it with and without its outline.
+        property_ids = search_boundaries._crawl(
+            api, tiles, 4, area=SearchArea([triangle])
+        )
+        outline_requests = server.requests
+        search_boundaries._crawl(api, tiles, 4)
+        rectangle_requests = server.requests - outline_requests
+    # THEN: Only properties in it should be found, with fewer searches.
+    assert property_ids.keys() == {
+        property["id"]
+        for property in properties
+        if property["bedrooms"] >= 1
+        and property["location"]["latitude"] - 51.0
+        < (property["location"]["longitude"] + 1.0) / 2
+    }
+    assert outline_requests < rectangle_requests
+
+
+def test_boundary_too_long_for_a_url_is_searched_by_its_bounds() -> None:
+    # GIVEN: A star whose every simplification crosses itself, and whose
+    #  outline is too long for a URL.
+    vertices = 301
+    star = [
+        (
+            51.5 + 0.01 * math.cos(2 * math.pi * (i * 150 % vertices) / vertices),
+            -0.1 + 0.01 * math.sin(2 * math.pi * (i * 150 % vertices) / vertices),
+        )
+        for i in range(vertices)
+    ]
+    # WHEN: Simplifying it for a URL.
+    simplified = search_boundaries._simplify_for_url(star)
+    # THEN: Its bounding rectangle should be searched instead.
+    min_y, max_y = min(y for y, _ in star), max(y for y, _ in star)
+    min_x, max_x = min(x for _, x in star), max(x for _, x in star)
+    assert simplified == [
+        (min_y, min_x),
+        (min_y, max_x),
+        (max_y, max_x),
+        (max_y, min_x),
+    ]
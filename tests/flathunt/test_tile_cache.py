@@ -0,0 +1,38 @@
+import os
+import tempfile
+
+from flathunt.coverage import split
+from flathunt.tile_cache import TileDensityCache
+
+_TILE = ((0.0, 0.0), (1.0, 1.0))
+
+
+def test_leaves_follow_recorded_splits() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # GIVEN: A tile split twice over, down one part.
+        cache = TileDensityCache(os.path.join(tmpdir, "tiles.json"))
+        parts = split(_TILE, [], 4)
+        cache.record(_TILE, 2000, parts)
+        cache.record(parts[0], 800, split(parts[0], [], 2))
+        cache.record(parts[1], 300)
+        # WHEN: Getting its leaves.
+        leaves = cache.leaves(_TILE)
+    # THEN: Split tiles should be replaced by their parts, and the rest kept.
+    assert leaves == [*split(parts[0], [], 2), *parts[1:]]
+    assert cache.leaves(parts[3]) == [parts[3]]
+
+
+def test_saved_tiles_are_loaded_unless_reset() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "tiles.json")
+        # GIVEN: A saved split tile.
+        cache = TileDensityCache(filepath)
+        cache.record(_TILE, 2000, split(_TILE, [], 2))
+        cache.save()
+        # WHEN: Loading it in a later run.
+        loaded = TileDensityCache(filepath)
+        reset = TileDensityCache(filepath, reset=True)
+    # THEN: It should be remembered, unless reset.
+    assert loaded.leaves(_TILE) == split(_TILE, [], 2)
+    assert len(reset) == 0
+    assert reset.leaves(_TILE) == [_TILE]
@@ -0,0 +1,196 @@
+import asyncio
+import datetime
+import os
+import tempfile
+from typing import Any, Optional
+from unittest import mock
+
+import flathunt.cached_app
+from flathunt.watch import ListingWatcher
+from rightmove.api import AsyncRightmove, SearchQuery
+from rightmove.fake_server import FakeRightmoveServer, synthetic_properties
+from rightmove.models import PropertySummary
+from rightmove.property_cache import PropertyCache
+
+_BOUNDS = ((51.4, -0.1), (51.6, 0.1))
+
+_LOCATIONS = {"Centre": (51.5, 0.0)}
+
+_QUERY = SearchQuery(
+    location_identifier="REGION^0",
+    radius=20,
+    min_bedrooms=0,
+    is_fetching=True,
+    max_days_since_added=7,
+)
+
+
+def _new_property(id: int, **updates: Any) -> dict[str, Any]:
+    (property,) = synthetic_properties(1, bounds=_BOUNDS, seed=id)
+    property.update(
+        id=id,
+        firstVisibleDate=datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        **updates,
+    )
+    return property
+
+
+def test_poll_stops_at_the_watermark() -> None:
+    # GIVEN: A search polled once, with a featured old listing in it.
+    properties = synthetic_properties(500, bounds=_BOUNDS, seed=4)
+    properties[0]["featuredProperty"] = True
+    properties[0]["firstVisibleDate"] = (
+        datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=6)
+    ).isoformat()
+
+    async def poll() -> tuple[set[int], list[int], int]:
+        with FakeRightmoveServer(properties, _LOCATIONS) as server:
+            async with AsyncRightmove(
+                base_url=server.base_url, max_concurrent_pages=1
+            ) as api:
+                watcher = ListingWatcher(api, {"Centre": _QUERY})
+                first = {summary.id for summary in await watcher.poll("Centre")}
+                # WHEN: Polling it again after two listings are added.
+                server.properties.append(_new_property(1001))
+                server.properties.append(_new_property(1002))
+                requests = server.requests
+                second = [summary.id for summary in await watcher.poll("Centre")]
+                return first, second, server.requests - requests
+
+    first, second, requests = asyncio.run(poll())
+    # THEN: Only the new listings should be found, from one page.
+    assert first
+    assert sorted(second) == [1001, 1002]
+    assert requests == 1
+
+
+def test_watch_yields_each_new_listing_once() -> None:
+    # GIVEN: Two overlapping searches of a server with no listings yet.
+    sleeps: list[float] = []
+
+    async def watch() -> list[int]:
+        with FakeRightmoveServer([], _LOCATIONS) as server:
+            async with AsyncRightmove(
+                base_url=server.base_url, max_concurrent_pages=1
+            ) as api:
+
+                async def sleep(seconds: float) -> None:
+                    sleeps.append(seconds)
+                    server.properties.append(_new_property(len(sleeps)))
+
+                watcher = ListingWatcher(
+                    api,
+                    {"Near": _QUERY, "Far": _QUERY.model_copy(update={"radius": 40})},
+                    interval=60.0,
+                    sleep=sleep,
+                    clock=lambda: 0.0,
+                )
+                ids = []
+                async for summary in watcher.watch():
+                    ids.append(summary.id)
+                    if len(ids) == 3:
+                        break
+                return ids
+
+    # WHEN: Watching while a listing is added between each round of polls.
+    ids = asyncio.run(watch())
+    # THEN: Each listing should be yielded once, after the wait for its round.
+    assert ids == [1, 2, 3]
+    assert sleeps == [60.0, 60.0, 60.0]
+
+
+def test_poll_finds_new_listings_past_the_list_cap() -> None:
+    # GIVEN: A search with more results than can be paged, polled once.
+    properties = synthetic_properties(3000, bounds=_BOUNDS, seed=5)
+    query = _QUERY.model_copy(update={"max_days_since_added": 60})
+
+    async def poll() -> tuple[int, list[int], int]:
+        with FakeRightmoveServer(properties, _LOCATIONS) as server:
+            async with AsyncRightmove(
+                base_url=server.base_url, max_concurrent_pages=1
+            ) as api:
+                watcher = ListingWatcher(api, {"Centre": query})
+                first = len(await watcher.poll("Centre"))
+                # WHEN: Polling it again after a cheap and a dear listing are added.
+                for id, amount in ((3001, 500), (3002, 9000)):
+                    property = _new_property(id)
+                    property["price"]["amount"] = amount
+                    server.properties.append(property)
+                requests = server.requests
+                second = [summary.id for summary in await watcher.poll("Centre")]
+                return first, second, server.requests - requests
+
+    first, second, requests = asyncio.run(poll())
+    # THEN: Both should be found from one page, whatever their price.
+    assert 1000 <= first < len(properties)
+    assert sorted(second) == [3001, 3002]
+    assert requests == 1
+
+
+class _Stop(Exception):
+    pass
+
+
+def test_restarted_watch_skips_listings_already_checked() -> None:
+    # GIVEN: A server with three new listings, of which one is suitable.
+    properties = [_new_property(id) for id in (1, 2, 3)]
+
+    async def suitable_property(
+        property: PropertySummary, **kwargs: Any
+    ) -> Optional[tuple[str, int]]:
+        return None if property.id == 1 else ("Skipping %s", property.id)
+
+    async def watch(history: str) -> tuple[list[int], mock.AsyncMock]:
+        with (
+            FakeRightmoveServer(properties, _LOCATIONS) as server,
+            PropertyCache(history) as property_cache,
+        ):
+            async with AsyncRightmove(
+                base_url=server.base_url, max_concurrent_pages=1
+            ) as api:
+
+                async def sleep(seconds: float) -> None:
+                    # Stop after the first round, once its checks are done.
+                    for _ in range(100):
+                        if not property_cache.filter_unseen([1, 2, 3]):
+                            break
+                        await asyncio.sleep(0)
+                    raise _Stop
+
+                app = flathunt.cached_app.App(
+                    [],
+                    property_cache,
+                    journey_cache=None,
+                    tfl_api=mock.Mock(),
+                    progress_bar=False,
+                )
+                check = mock.AsyncMock(side_effect=suitable_property)
+                app._suitable_property = check
+                watcher = ListingWatcher(api, {"Centre": _QUERY}, sleep=sleep)
+                ids = []
+                try:
+                    async for property in app.search(
+                        watcher.watch(),
+                        max_price=2000,
+                        max_days_since_added=7,
+                        journey_coordinates={"Work": (0.0, 0.0)},
+                        max_journey_timedelta=datetime.timedelta(minutes=45),
+                        remember=True,
+                    ):
+                        ids.append(property.id)
+                except _Stop:
+                    pass
+                return ids, check
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        history = os.path.join(tmpdir, "history.json")
+        # WHEN: Watching it, restarting, and watching it again.
+        first, first_check = asyncio.run(watch(history))
+        second, second_check = asyncio.run(watch(history))
+        remembered = PropertyCache(history).filter_unseen([1, 2, 3])
+    # THEN: Every listing should be checked once, and only the first run report any.
+    assert first == [1]
+    assert first_check.await_count == 3
+    assert second == []
+    assert second_check.await_count == 0
+    assert remembered == []
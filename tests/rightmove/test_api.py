@@ -1,6 +1,23 @@
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections.abc import Iterable
+from typing import Any, Optional
+from unittest import mock
+
+import httpx
 import pytest
+import tenacity
 
 from rightmove.api import (
+    SEARCH_BY_IDS_MAX_RESULTS,
+    AsyncRightmove,
+    HTTPError,
     Rightmove,
     SearchQuery,
     SortType,
@@ -8,6 +25,20 @@ from rightmove.api import (
     DontShow,
     FurnishType,
     PropertyType,
+    _AsyncRawRightmove,
+    _RawRightmove,
+    _drop_seen,
+    _split_overflowing_query,
+    _split_search_query,
+)
+from rightmove.connection_pool import ConnectionPool
+from rightmove.models import (
+    Location,
+    Property,
+    PropertyLocation,
+    PropertyLocationSearchResults,
+    PropertySearchResults,
+    PropertySummary,
 )
 
 
@@ -54,3 +85,515 @@ def test_api_search_smoke_test(fully_populated_search_query: SearchQuery) -> Non
     rightmove = Rightmove()
     # THEN: the search query should be executed without errors
     rightmove.search(fully_populated_search_query)
+
+
+def test_async_search_matches_sync_request(
+    fully_populated_search_query: SearchQuery, search_response: dict[str, Any]
+) -> None:
+    # GIVEN: An async client whose transport returns a single page of results.
+    requested_urls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested_urls.append(str(request.url))
+        return httpx.Response(200, json=search_response)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    rightmove = AsyncRightmove(client=client)
+
+    # WHEN: Searching.
+    properties = asyncio.run(rightmove.search(fully_populated_search_query))
+
+    # THEN: It should request the same URL as the blocking client would.
+    raw_api = _RawRightmove()
+    params = raw_api._get_search_params(fully_populated_search_query)
+    assert requested_urls == [
+        f"https://{raw_api.BASE_HOST}{raw_api._get_url('/api/_search', params)}"
+    ]
+    assert [property.id for property in properties] == [
+        property["id"] for property in search_response["properties"]
+    ]
+
+
+def _load_template_property() -> dict[str, Any]:
+    example_filepath = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "fixtures", "example_search.json"
+    )
+    with open(example_filepath) as file:
+        return json.load(file)["properties"][0]
+
+
+_TEMPLATE_PROPERTY = _load_template_property()
+
+
+def _fake_body(result_count: int, ids: Iterable[int]) -> bytes:
+    return json.dumps(
+        {
+            "resultCount": f"{result_count:,}",
+            "properties": [{**_TEMPLATE_PROPERTY, "id": id} for id in ids],
+        }
+    ).encode()
+
+
+def _fake_page(params: dict[str, Any], result_count: int) -> bytes:
+    index = params.get("index", 0)
+    page_size = params["numberOfPropertiesPerPage"]
+    return _fake_body(result_count, range(index, min(index + page_size, result_count)))
+
+
+@pytest.mark.parametrize("result_count", [0, 10, 24, 100, 1000])
+def test_search_fetches_pages_concurrently_in_order(
+    fully_populated_search_query: SearchQuery, result_count: int
+) -> None:
+    # GIVEN: A search whose results span several LIST pages.
+    lock = threading.Lock()
+    active = 0
+    max_active = 0
+    requested_indexes = []
+
+    def request(host: str, method: str, url: str, params: dict[str, Any]) -> bytes:
+        nonlocal active, max_active
+        with lock:
+            active += 1
+            max_active = max(max_active, active)
+            requested_indexes.append(params.get("index", 0))
+        time.sleep(0.01)
+        with lock:
+            active -= 1
+        return _fake_page(params, result_count)
+
+    raw_api = _RawRightmove(max_concurrent_pages=3)
+    with mock.patch.object(raw_api, "_request", side_effect=request):
+        # WHEN: Searching.
+        response = raw_api.search(fully_populated_search_query, PropertySearchResults)
+
+    # THEN: Every page should be fetched once, at most three at a time, and
+    #  reassembled in order.
+    assert [property.id for property in response.properties] == list(
+        range(result_count)
+    )
+    assert sorted(requested_indexes) == list(range(0, max(result_count, 1), 24))
+    assert max_active <= 3
+
+
+def test_async_search_fetches_pages_in_order(
+    fully_populated_search_query: SearchQuery,
+) -> None:
+    # GIVEN: An async client over a search of 100 results.
+    async def request(
+        host: str, method: str, url: str, params: dict[str, Any]
+    ) -> bytes:
+        await asyncio.sleep(0.01 * random.random())
+        return _fake_page(params, 100)
+
+    raw_api = _AsyncRawRightmove(
+        httpx.AsyncClient(transport=httpx.MockTransport(lambda _: httpx.Response(500))),
+        max_concurrent_pages=3,
+    )
+    with mock.patch.object(raw_api, "_request", side_effect=request):
+        # WHEN: Searching.
+        response = asyncio.run(
+            raw_api.search(fully_populated_search_query, PropertySearchResults)
+        )
+
+    # THEN: The pages should be reassembled in order.
+    assert [property.id for property in response.properties] == list(range(100))
+
+
+def test_iter_search_streams_pages_lazily(
+    fully_populated_search_query: SearchQuery,
+) -> None:
+    # GIVEN: A search of 240 results over 10 pages.
+    requested_indexes = []
+
+    def request(host: str, method: str, url: str, params: dict[str, Any]) -> bytes:
+        requested_indexes.append(params.get("index", 0))
+        return _fake_page(params, 240)
+
+    rightmove = Rightmove(max_concurrent_pages=2)
+    with mock.patch.object(rightmove._raw_api, "_request", side_effect=request):
+        # WHEN: Consuming only the first two pages.
+        properties = list(
+            itertools.islice(rightmove.iter_search(fully_populated_search_query), 48)
+        )
+
+    # THEN: The properties should be validated models in order, and only a
+    #  couple of pages beyond those consumed should have been requested.
+    assert [property.id for property in properties] == list(range(48))
+    assert all(isinstance(property, Property) for property in properties)
+    assert len(requested_indexes) <= 4
+
+
+class _FakeListings:
+    """Serves LIST pages of fake listings, honouring price and bedroom filters.
+
+    A featured listing with ID -1 tops every page, as promoted listings do.
+    """
+
+    def __init__(self, count: int) -> None:
+        self.listings = [
+            {"id": id, "price": 1000 + id % 1001, "bedrooms": 2 + id % 3}
+            for id in range(count)
+        ]
+        self.requested_params: list[dict[str, Any]] = []
+        self.max_active = 0
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def __call__(
+        self, host: str, method: str, url: str, params: dict[str, Any]
+    ) -> bytes:
+        with self._lock:
+            self._active += 1
+            self.max_active = max(self.max_active, self._active)
+            self.requested_params.append(params)
+        try:
+            time.sleep(0.001)
+            return self._page(params)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    async def request_async(
+        self, host: str, method: str, url: str, params: dict[str, Any]
+    ) -> bytes:
+        self.requested_params.append(params)
+        await asyncio.sleep(0.001 * random.random())
+        return self._page(params)
+
+    def _page(self, params: dict[str, Any]) -> bytes:
+        index = params.get("index", 0)
+        if index >= 1000:
+            raise AssertionError("LIST pages cannot start at or past 1000.")
+        matches = [
+            listing
+            for listing in self.listings
+            if params.get("minPrice", 0) <= listing["price"]
+            and listing["price"] <= params.get("maxPrice", float("inf"))
+            and params.get("minBedrooms", 0) <= listing["bedrooms"]
+            and listing["bedrooms"] <= params["maxBedrooms"]
+        ]
+        page_size = params["numberOfPropertiesPerPage"]
+        return _fake_body(
+            len(matches),
+            [-1] + [listing["id"] for listing in matches[index : index + page_size]],
+        )
+
+
+def _assert_unique_ids(properties: list[Property], expected: set[int]) -> None:
+    ids = [property.id for property in properties]
+    assert len(ids) == len(set(ids))
+    assert set(ids) == expected
+
+
+def test_search_splits_past_list_cap(
+    fully_populated_search_query: SearchQuery,
+) -> None:
+    # GIVEN: A search with 3000 results, three times what LIST can page through.
+    listings = _FakeListings(3000)
+    raw_api = _RawRightmove(max_concurrent_pages=3)
+    with mock.patch.object(raw_api, "_request", side_effect=listings):
+        # WHEN: Searching.
+        response = raw_api.search(fully_populated_search_query, PropertySearchResults)
+
+    # THEN: Every listing should be returned exactly once, including the
+    #  featured listing that tops every part's pages.
+    _assert_unique_ids(response.properties, set(range(3000)) | {-1})
+    # THEN: The split searches should share the concurrency limit.
+    assert listings.max_active <= 3
+
+
+def test_async_search_splits_past_list_cap(
+    fully_populated_search_query: SearchQuery,
+) -> None:
+    # GIVEN: An async client over a search with 3000 results.
+    listings = _FakeListings(3000)
+    raw_api = _AsyncRawRightmove(
+        httpx.AsyncClient(transport=httpx.MockTransport(lambda _: httpx.Response(500))),
+        max_concurrent_pages=3,
+    )
+    with mock.patch.object(raw_api, "_request", side_effect=listings.request_async):
+        # WHEN: Searching.
+        response = asyncio.run(
+            raw_api.search(fully_populated_search_query, PropertySearchResults)
+        )
+
+    # THEN: Every listing should be returned exactly once.
+    _assert_unique_ids(response.properties, set(range(3000)) | {-1})
+
+
+def test_iter_search_streams_split_search_before_planning_ends(
+    fully_populated_search_query: SearchQuery,
+) -> None:
+    # GIVEN: A search with far more results than LIST can page through.
+    listings = _FakeListings(20000)
+    raw_api = _RawRightmove(max_concurrent_pages=1)
+    with mock.patch.object(raw_api, "_request", side_effect=listings):
+        # WHEN: Taking the first page.
+        pages = raw_api.iter_search(fully_populated_search_query, PropertySearchResults)
+        next(pages)
+        pages.close()
+
+    # THEN: It should arrive once its part is planned, before the other parts.
+    assert len(listings.requested_params) < 10
+
+
+@pytest.mark.parametrize("max_price", [None, 0])
+def test_split_search_query_open_max_price(max_price: Optional[int]) -> None:
+    # GIVEN: A query with no max price.
+    query = SearchQuery(location_identifier="REGION^1", is_fetching=True)
+    query = query.model_copy(update={"max_price": max_price})
+    # WHEN: Splitting it.
+    halves = _split_search_query(query)
+    # THEN: It should split at a fixed pivot, leaving the upper half open.
+    assert halves is not None
+    lower, upper = halves
+    assert (lower.min_price, lower.max_price) == (0, 4000)
+    assert (upper.min_price, upper.max_price) == (4001, max_price)
+
+
+def test_split_search_query_by_price() -> None:
+    query = SearchQuery(
+        location_identifier="REGION^1", min_price=1000, max_price=2000, is_fetching=True
+    )
+    lower, upper = _split_search_query(query) or (None, None)
+    assert lower is not None and upper is not None
+    assert (lower.min_price, lower.max_price) == (1000, 1500)
+    assert (upper.min_price, upper.max_price) == (1501, 2000)
+
+
+@pytest.mark.parametrize(
+    "min_bedrooms, max_bedrooms, expected",
+    [(2, 4, ((2, 3), (4, 4))), (0, 1, ((0, 0), (1, 1)))],
+)
+def test_split_search_query_falls_back_to_bedrooms(
+    min_bedrooms: int,
+    max_bedrooms: int,
+    expected: tuple[tuple[int, int], tuple[int, int]],
+) -> None:
+    # GIVEN: A query whose price range cannot be split.
+    query = SearchQuery(
+        location_identifier="REGION^1",
+        min_price=1500,
+        max_price=1500,
+        min_bedrooms=min_bedrooms,
+        max_bedrooms=max_bedrooms,
+        is_fetching=True,
+    )
+    # WHEN: Splitting it.
+    halves = _split_search_query(query)
+    # THEN: It should split by bedrooms instead.
+    assert halves is not None
+    assert tuple((half.min_bedrooms, half.max_bedrooms) for half in halves) == expected
+    # THEN: A max of 0 bedrooms should still be sent, meaning studios only.
+    lower_params = _RawRightmove()._get_search_params(halves[0])
+    assert lower_params["maxBedrooms"] == expected[0][1]
+
+
+def test_split_overflowing_query_warns_when_unsplittable(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    # GIVEN: A query that cannot be split by price or bedrooms.
+    query = SearchQuery(
+        location_identifier="REGION^1",
+        min_price=1500,
+        max_price=1500,
+        min_bedrooms=2,
+        max_bedrooms=2,
+        is_fetching=True,
+    )
+    assert _split_search_query(query) is None
+    # WHEN: Its first page reports more results than can be paged through.
+    with caplog.at_level(logging.WARNING, logger="rightmove.api"):
+        halves = _split_overflowing_query(
+            query, PropertySearchResults(properties=[], result_count="1,500")
+        )
+    # THEN: It should be searched as is, with a warning.
+    assert halves is None
+    assert "cannot be split further" in caplog.text
+
+
+def test_split_overflowing_query_ignores_map_and_small_searches() -> None:
+    query = SearchQuery(location_identifier="REGION^1", is_fetching=True)
+    page = PropertySearchResults(properties=[], result_count="1,000")
+    assert _split_overflowing_query(query, page) is None
+    map_query = query.model_copy(update={"view_type": "MAP"})
+    map_page = PropertyLocationSearchResults(properties=[], result_count="5,000")
+    assert _split_overflowing_query(map_query, map_page) is None
+
+
+def test_drop_seen() -> None:
+    seen_ids = {1}
+    properties = [
+        PropertyLocation(id=id, location=Location(latitude=0, longitude=0))
+        for id in (1, 2, 2, 3)
+    ]
+    new_properties = _drop_seen(properties, seen_ids)
+    assert [property.id for property in new_properties] == [2, 3]
+    assert seen_ids == {1, 2, 3}
+
+
+def test_rightmove_closes_connection_pool() -> None:
+    # GIVEN: A client over its own connection pool.
+    with mock.patch.object(ConnectionPool, "close", autospec=True) as close:
+        # WHEN: Leaving its context.
+        with Rightmove() as api:
+            close.assert_not_called()
+        # THEN: The pool's idle connections should be closed.
+        close.assert_called_once_with(api.connection_pool)
+
+
+def test_rightmove_leaves_shared_connection_pool_open() -> None:
+    # GIVEN: A client over a connection pool passed in to share.
+    pool = mock.create_autospec(ConnectionPool, instance=True)
+    # WHEN: Leaving its context.
+    with Rightmove(connection_pool=pool) as api:
+        pass
+    # THEN: The pool should be left for whoever else shares it.
+    assert api.connection_pool is pool
+    pool.close.assert_not_called()
+
+
+def test_async_rightmove_closes_its_own_client() -> None:
+    # GIVEN: An async client over its own pooled client.
+    async def main() -> AsyncRightmove:
+        # WHEN: Leaving its context.
+        async with AsyncRightmove() as api:
+            assert not api._raw_api.client.is_closed
+        return api
+
+    api = asyncio.run(main())
+    # THEN: The pooled client should be closed.
+    assert api._raw_api.client.is_closed
+
+
+def test_async_rightmove_leaves_shared_client_open() -> None:
+    # GIVEN: An async client over a pooled client passed in to share.
+    client = httpx.AsyncClient()
+
+    async def main() -> None:
+        # WHEN: Leaving its context.
+        async with AsyncRightmove(client=client):
+            pass
+
+    asyncio.run(main())
+    # THEN: The pooled client should be left for whoever else shares it.
+    assert not client.is_closed
+
+
+def test_iter_search_summaries(fully_populated_search_query: SearchQuery) -> None:
+    # GIVEN: A search of 30 results over 2 pages.
+    rightmove = Rightmove()
+    with mock.patch.object(
+        rightmove._raw_api,
+        "_request",
+        side_effect=lambda host, method, url, params: _fake_page(params, 30),
+    ):
+        # WHEN: Searching for summaries.
+        summaries = list(rightmove.iter_search_summaries(fully_populated_search_query))
+    # THEN: Each summary should expand to its full property.
+    assert [summary.id for summary in summaries] == list(range(30))
+    assert all(isinstance(summary, PropertySummary) for summary in summaries)
+    assert [summary.to_property().id for summary in summaries] == list(range(30))
+
+
+class _FakeByIds:
+    """Serves by IDs batches, tracking how many are requested at once.
+
+    A batch including any of `fail_ids` fails the first time it is requested.
+    """
+
+    def __init__(self, fail_ids: frozenset[int] = frozenset()) -> None:
+        self.requested_ids: list[list[int]] = []
+        self.max_active = 0
+        self._active = 0
+        self._fail_ids = fail_ids
+        self._lock = threading.Lock()
+
+    def __call__(
+        self, host: str, method: str, url: str, params: dict[str, Any]
+    ) -> bytes:
+        with self._lock:
+            self._active += 1
+            self.max_active = max(self.max_active, self._active)
+        try:
+            time.sleep(0.01 * random.random())
+            return self._page(params)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    async def request_async(
+        self, host: str, method: str, url: str, params: dict[str, Any]
+    ) -> bytes:
+        await asyncio.sleep(0.01 * random.random())
+        return self._page(params)
+
+    def _page(self, params: dict[str, Any]) -> bytes:
+        ids = [int(id) for id in params["propertyIds"].split(",")]
+        with self._lock:
+            self.requested_ids.append(ids)
+            if self._fail_ids.intersection(ids):
+                self._fail_ids = self._fail_ids.difference(ids)
+                raise HTTPError("HTTP error 500: Internal Server Error")
+        return _fake_body(len(ids), ids)
+
+
+def test_search_by_ids_many_fetches_batches_concurrently() -> None:
+    # GIVEN: More IDs than fit in one by IDs request.
+    fake = _FakeByIds()
+    rightmove = Rightmove(max_concurrent_pages=3)
+    with mock.patch.object(rightmove._raw_api, "_request", side_effect=fake):
+        # WHEN: Searching by all of them.
+        properties = list(rightmove.search_by_ids_many(range(260), "RENT"))
+
+    # THEN: Every property should be returned, from batches of at most 25
+    #  requested at most three at a time.
+    assert sorted(property.id for property in properties) == list(range(260))
+    assert len(fake.requested_ids) == 11
+    assert all(len(ids) <= SEARCH_BY_IDS_MAX_RESULTS for ids in fake.requested_ids)
+    assert fake.max_active <= 3
+
+
+def test_search_by_ids_many_retries_failed_batch_alone() -> None:
+    # GIVEN: A batch that fails on its first attempt, and a client that
+    #  retries requests.
+    fake = _FakeByIds(fail_ids=frozenset({30}))
+    with mock.patch.object(_RawRightmove, "_request", side_effect=fake):
+        rightmove = Rightmove(
+            retrying=tenacity.Retrying(
+                retry=tenacity.retry_if_exception_type(HTTPError),
+                stop=tenacity.stop_after_attempt(2),
+            ),
+            max_concurrent_pages=2,
+        )
+        # WHEN: Searching by IDs spanning several batches.
+        properties = list(rightmove.search_by_ids_many(range(100), "RENT"))
+
+    # THEN: Only the failed batch should have been requested again.
+    assert sorted(property.id for property in properties) == list(range(100))
+    assert sorted(ids[0] for ids in fake.requested_ids) == [0, 25, 25, 50, 75]
+
+
+def test_async_search_by_ids_many() -> None:
+    # GIVEN: An async client over more IDs than fit in one request.
+    fake = _FakeByIds()
+    raw_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda _: httpx.Response(500))
+    )
+    rightmove = AsyncRightmove(client=raw_client, max_concurrent_pages=3)
+
+    async def main() -> list[Property]:
+        return [
+            property
+            async for property in rightmove.search_by_ids_many(range(120), "BUY")
+        ]
+
+    with mock.patch.object(
+        rightmove._raw_api, "_request", side_effect=fake.request_async
+    ):
+        # WHEN: Searching by all of them.
+        properties = asyncio.run(main())
+
+    # THEN: Every property should be returned.
+    assert sorted(property.id for property in properties) == list(range(120))
+    assert len(fake.requested_ids) == 5
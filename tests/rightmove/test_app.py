@@ -41,8 +41,8 @@ class TestApp:
             commute_coordinates = [(0.0, 0.0)]
             app = rightmove.app.App(commute_coordinates, cache)
 
-            with mock.patch("rightmove.api._RawRightmove._search") as mock_search:
-                mock_search.return_value = search_response
+            with mock.patch("rightmove.api._RawRightmove._request") as mock_request:
+                mock_request.return_value = json.dumps(search_response).encode()
                 app.search(query)
                 # THEN: The app should show all properties in the search response.
                 assert mock_open_new_tab.call_count == len(
@@ -85,8 +85,33 @@ class TestApp:
             commute_coordinates = [(0.0, 0.0)]
             cache = rightmove.property_cache.PropertyCache(cache_filepath)
             app = rightmove.app.App(commute_coordinates, cache)
-            with mock.patch("rightmove.api._RawRightmove._search") as mock_search:
-                mock_search.return_value = search_response
+            with mock.patch("rightmove.api._RawRightmove._request") as mock_request:
+                mock_request.return_value = json.dumps(search_response).encode()
                 app.search(query)
                 # THEN: The app should only show the one property that is not in the cache.
                 assert mock_open_new_tab.call_count == 1 + len(commute_coordinates)
+
+    @mock.patch("webbrowser.open_new_tab")
+    @mock.patch("builtins.input")
+    def test_app_search_saves_to_an_empty_sqlite_cache(
+        self,
+        mock_input: mock.Mock,
+        mock_open_new_tab: mock.Mock,
+        query: api.SearchQuery,
+        search_response: dict[str, Any],
+    ) -> None:
+        property_ids = [property["id"] for property in search_response["properties"]]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_filepath = os.path.join(tmpdir, "history.sqlite")
+            # GIVEN: A SQLite cache that is empty.
+            with rightmove.property_cache.open_property_cache(cache_filepath) as cache:
+                app = rightmove.app.App([], cache)
+                with mock.patch("rightmove.api._RawRightmove._request") as mock_request:
+                    mock_request.return_value = json.dumps(search_response).encode()
+                    # WHEN: Searching.
+                    app.search(query)
+            with rightmove.property_cache.open_property_cache(cache_filepath) as cache:
+                unseen_ids = cache.filter_unseen(property_ids)
+        # THEN: Every property shown should have been saved.
+        assert mock_open_new_tab.call_count == len(property_ids)
+        assert unseen_ids == []
@@ -0,0 +1,85 @@
+import concurrent.futures
+import http.server
+import threading
+from collections.abc import Iterator
+
+import pytest
+
+from rightmove.connection_pool import ConnectionPool, http_connection
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if self.path.startswith("/drop"):
+            # Close without telling the client, like an idle timeout would.
+            self.close_connection = True
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def host() -> Iterator[str]:
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_connection_is_reused(host: str) -> None:
+    # GIVEN: A pool of plain HTTP connections.
+    with ConnectionPool(http_connection) as pool:
+        # WHEN: Making several requests one after the other.
+        responses = [pool.request(host, "GET", "/", {}) for _ in range(3)]
+        # THEN: Only one connection should have been opened.
+        assert [response.body for response in responses] == [b'{"ok": true}'] * 3
+        assert [response.reused for response in responses] == [False, True, True]
+        statistics = pool.statistics
+        assert statistics.requests == 3
+        assert statistics.connections_opened == 1
+        assert statistics.connections_reused == 2
+        assert statistics.reuse_ratio == pytest.approx(2 / 3)
+
+
+def test_reconnects_when_server_drops_idle_connection(host: str) -> None:
+    with ConnectionPool(http_connection) as pool:
+        # GIVEN: A pooled connection that the server has silently closed.
+        pool.request(host, "GET", "/drop", {})
+        # WHEN: Reusing it.
+        response = pool.request(host, "GET", "/", {})
+        # THEN: The request should succeed over a fresh connection.
+        assert response.status == 200
+        assert response.body == b'{"ok": true}'
+        statistics = pool.statistics
+        assert statistics.reconnects == 1
+        assert statistics.connections_opened == 2
+        assert statistics.connections_reused == 0
+        assert statistics.reuse_ratio == 0.0
+
+
+def test_concurrent_requests(host: str) -> None:
+    # GIVEN: A pool shared between several threads.
+    with ConnectionPool(http_connection) as pool:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            # WHEN: Making many requests concurrently.
+            responses = list(
+                executor.map(
+                    lambda _: pool.request(host, "GET", "/", {}),
+                    range(40),
+                )
+            )
+        # THEN: Every request should succeed without opening a connection each.
+        assert all(response.status == 200 for response in responses)
+        assert pool.statistics.connections_opened <= 4
@@ -0,0 +1,153 @@
+import asyncio
+from collections.abc import Iterator
+
+import pytest
+import tenacity
+
+from rightmove.api import (
+    SEARCH_MAP_MAX_RESULTS,
+    AsyncRightmove,
+    HTTPError,
+    Rightmove,
+    SearchQuery,
+    polyline_identifier,
+)
+from rightmove.fake_server import FakeRightmoveServer, synthetic_properties
+from rightmove.governor import RequestGovernor
+
+_BOUNDS = ((51.0, -1.0), (52.0, 1.0))
+
+_PROPERTIES = synthetic_properties(2000, bounds=_BOUNDS, seed=1)
+
+_LOCATIONS = {"Centre": (51.5, 0.0), "Edge": (51.0, -1.0)}
+
+
+@pytest.fixture
+def server() -> Iterator[FakeRightmoveServer]:
+    with FakeRightmoveServer(_PROPERTIES, _LOCATIONS) as server:
+        yield server
+
+
+def _ids_within(
+    min_point: tuple[float, float], max_point: tuple[float, float]
+) -> set[int]:
+    return {
+        property["id"]
+        for property in _PROPERTIES
+        if min_point[0] <= property["location"]["latitude"] <= max_point[0]
+        and min_point[1] <= property["location"]["longitude"] <= max_point[1]
+    }
+
+
+def test_lookup(server: FakeRightmoveServer) -> None:
+    # GIVEN: A client of the fake server.
+    with Rightmove(base_url=server.base_url) as api:
+        # WHEN: Looking up a location.
+        matches = api.lookup("cent")
+    # THEN: It should be found by name.
+    assert [match.location_identifier for match in matches.matches] == ["REGION^0"]
+
+
+def test_search_pages_and_splits(server: FakeRightmoveServer) -> None:
+    # GIVEN: A search matching more results than the LIST pages reach.
+    query = SearchQuery(
+        location_identifier="REGION^0",
+        radius=40,
+        min_bedrooms=0,
+        is_fetching=True,
+    )
+    with Rightmove(base_url=server.base_url, max_concurrent_pages=8) as api:
+        # WHEN: Searching.
+        properties = api.search(query)
+        params = api._raw_api._get_search_params(query)
+    # THEN: Every matching property should be found once, over keep-alive.
+    expected = {property["id"] for property in server.search(params)}
+    assert len(expected) > 1000
+    assert len(properties) == len(expected)
+    assert {property.id for property in properties} == expected
+    assert api.connection_pool.statistics.connections_reused > 0
+
+
+def test_map_search_is_capped_within_polyline(server: FakeRightmoveServer) -> None:
+    # GIVEN: A polyline around a quarter of the properties.
+    min_point, max_point = (51.0, -1.0), (51.5, 0.0)
+    polyline = [
+        min_point,
+        (min_point[0], max_point[1]),
+        max_point,
+        (max_point[0], min_point[1]),
+        min_point,
+    ]
+    query = SearchQuery(
+        location_identifier=polyline_identifier(polyline),
+        min_bedrooms=0,
+        is_fetching=True,
+    )
+    with Rightmove(base_url=server.base_url) as api:
+        # WHEN: Map searching it.
+        locations, result_count = api.map_search(query)
+    # THEN: Only properties inside should be counted, and up to the cap returned.
+    expected = _ids_within(min_point, max_point)
+    assert result_count == len(expected) > SEARCH_MAP_MAX_RESULTS
+    assert len(locations) == SEARCH_MAP_MAX_RESULTS
+    assert {location.id for location in locations} <= expected
+
+
+def test_search_by_ids_many(server: FakeRightmoveServer) -> None:
+    # GIVEN: A client of the fake server.
+    with Rightmove(base_url=server.base_url) as api:
+        # WHEN: Getting properties by ID, including one that doesn't exist.
+        properties = list(api.search_by_ids_many([*range(1, 101), 99999], "RENT"))
+    # THEN: The existing ones should be returned.
+    assert sorted(property.id for property in properties) == list(range(1, 101))
+
+
+def test_rate_limit_is_retried_after(server: FakeRightmoveServer) -> None:
+    # GIVEN: A rate limited server and a governed client.
+    server.max_requests_per_second = 3.0
+    governor = RequestGovernor(initial_rate=100.0, max_rate=100.0)
+    with Rightmove(
+        retrying=tenacity.Retrying(
+            retry=tenacity.retry_if_exception_type(HTTPError), reraise=True
+        ),
+        governor=governor,
+        base_url=server.base_url,
+    ) as api:
+        # WHEN: Sending more requests than the rate allows.
+        for _ in range(4):
+            api.lookup("Edge")
+    # THEN: The client should have been asked to wait, and then succeeded.
+    assert governor.statistics.retry_afters > 0
+    assert server.requests > 4
+
+
+def test_errors(server: FakeRightmoveServer) -> None:
+    # GIVEN: A server that always fails.
+    server.error_rate = 1.0
+    with Rightmove(base_url=server.base_url) as api:
+        # WHEN: Looking up a location.
+        with pytest.raises(HTTPError) as error:
+            api.lookup("Edge")
+    # THEN: It should fail with a 503.
+    assert error.value.status == 503
+
+
+def test_async_search(server: FakeRightmoveServer) -> None:
+    # GIVEN: An async client of the fake server.
+    query = SearchQuery(
+        location_identifier="REGION^0",
+        radius=10,
+        min_bedrooms=0,
+        is_fetching=True,
+    )
+
+    async def search() -> set[int]:
+        async with AsyncRightmove(base_url=server.base_url) as api:
+            return {property.id async for property in api.iter_search(query)}
+
+    # WHEN: Searching.
+    ids = asyncio.run(search())
+    # THEN: It should find the same properties as the sync client.
+    with Rightmove(base_url=server.base_url) as api:
+        assert ids == {property.id for property in api.search(query)}
+    assert ids
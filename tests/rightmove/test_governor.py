@@ -0,0 +1,171 @@
+import asyncio
+import json
+from typing import Any
+from unittest import mock
+
+import httpx
+import tenacity
+
+from rightmove.api import AsyncRightmove, HTTPError, Rightmove, SearchQuery
+from rightmove.connection_pool import ConnectionPool, Response
+from rightmove.governor import RequestGovernor
+
+
+class _Clock:
+    "A clock that only moves when slept on."
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _governor(clock: _Clock, **kwargs: Any) -> RequestGovernor:
+    return RequestGovernor(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_paces_requests_at_rate() -> None:
+    # GIVEN: A governor allowing 2 requests per second, in bursts of 2.
+    clock = _Clock()
+    governor = _governor(clock, initial_rate=2.0, burst=2)
+    # WHEN: Sending 4 requests back to back.
+    for _ in range(4):
+        governor.acquire()
+    # THEN: The burst should go at once, then the rest every half second.
+    assert clock.sleeps == [0.5, 0.5]
+    assert governor.statistics.throttled == 2
+
+
+def test_rate_climbs_additively_on_success() -> None:
+    # GIVEN: A governor starting at 1 request per second.
+    clock = _Clock()
+    governor = _governor(clock, initial_rate=1.0, increase=1.0, max_rate=3.0)
+    rates = []
+    # WHEN: Requests keep succeeding.
+    for _ in range(6):
+        governor.complete(governor.acquire(), 200)
+        rates.append(governor.rate)
+    # THEN: The rate should climb by about 1 per second, up to the maximum.
+    assert rates[:2] == [2.0, 2.5]
+    assert rates[-1] == 3.0
+
+
+def test_backs_off_once_for_requests_in_flight() -> None:
+    # GIVEN: A governor with requests in flight.
+    clock = _Clock()
+    governor = _governor(clock, initial_rate=8.0, burst=4)
+    sent = [governor.acquire() for _ in range(3)]
+    # WHEN: They all get 429s, then a later request gets a 503.
+    for sent_at in sent:
+        governor.complete(sent_at, 429)
+    assert governor.rate == 4.0
+    clock.now += 1
+    governor.complete(governor.acquire(), 503)
+    # THEN: The errors in flight should only halve the rate once.
+    assert governor.rate == 2.0
+    assert governor.statistics.backoffs == 2
+
+
+def test_honours_retry_after() -> None:
+    # GIVEN: A governor that has been told to retry after 30 seconds.
+    clock = _Clock()
+    governor = _governor(clock, initial_rate=8.0, burst=4)
+    governor.complete(governor.acquire(), 429, retry_after=30.0)
+    # WHEN: Sending another request.
+    governor.acquire()
+    # THEN: It should wait until then, despite the burst.
+    assert clock.now == 30.0
+
+
+def test_backs_off_on_rising_latency() -> None:
+    # GIVEN: A governor that has seen steady latencies.
+    clock = _Clock()
+    governor = _governor(clock, initial_rate=4.0)
+    for _ in range(10):
+        sent_at = governor.acquire()
+        clock.now += 0.1
+        governor.complete(sent_at, 200)
+    rate = governor.rate
+    # WHEN: Responses suddenly take much longer.
+    for _ in range(3):
+        sent_at = governor.acquire()
+        clock.now += 1.0
+        governor.complete(sent_at, 200)
+    # THEN: It should back off.
+    assert governor.rate < rate
+    assert governor.statistics.backoffs >= 1
+
+
+def test_rightmove_retries_after_server_asks(search_response: dict[str, Any]) -> None:
+    # GIVEN: A governed client whose first request is rate limited.
+    clock = _Clock()
+    governor = _governor(clock)
+    pool = mock.create_autospec(ConnectionPool, instance=True)
+    pool.request.side_effect = [
+        Response(
+            status=429,
+            reason="Too Many Requests",
+            headers={"retry-after": "5"},
+            body=b"",
+            reused=False,
+        ),
+        Response(
+            status=200,
+            reason="OK",
+            headers={},
+            body=json.dumps(search_response).encode(),
+            reused=True,
+        ),
+    ]
+    errors = []
+    api = Rightmove(
+        retrying=tenacity.Retrying(
+            retry=tenacity.retry_if_exception_type(HTTPError),
+            before_sleep=lambda retry_state: errors.append(
+                retry_state.outcome.exception()
+            ),
+            reraise=True,
+        ),
+        connection_pool=pool,
+        governor=governor,
+    )
+    # WHEN: Searching.
+    api.search(SearchQuery(location_identifier="REGION^1", is_fetching=True))
+    # THEN: The error should carry the server's wait, which the retry honours.
+    assert [(error.status, error.retry_after) for error in errors] == [(429, 5.0)]
+    assert clock.now == 5.0
+    assert governor.statistics.retry_afters == 1
+
+
+def test_async_rightmove_is_governed(search_response: dict[str, Any]) -> None:
+    # GIVEN: A governed async client whose first request fails.
+    statuses = iter([500, 200])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(next(statuses), json=search_response)
+
+    governor = RequestGovernor(initial_rate=100.0)
+
+    async def search() -> None:
+        async with AsyncRightmove(
+            retrying=tenacity.AsyncRetrying(
+                retry=tenacity.retry_if_exception_type(HTTPError), reraise=True
+            ),
+            client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+            governor=governor,
+        ) as api:
+            await api.search(
+                SearchQuery(location_identifier="REGION^1", is_fetching=True)
+            )
+
+    # WHEN: Searching.
+    asyncio.run(search())
+    # THEN: The failure should have backed the rate off.
+    assert governor.statistics.requests == 2
+    assert governor.statistics.backoffs == 1
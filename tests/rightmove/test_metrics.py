@@ -0,0 +1,158 @@
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+from typing import Any
+from unittest import mock
+
+import httpx
+import pytest
+import tenacity
+
+from rightmove.api import AsyncRightmove, HTTPError, Rightmove, SearchQuery
+from rightmove.connection_pool import ConnectionPool, Response
+from rightmove.metrics import LatencyHistogram, RequestMetrics
+from rightmove.response_cache import ResponseCache
+
+
+def test_latency_histogram_buckets() -> None:
+    # GIVEN: A histogram with two bounds.
+    histogram = LatencyHistogram(bounds=(0.1, 1.0))
+    # WHEN: Observing latencies on, between and past the bounds.
+    for seconds in (0.05, 0.1, 0.5, 2.0, 3.0):
+        histogram.observe(seconds)
+    # THEN: Each should be counted in the first bucket that holds it.
+    assert histogram.counts == [2, 1, 2]
+    assert histogram.max_seconds == 3.0
+    assert histogram.mean_seconds == pytest.approx(1.13)
+
+
+def test_records_responses_per_endpoint(search_response: dict[str, Any]) -> None:
+    # GIVEN: A client whose first search request fails, and whose responses
+    #  are gzipped over a keep-alive connection.
+    body = json.dumps(search_response).encode()
+    compressed = gzip.compress(body)
+    pool = mock.create_autospec(ConnectionPool, instance=True)
+    pool.request.side_effect = [
+        Response(status=503, reason="Busy", headers={}, body=b"busy", reused=False),
+        Response(
+            status=200,
+            reason="OK",
+            headers={"content-encoding": "gzip"},
+            body=compressed,
+            reused=True,
+        ),
+        Response(
+            status=200,
+            reason="OK",
+            headers={},
+            body=b'{"matches": []}',
+            reused=True,
+        ),
+    ]
+    metrics = RequestMetrics()
+    api = Rightmove(
+        retrying=tenacity.Retrying(
+            retry=tenacity.retry_if_exception_type(HTTPError), reraise=True
+        ),
+        connection_pool=pool,
+        metrics=metrics,
+    )
+    # WHEN: Searching and looking up a location.
+    api.search(SearchQuery(location_identifier="REGION^1", is_fetching=True))
+    api.lookup("Islington")
+    # THEN: The retry, statuses, bytes and reuse should be recorded by endpoint.
+    assert api.metrics is metrics
+    search = metrics.endpoints["/api/_search"]
+    assert search.responses == 2
+    assert search.retries == 1
+    assert search.status_codes == {503: 1, 200: 1}
+    assert search.compressed_bytes == len(b"busy") + len(compressed)
+    assert search.decompressed_bytes == len(b"busy") + len(body)
+    assert search.connections_reused == 1
+    assert search.latency.count == 2
+    typeahead = metrics.endpoints["/typeahead"]
+    assert (typeahead.responses, typeahead.retries) == (1, 0)
+
+
+def test_records_errors_and_cache_hits(search_response: dict[str, Any]) -> None:
+    # GIVEN: A cached client whose connection fails on the first request.
+    pool = mock.create_autospec(ConnectionPool, instance=True)
+    pool.request.side_effect = [
+        ConnectionResetError(),
+        Response(
+            status=200,
+            reason="OK",
+            headers={},
+            body=json.dumps(search_response).encode(),
+            reused=False,
+        ),
+    ]
+    metrics = RequestMetrics()
+    query = SearchQuery(location_identifier="REGION^1", is_fetching=True)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with ResponseCache(os.path.join(tmpdir, "responses.sqlite")) as cache:
+            api = Rightmove(connection_pool=pool, response_cache=cache, metrics=metrics)
+            # WHEN: Searching until it succeeds, then searching again.
+            with pytest.raises(ConnectionResetError):
+                api.search(query)
+            api.search(query)
+            api.search(query)
+    # THEN: The error and the cache hit should both be counted.
+    search = metrics.endpoints["/api/_search"]
+    assert (search.errors, search.responses, search.cache_hits) == (1, 1, 1)
+
+
+def test_async_records_retries(search_response: dict[str, Any]) -> None:
+    # GIVEN: An async client whose first request fails, with a retry policy
+    #  that has its own callback.
+    statuses = iter([500, 200])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(next(statuses), json=search_response)
+
+    slept = []
+
+    async def before_sleep(retry_state: tenacity.RetryCallState) -> None:
+        slept.append(retry_state.attempt_number)
+
+    metrics = RequestMetrics()
+
+    async def search() -> None:
+        async with AsyncRightmove(
+            retrying=tenacity.AsyncRetrying(
+                retry=tenacity.retry_if_exception_type(HTTPError),
+                before_sleep=before_sleep,
+                reraise=True,
+            ),
+            client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+            metrics=metrics,
+        ) as api:
+            await api.search(
+                SearchQuery(location_identifier="REGION^1", is_fetching=True)
+            )
+
+    # WHEN: Searching.
+    asyncio.run(search())
+    # THEN: The retry should be recorded and the policy's callback still awaited.
+    search_metrics = metrics.endpoints["/api/_search"]
+    assert search_metrics.retries == 1
+    assert search_metrics.status_codes == {500: 1, 200: 1}
+    assert slept == [1]
+
+
+def test_dump_json() -> None:
+    # GIVEN: Metrics of a request.
+    metrics = RequestMetrics(latency_bounds=(1.0,))
+    metrics.record_response("/typeahead", 200, 0.5, 10, 20, True)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "metrics.json")
+        # WHEN: Dumping them.
+        metrics.dump(filepath)
+        with open(filepath) as file:
+            dumped = json.load(file)
+    # THEN: They should be written as JSON by endpoint.
+    assert dumped["/typeahead"]["status_codes"] == {"200": 1}
+    assert dumped["/typeahead"]["latency"]["buckets"] == {"le_1": 1, "inf": 0}
+    assert dumped["/typeahead"]["decompressed_bytes"] == 20
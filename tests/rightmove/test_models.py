@@ -1,6 +1,8 @@
 import json
 from typing import Any
+from unittest import mock
 
+import pydantic
 import pytest
 
 from rightmove.models import (
@@ -15,6 +17,10 @@ from rightmove.models import (
     ProductLabel,
     LozengeModel,
     MatchingLozenges,
+    PropertySearchResults,
+    PropertySummary,
+    PropertySummarySearchResults,
+    validate_property_summaries_json,
 )
 import os
 
@@ -388,3 +394,63 @@ class TestPropertyModelSerialization:
         assert deserialized_model.summary == original_model.summary
         assert deserialized_model.display_address == original_model.display_address
         assert deserialized_model.property_sub_type == original_model.property_sub_type
+
+
+def test_search_results_from_json(search_response: dict[str, Any]) -> None:
+    # GIVEN: The raw bytes of a search response.
+    content = json.dumps(search_response).encode()
+    # WHEN: Validating them straight into the response envelope.
+    results = PropertySearchResults.model_validate_json(content)
+    # THEN: The properties should match those validated one at a time.
+    assert results.result_count == search_response["resultCount"]
+    assert results.properties == [
+        Property.model_validate(prop) for prop in search_response["properties"]
+    ]
+
+
+def test_property_summaries_validate_full_property_on_demand(
+    search_response: dict[str, Any],
+) -> None:
+    # GIVEN: The summaries of a search response.
+    content = json.dumps(search_response).encode()
+    results = PropertySummarySearchResults.model_validate_json(content)
+    # WHEN: Asking for each full property.
+    properties = [summary.to_property() for summary in results.properties]
+    # THEN: They should match properties validated in full up front.
+    assert properties == [
+        Property.model_validate(prop) for prop in search_response["properties"]
+    ]
+    assert results.properties[0].id == properties[0].id
+    assert results.properties[0].price == properties[0].price
+
+
+def test_property_summaries_from_json_list() -> None:
+    summaries = validate_property_summaries_json(json.dumps(PROPERTIES))
+    assert [summary.to_property() for summary in summaries] == [
+        Property.model_validate(prop) for prop in PROPERTIES
+    ]
+
+
+def test_property_summary_without_all_fields_cannot_be_expanded() -> None:
+    aliases = {field.alias for field in PropertySummary.model_fields.values()}
+    summary = PropertySummary.model_validate(
+        {key: value for key, value in PROPERTIES[0].items() if key in aliases}
+    )
+    with pytest.raises(pydantic.ValidationError):
+        summary.to_property()
+
+
+def test_property_summary_validates_only_its_own_property() -> None:
+    with mock.patch.object(
+        Property, "model_validate", wraps=Property.model_validate
+    ) as model_validate:
+        # GIVEN: Summaries validated from JSON.
+        summaries = validate_property_summaries_json(json.dumps(PROPERTIES))
+        # WHEN: Asking one summary for its full property, twice.
+        property = summaries[1].to_property()
+        assert summaries[1].to_property() is property
+    # THEN: Only that listing should have been validated, once.
+    model_validate.assert_called_once()
+    assert property == Property.model_validate(PROPERTIES[1])
+    # THEN: The models validated for the summary should be kept.
+    assert property.location is summaries[1].location
@@ -0,0 +1,349 @@
+import json
+import os
+import tempfile
+from typing import Any
+from unittest import mock
+
+import pytest
+
+from rightmove.property_cache import (
+    PropertyCache,
+    SqlitePropertyCache,
+    open_property_cache,
+)
+
+
+def test_filter_unseen() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "history.json")
+        # GIVEN: A cache of two properties, reloaded from its file.
+        with PropertyCache(filepath) as cache:
+            cache.update([{"id": 1}, {"id": 3}])
+        cache = PropertyCache(filepath)
+        # WHEN: Filtering IDs against it.
+        unseen_ids = cache.filter_unseen([4, 3, 2, 1])
+    # THEN: Only the IDs not cached should remain, in order.
+    assert unseen_ids == [4, 2]
+    assert cache.contains_property_id(3)
+    assert not cache.contains_property_id(2)
+    assert cache.get(3) == {"id": 3}
+    assert cache.get(2) is None
+
+
+def test_update_rolls_back_on_error() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # GIVEN: A cache of one property.
+        filepath = os.path.join(tmpdir, "history.json")
+        with PropertyCache(filepath) as cache:
+            cache.add({"id": 1})
+            # WHEN: Saving new properties fails part way through writing.
+            with mock.patch("json.dumps", side_effect=[json.dumps({"id": 2}), OSError]):
+                with pytest.raises(OSError):
+                    cache.update([{"id": 2}, {"id": 3}])
+            # THEN: The new properties should not be cached.
+            assert not cache.contains_property_id(2)
+            # WHEN: Adding them again.
+            cache.update([{"id": 2}, {"id": 2}])
+        reloaded = PropertyCache(filepath)
+    # THEN: They should be cached once, and saved.
+    assert cache.filter_unseen([1, 2]) == []
+    assert list(reloaded.properties()) == [{"id": 1}, {"id": 2}]
+
+
+def test_load_drops_a_line_cut_short() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "history.json")
+        # GIVEN: A journal whose last line was cut short.
+        with PropertyCache(filepath) as cache:
+            cache.add({"id": 1})
+        with open(f"{filepath}.journal", "a") as file:
+            file.write('{"id": 2, "bedr')
+        # WHEN: Loading it, and adding more.
+        with PropertyCache(filepath) as cache:
+            cache.add({"id": 3})
+        reloaded = PropertyCache(filepath)
+    # THEN: Everything but the cut short line should be kept.
+    assert list(reloaded.properties()) == [{"id": 1}, {"id": 3}]
+
+
+def test_load_refuses_a_corrupt_line_within_the_journal() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "history.json")
+        # GIVEN: A journal with a corrupt line before complete ones.
+        with open(f"{filepath}.journal", "w") as file:
+            file.write('{"id": 1}\n{"id": 2, "bedr\n{"id": 3}\n')
+        # WHEN: Loading it.
+        with pytest.raises(ValueError, match="Line 2"):
+            PropertyCache(filepath)
+        with open(f"{filepath}.journal") as file:
+            journal = file.read()
+    # THEN: It should fail, without dropping the lines after the corrupt one.
+    assert journal == '{"id": 1}\n{"id": 2, "bedr\n{"id": 3}\n'
+
+
+def test_journal_is_compacted() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "history.json")
+        # GIVEN: A snapshot from before there was a journal.
+        with open(filepath, "w") as file:
+            json.dump([{"id": 1}, {"id": 2}], file)
+        # WHEN: Adding more properties than it has, one at a time.
+        with PropertyCache(filepath, compact_after=2) as cache:
+            for id in range(3, 8):
+                cache.add({"id": id})
+        with open(filepath) as file:
+            snapshot = json.load(file)
+        reloaded = PropertyCache(filepath)
+    # THEN: The journal should have been compacted into the snapshot.
+    assert [property["id"] for property in snapshot] == [1, 2, 3, 4]
+    assert [property["id"] for property in reloaded.properties()] == list(range(1, 8))
+
+
+def test_interrupted_compaction_is_finished() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "history.json")
+        # GIVEN: A compaction interrupted before its journal was removed.
+        with open(filepath, "w") as file:
+            json.dump([{"id": 1}], file)
+        with open(f"{filepath}.journal.compacting", "w") as file:
+            file.write('{"id": 1}\n{"id": 2}\n')
+        with open(f"{filepath}.journal", "w") as file:
+            file.write('{"id": 3}\n')
+        # WHEN: Loading it.
+        cache = PropertyCache(filepath)
+        with open(filepath) as file:
+            snapshot = json.load(file)
+        compacting = os.path.exists(f"{filepath}.journal.compacting")
+    # THEN: The compaction should be finished, without repeating any property.
+    assert snapshot == [{"id": 1}, {"id": 2}]
+    assert not compacting
+    assert list(cache.properties()) == [{"id": 1}, {"id": 2}, {"id": 3}]
+
+
+def _listing(id: int, channel: str, date: str, amount: int) -> dict[str, Any]:
+    return {
+        "id": id,
+        "channel": channel,
+        "firstVisibleDate": date,
+        "price": {"amount": amount},
+    }
+
+
+def test_sqlite_cache_is_shared_between_connections() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "history.sqlite")
+        # GIVEN: A reader of a cache, and a writer with a transaction open.
+        with (
+            open_property_cache(filepath) as reader,
+            SqlitePropertyCache(filepath) as writer,
+        ):
+            writer.add(_listing(1, "RENT", "2025-01-01T00:00:00Z", 1500))
+            writer._connection.execute("BEGIN IMMEDIATE")
+            writer._connection.execute(
+                "INSERT INTO properties (id, property) VALUES (2, '{\"id\": 2}')"
+            )
+            # WHEN: Reading while the writer's transaction is open.
+            during = reader.filter_unseen([1, 2])
+            writer._connection.commit()
+            # THEN: Only what the writer had committed should be seen.
+            assert isinstance(reader, SqlitePropertyCache)
+            assert during == [2]
+            assert reader.filter_unseen([1, 2, 3]) == [3]
+
+
+def test_sqlite_cache_queries() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "history.db")
+        # GIVEN: A cache of properties, one repeated.
+        with SqlitePropertyCache(filepath) as cache:
+            cache.update(
+                [
+                    _listing(1, "RENT", "2025-01-01T00:00:00Z", 1500),
+                    _listing(2, "RENT", "2025-02-01T00:00:00Z", 2500),
+                    _listing(3, "BUY", "2025-03-01T00:00:00Z", 400000),
+                ]
+            )
+            cache.add(_listing(1, "RENT", "2025-04-01T00:00:00Z", 1000))
+        # WHEN: Reopening and querying it.
+        with SqlitePropertyCache(filepath) as cache:
+            count = len(cache)
+            first = cache.get(1)
+            missing = cache.get(4)
+            rented = [property["id"] for property in cache.properties(channel="RENT")]
+            recent_cheap = [
+                property["id"]
+                for property in cache.properties(
+                    added_since="2025-01-15T00:00:00Z", max_price=3000
+                )
+            ]
+        with SqlitePropertyCache(filepath, reset=True) as cache:
+            reset_count = len(cache)
+    # THEN: Each property should be stored once, as first added.
+    assert count == 3
+    assert first == _listing(1, "RENT", "2025-01-01T00:00:00Z", 1500)
+    assert missing is None
+    assert rented == [1, 2]
+    assert recent_cheap == [2]
+    assert reset_count == 0
+
+
+def test_batch_saves_with_one_write() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "history.json")
+        with PropertyCache(filepath) as cache:
+            # GIVEN: A batch of updates.
+            with mock.patch.object(cache, "_save", wraps=cache._save) as save:
+                with cache.batch():
+                    for id in range(1, 4):
+                        cache.add({"id": id})
+                    # THEN: Nothing should be saved until it exits.
+                    assert save.call_count == 0
+                    assert cache.contains_property_id(3)
+            # WHEN: It exits, and a failed batch is rolled back.
+            with pytest.raises(ValueError):
+                with cache.batch():
+                    cache.add({"id": 4})
+                    raise ValueError
+        reloaded = PropertyCache(filepath)
+    # THEN: They should all have been saved together.
+    assert save.call_count == 1
+    assert not cache.contains_property_id(4)
+    assert reloaded.filter_unseen(range(1, 5)) == [4]
+
+
+def test_flush_every() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "history.json")
+        # GIVEN: A cache that saves every 2 properties.
+        with PropertyCache(filepath, flush_every=2) as cache:
+            # WHEN: Adding 3 properties.
+            for id in range(1, 4):
+                cache.add({"id": id})
+            before_close = PropertyCache(filepath)
+        after_close = PropertyCache(filepath)
+    # THEN: The last should only be saved on closing.
+    assert before_close.filter_unseen(range(1, 4)) == [3]
+    assert after_close.filter_unseen(range(1, 4)) == []
+
+
+def test_sqlite_batch() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "history.sqlite")
+        with (
+            SqlitePropertyCache(filepath) as cache,
+            SqlitePropertyCache(filepath) as reader,
+        ):
+            # GIVEN: A batch of updates, with a failed batch nested within.
+            with cache.batch():
+                cache.add({"id": 1})
+                with pytest.raises(ValueError):
+                    with cache.batch():
+                        cache.add({"id": 2})
+                        raise ValueError
+                cache.add({"id": 3})
+                # THEN: Nothing should be committed until it exits.
+                assert reader.filter_unseen([1, 2, 3]) == [1, 2, 3]
+            # WHEN: It exits.
+            # THEN: Only the outer batch should be committed.
+            assert reader.filter_unseen([1, 2, 3]) == [2]
+
+
+def test_compact_cache_loads_only_ids() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "history.json")
+        # GIVEN: A snapshot from before its IDs were saved, and a journal.
+        with open(filepath, "w") as file:
+            json.dump([{"id": id, "bedrooms": 2} for id in range(3000, 3, -2)], file)
+        with PropertyCache(filepath) as cache:
+            cache.add({"id": 2, "bedrooms": 1})
+        # WHEN: Loading it compactly, once to save its IDs and then again.
+        with open_property_cache(filepath, compact=True):
+            pass
+        with mock.patch("json.load", side_effect=AssertionError):
+            cache = open_property_cache(filepath, compact=True)
+            # THEN: Membership should be known without reading the snapshot.
+            assert isinstance(cache, PropertyCache)
+            assert cache._properties is None
+            assert cache.filter_unseen([1, 2, 4, 3000, 3001]) == [1, 3001]
+            # THEN: Each property should be read from disk on its own.
+            assert cache.get(2) == {"id": 2, "bedrooms": 1}
+            assert cache.get(4) == {"id": 4, "bedrooms": 2}
+            assert cache.get(3000) == {"id": 3000, "bedrooms": 2}
+            assert cache.get(1) is None
+        assert len(list(cache.properties())) == 1500
+        cache.close()
+
+
+def test_compact_cache_adds_and_compacts() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "history.json")
+        # GIVEN: A compact cache.
+        with PropertyCache(filepath, compact=True, compact_after=1000) as cache:
+            # WHEN: Adding enough properties to merge the IDs and compact.
+            for start in range(0, 3000, 100):
+                cache.update({"id": id} for id in range(start, start + 100))
+            # A failed batch should be forgotten.
+            with pytest.raises(ValueError):
+                with cache.batch():
+                    cache.add({"id": 5000})
+                    raise ValueError
+            unseen = cache.filter_unseen([2999, 3000, 5000])
+            # Read from the compacted snapshot, the journal after it and unsaved.
+            cache.add({"id": 6000})
+            got = [cache.get(id) for id in (0, 2999, 6000, 5000)]
+        with open(f"{filepath}.index", "rb") as file:
+            saved_index = file.read()
+        reloaded = PropertyCache(filepath, compact=True)
+        reloaded_ids = sorted(property["id"] for property in reloaded.properties())
+    # THEN: Every property should be cached, once.
+    assert unseen == [3000, 5000]
+    assert got == [{"id": 0}, {"id": 2999}, {"id": 6000}, None]
+    assert len(saved_index) > 0
+    assert len(reloaded._property_ids) == 3001
+    assert reloaded_ids == [*range(3000), 6000]
+
+
+def test_compact_cache_indexes_a_snapshot_rewritten_to_the_same_size() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "history.json")
+        # GIVEN: A snapshot whose IDs have been saved.
+        with open(filepath, "w") as file:
+            json.dump([{"id": 10}, {"id": 11}], file)
+        with PropertyCache(filepath, compact=True):
+            pass
+        # WHEN: It is rewritten in place to the same size.
+        modified_ns = os.stat(filepath).st_mtime_ns
+        with open(filepath, "r+") as file:
+            rewritten = file.read().replace("10", "20").replace("11", "21")
+            file.seek(0)
+            file.write(rewritten)
+        os.utime(filepath, ns=(modified_ns + 10**9, modified_ns + 10**9))
+        cache = PropertyCache(filepath, compact=True)
+        # THEN: Its IDs should be read from it again.
+        assert cache.filter_unseen([10, 11, 20, 21]) == [10, 11]
+        assert cache.get(21) == {"id": 21}
+        cache.close()
+
+
+def test_compact_cache_streams_the_snapshot() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "history.json")
+        # GIVEN: A compact cache with a snapshot and a journal to compact.
+        with PropertyCache(filepath, compact=True, compact_after=10) as cache:
+            cache.update({"id": id} for id in range(20))
+        with mock.patch("json.load", side_effect=AssertionError):
+            with PropertyCache(filepath, compact=True, compact_after=10) as cache:
+                # WHEN: Compacting it again, and reading every property.
+                cache.update({"id": id} for id in range(10, 40))
+                cache.close()
+                ids = [property["id"] for property in cache.properties()]
+            # WHEN: Loading it again once its index is lost.
+            os.remove(f"{filepath}.index")
+            modified_ns = os.stat(filepath).st_mtime_ns
+            reloaded = PropertyCache(filepath, compact=True)
+            got = reloaded.get(25)
+            reloaded.close()
+        # THEN: The snapshot should only have been read a line at a time.
+        assert ids == list(range(40))
+        assert got == {"id": 25}
+        assert os.stat(filepath).st_mtime_ns == modified_ns
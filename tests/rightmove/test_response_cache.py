@@ -0,0 +1,141 @@
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+from collections.abc import Iterator
+from typing import Any
+from unittest import mock
+
+import httpx
+import pytest
+
+from rightmove.api import AsyncRightmove, Rightmove, SearchQuery
+from rightmove.connection_pool import ConnectionPool, Response
+from rightmove.models import Property
+from rightmove.response_cache import CacheMissError, ResponseCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def filepath() -> Iterator[str]:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield os.path.join(tmpdir, "responses.sqlite")
+
+
+def test_hit_ignores_parameter_order(filepath: str) -> None:
+    with ResponseCache(filepath) as cache:
+        # GIVEN: A cached response.
+        cache.put("host", "/api/_search", {"a": 1, "b": [2, 3]}, b"body")
+        # WHEN: Getting it with the parameters in another order.
+        body = cache.get("host", "/api/_search", {"b": [2, 3], "a": 1})
+        # THEN: It should be a hit, unlike different parameters.
+        assert body == b"body"
+        assert cache.get("host", "/api/_search", {"a": 2, "b": [2, 3]}) is None
+        assert (cache.statistics.hits, cache.statistics.misses) == (1, 1)
+
+
+def test_responses_expire_per_endpoint(filepath: str) -> None:
+    # GIVEN: Responses from endpoints with different TTLs.
+    clock = _Clock()
+    ttls = {"/short": 10, "/long": 100}
+    with ResponseCache(filepath, ttls=ttls, clock=clock) as cache:
+        cache.put("host", "/short", {}, b"short")
+        cache.put("host", "/long", {}, b"long")
+        # WHEN: Time passes beyond the shorter TTL only.
+        clock.now = 50
+        # THEN: Only the longer lived response should still be served.
+        assert cache.get("host", "/short", {}) is None
+        assert cache.get("host", "/long", {}) == b"long"
+
+
+def test_evicts_least_recently_used(filepath: str) -> None:
+    # GIVEN: A cache with room for two responses, both used.
+    clock = _Clock()
+    with ResponseCache(filepath, max_bytes=8, clock=clock) as cache:
+        cache.put("host", "/", {"page": 1}, b"1111")
+        clock.now = 1
+        cache.put("host", "/", {"page": 2}, b"2222")
+        clock.now = 2
+        cache.get("host", "/", {"page": 1})
+        # WHEN: Adding a third.
+        clock.now = 3
+        cache.put("host", "/", {"page": 3}, b"3333")
+        # THEN: The least recently used response should be evicted.
+        assert cache.get("host", "/", {"page": 2}) is None
+        assert cache.get("host", "/", {"page": 1}) == b"1111"
+        assert cache.get("host", "/", {"page": 3}) == b"3333"
+        assert cache.statistics.evictions == 1
+
+
+def test_offline_serves_stale_and_raises_on_miss(filepath: str) -> None:
+    # GIVEN: An expired response cached in an earlier run.
+    clock = _Clock()
+    with ResponseCache(filepath, ttls={"/": 10}, clock=clock) as cache:
+        cache.put("host", "/", {}, b"stale")
+    clock.now = 1000
+    # WHEN: Reopening the cache offline.
+    with ResponseCache(filepath, ttls={"/": 10}, offline=True, clock=clock) as cache:
+        # THEN: The stale response should be served, and a miss should raise.
+        assert cache.get("host", "/", {}) == b"stale"
+        with pytest.raises(CacheMissError):
+            cache.get("host", "/", {"other": 1})
+
+
+def test_rerun_search_sends_no_requests(
+    filepath: str, search_response: dict[str, Any]
+) -> None:
+    # GIVEN: A search that has already been run once with a cache.
+    pool = mock.create_autospec(ConnectionPool, instance=True)
+    pool.request.return_value = Response(
+        status=200,
+        reason="OK",
+        headers={"content-encoding": "gzip"},
+        body=gzip.compress(json.dumps(search_response).encode()),
+        reused=False,
+    )
+    query = SearchQuery(location_identifier="REGION^1", is_fetching=True)
+    with ResponseCache(filepath) as cache:
+        first = Rightmove(connection_pool=pool, response_cache=cache).search(query)
+        assert pool.request.call_count == 1
+    # WHEN: Running it again later.
+    with ResponseCache(filepath) as cache:
+        second = Rightmove(connection_pool=pool, response_cache=cache).search(query)
+    # THEN: It should be served entirely from the cache.
+    assert pool.request.call_count == 1
+    assert second == first
+
+
+def test_async_rerun_search_sends_no_requests(
+    filepath: str, search_response: dict[str, Any]
+) -> None:
+    # GIVEN: An async client whose searches are cached.
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json=search_response)
+
+    query = SearchQuery(location_identifier="REGION^1", is_fetching=True)
+
+    async def search() -> list[Property]:
+        async with AsyncRightmove(
+            client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+            response_cache=cache,
+        ) as api:
+            return await api.search(query)
+
+    with ResponseCache(filepath) as cache:
+        # WHEN: Searching twice.
+        first = asyncio.run(search())
+        second = asyncio.run(search())
+    # THEN: Only the first search should reach the server.
+    assert len(requests) == 1
+    assert second == first
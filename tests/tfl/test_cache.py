@@ -0,0 +1,69 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+import pytest
+
+from tfl.cache import Cache
+
+_FROM_TO = ((51.5, -0.1), (51.6, 0.0))
+
+_OTHER_FROM_TO = ((51.4, -0.2), (51.6, 0.0))
+
+
+def _saved(filepath: str) -> dict[str, list[object]]:
+    with open(filepath) as file:
+        return json.load(file)
+
+
+def test_batch_saves_with_one_write() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "journeys.json")
+        cache = Cache(filepath)
+        # GIVEN: A batch of changes.
+        with mock.patch.object(cache, "_save", wraps=cache._save) as save:
+            with cache.batch():
+                cache[_FROM_TO] = []
+                cache[_OTHER_FROM_TO] = []
+                # THEN: Nothing should be saved until it exits.
+                assert save.call_count == 0
+                assert _FROM_TO in cache
+        # WHEN: It exits.
+        saved = _saved(filepath)
+    # THEN: They should all have been saved together.
+    assert save.call_count == 1
+    assert saved == {str(_FROM_TO): [], str(_OTHER_FROM_TO): []}
+
+
+def test_batch_is_rolled_back_on_error() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "journeys.json")
+        # GIVEN: A cache with a journey saved.
+        cache = Cache(filepath)
+        cache[_FROM_TO] = []
+        # WHEN: A batch of changes fails.
+        with pytest.raises(ValueError):
+            with cache.batch():
+                cache[_OTHER_FROM_TO] = []
+                raise ValueError
+        saved = _saved(filepath)
+    # THEN: Its changes should be undone, and not saved.
+    assert _OTHER_FROM_TO not in cache
+    assert saved == {str(_FROM_TO): []}
+
+
+def test_flush_interval() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "journeys.json")
+        # GIVEN: A cache that saves changes a minute after the first.
+        with mock.patch("time.monotonic", side_effect=[0.0, 30.0, 90.0]):
+            with Cache(filepath, flush_interval=60.0) as cache:
+                # WHEN: Making changes over 90 seconds.
+                cache[_FROM_TO] = []
+                saved_first = os.path.exists(filepath)
+                cache[_OTHER_FROM_TO] = []
+                saved = _saved(filepath)
+    # THEN: They should be saved together after a minute.
+    assert not saved_first
+    assert saved == {str(_FROM_TO): [], str(_OTHER_FROM_TO): []}